@@ -18,16 +18,6 @@ This script intentionally avoids committing any secrets.
 
 from os import getenv
 
-from azure.identity import DefaultAzureCredential
-from azure.ai.projects import AIProjectClient
-from azure.ai.projects.models import PromptAgentDefinition
-
-try:
-    # Optional: enable API-key auth if you prefer using a Foundry Project API key.
-    from azure.core.credentials import AzureKeyCredential  # type: ignore
-except Exception:  # noqa: BLE001
-    AzureKeyCredential = None  # type: ignore
-
 
 USER_ENDPOINT = getenv("USER_ENDPOINT") or "https://<your-resource>.services.ai.azure.com/api/projects/<project>"
 AGENT_NAME = getenv("AGENT_NAME") or "story-agent"
@@ -39,6 +29,22 @@ def main():
     if "<your-resource>" in USER_ENDPOINT or "<your-model-deployment>" in MODEL_DEPLOYMENT_NAME:
         raise SystemExit("Please set USER_ENDPOINT and MODEL_DEPLOYMENT_NAME environment variables before running.")
 
+    # Imported here so the placeholder check above fails fast, without loading the SDK.
+    try:
+        from azure.identity import DefaultAzureCredential
+        from azure.ai.projects import AIProjectClient
+        from azure.ai.projects.models import PromptAgentDefinition
+    except ImportError as exc:
+        raise SystemExit(
+            'Missing Azure SDK. Install with: pip install --pre "azure-ai-projects>=2.0.0b1" azure-identity'
+        ) from exc
+
+    try:
+        # Optional: enable API-key auth if you prefer using a Foundry Project API key.
+        from azure.core.credentials import AzureKeyCredential  # type: ignore
+    except Exception:  # noqa: BLE001
+        AzureKeyCredential = None  # type: ignore
+
     if PROJECT_API_KEY.strip():
         if AzureKeyCredential is None:
             raise SystemExit(
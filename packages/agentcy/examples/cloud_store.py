@@ -0,0 +1,216 @@
+"""Storage backends for cloud saves (`POST /save`, `GET /cloud/saves`).
+
+GitHub Issues used to be the only store, so every save and every read was a
+rate-limited network call. A backend here is the store of record instead:
+
+- `SQLiteCloudStore` keeps saves in a local SQLite database in WAL mode
+  (readers never block the writer), with an index for every app/kind/user
+  filter combination plus created_at.
+  A save or a lookup is a local query, and the API keeps working while GitHub
+  is slow or down.
+- GitHub Issues becomes an optional asynchronous replica: the API hands each
+  stored save to the background issue queue (see `feedback_api`).
+
+Pick a backend with `get_store("sqlite", path=...)`; new backends only need to
+implement the `CloudStore` protocol.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Optional, Protocol
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cloud_saves (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    app TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    user TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    page_url TEXT,
+    created_at REAL NOT NULL
+);
+DROP INDEX IF EXISTS cloud_saves_app_kind_user;
+CREATE INDEX IF NOT EXISTS cloud_saves_by_app ON cloud_saves (app, kind, user);
+CREATE INDEX IF NOT EXISTS cloud_saves_by_user ON cloud_saves (user, app);
+CREATE INDEX IF NOT EXISTS cloud_saves_by_kind ON cloud_saves (kind, user);
+CREATE INDEX IF NOT EXISTS cloud_saves_created_at ON cloud_saves (created_at);
+"""
+# `list()` filters on any subset of app/kind/user and orders by id. Every
+# subset is a prefix of one index above, so no filter scans the whole table.
+# SQLite appends the rowid to each index entry: when the filter pins a whole
+# index key, rows come back in id order and `before_id` seeks directly.
+
+
+@dataclass
+class CloudSave:
+    id: int
+    app: str
+    kind: str
+    user: str
+    payload: dict[str, Any]
+    page_url: Optional[str]
+    created_at: float
+
+    def to_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class CloudStore(Protocol):
+    def save(self, app: str, kind: str, user: str, payload: dict[str, Any], page_url: Optional[str] = None) -> CloudSave:
+        ...
+
+    def list(
+        self,
+        *,
+        app: Optional[str] = None,
+        kind: Optional[str] = None,
+        user: Optional[str] = None,
+        since: Optional[float] = None,
+        before_id: Optional[int] = None,
+        limit: int = 50,
+    ) -> list[CloudSave]:
+        ...
+
+    def stats(self) -> dict[str, Any]:
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class SQLiteCloudStore:
+    """Thread-safe SQLite store; one connection per thread, WAL journal."""
+
+    def __init__(self, path: str, *, synchronous: str = "NORMAL") -> None:
+        self.path = path
+        self.synchronous = synchronous.upper() if synchronous.upper() in {"OFF", "NORMAL", "FULL"} else "NORMAL"
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._conns: list[sqlite3.Connection] = []
+
+        self.writes = 0
+        self.reads = 0
+        self.write_us_total = 0.0
+        self.read_us_total = 0.0
+
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL: durable across app crashes, one fsync per checkpoint instead of per commit.
+            conn.execute(f"PRAGMA synchronous={self.synchronous}")
+            self._local.conn = conn
+            with self._lock:
+                self._conns.append(conn)
+        return conn
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> CloudSave:
+        return CloudSave(
+            id=int(row["id"]),
+            app=row["app"],
+            kind=row["kind"],
+            user=row["user"],
+            payload=json.loads(row["payload"]),
+            page_url=row["page_url"],
+            created_at=float(row["created_at"]),
+        )
+
+    def save(self, app: str, kind: str, user: str, payload: dict[str, Any], page_url: Optional[str] = None) -> CloudSave:
+        started = time.perf_counter()
+        created_at = time.time()
+        conn = self._conn()
+        with conn:
+            cur = conn.execute(
+                "INSERT INTO cloud_saves (app, kind, user, payload, page_url, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (app, kind, user, json.dumps(payload, ensure_ascii=False, sort_keys=True), page_url, created_at),
+            )
+        with self._lock:
+            self.writes += 1
+            self.write_us_total += (time.perf_counter() - started) * 1e6
+        return CloudSave(int(cur.lastrowid), app, kind, user, payload, page_url, created_at)
+
+    def list(
+        self,
+        *,
+        app: Optional[str] = None,
+        kind: Optional[str] = None,
+        user: Optional[str] = None,
+        since: Optional[float] = None,
+        before_id: Optional[int] = None,
+        limit: int = 50,
+    ) -> list[CloudSave]:
+        """Newest first. Page with `before_id=<id of the last row you got>`."""
+        started = time.perf_counter()
+        where: list[str] = []
+        args: list[Any] = []
+        for column, value in (("app", app), ("kind", kind), ("user", user)):
+            if value is not None:
+                where.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            where.append("created_at >= ?")
+            args.append(float(since))
+        if before_id is not None:
+            where.append("id < ?")
+            args.append(int(before_id))
+        sql = "SELECT * FROM cloud_saves"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        # Row ids follow insertion order, so they double as a stable paging cursor.
+        sql += " ORDER BY id DESC LIMIT ?"
+        args.append(max(0, int(limit)))
+        rows = self._conn().execute(sql, args).fetchall()
+        with self._lock:
+            self.reads += 1
+            self.read_us_total += (time.perf_counter() - started) * 1e6
+        return [self._row(r) for r in rows]
+
+    def latest(self, app: str, kind: str, user: str) -> Optional[CloudSave]:
+        rows = self.list(app=app, kind=kind, user=user, limit=1)
+        return rows[0] if rows else None
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": "sqlite",
+                "path": self.path,
+                "writes": self.writes,
+                "reads": self.reads,
+                "write_us_avg": round(self.write_us_total / self.writes, 1) if self.writes else 0.0,
+                "read_us_avg": round(self.read_us_total / self.reads, 1) if self.reads else 0.0,
+                "connections": len(self._conns),
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            conns, self._conns = self._conns, []
+        for conn in conns:
+            try:
+                conn.close()
+            except Exception:
+                pass
+        self._local = threading.local()
+
+
+BACKENDS = {"sqlite": SQLiteCloudStore}
+
+
+def get_store(backend: str, **kwargs: Any) -> CloudStore:
+    """Build a store by name (`sqlite`). Raises ValueError for unknown backends."""
+    cls = BACKENDS.get((backend or "").strip().lower())
+    if cls is None:
+        raise ValueError(f"Unknown cloud save backend: {backend!r} (expected one of {sorted(BACKENDS)})")
+    return cls(**kwargs)
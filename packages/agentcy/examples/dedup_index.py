@@ -0,0 +1,371 @@
+"""Near-duplicate index for feedback text (shingles + MinHash + LSH).
+
+Players send the same complaint many times ("Draagon" instead of "Dragon").
+Each text is reduced to its `normalize_text` form, lowercased and cut into
+character shingles; a MinHash signature of the shingle set is split into LSH
+bands, and texts that share any band bucket become candidates. A candidate is
+a duplicate when the signatures agree on at least `threshold` of their bins
+(an estimate of the Jaccard similarity of the shingle sets).
+
+Duplicates attach to an existing cluster, which remembers the GitHub issue
+created for its first report, so `/feedback` can skip opening another one.
+
+Lookups touch a handful of buckets and one signature comparison per
+candidate, so they stay well under a millisecond. The index lives in memory
+and is written to a JSON file (atomic replace) at most once per
+`save_interval_s`, and on `close()`. Each uvicorn worker keeps its own copy;
+the file is last-writer-wins, which at worst forgets a few recent clusters.
+"""
+from __future__ import annotations
+
+import json
+import operator
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+from examples.feedback_processor import normalize_text
+
+SHINGLE_CHARS = 5
+NUM_BINS = 64
+BANDS = 16  # 16 bands x 4 bins
+# A bucket this full only says "uses common words"; it is neither grown nor scanned.
+MAX_BUCKET_SIZE = 32
+_BIN_BITS = NUM_BINS.bit_length() - 1
+EMPTY = 1 << (32 - _BIN_BITS)  # larger than any in-bin value
+
+
+def shingles(text: str, k: int = SHINGLE_CHARS) -> set[int]:
+    """32-bit hashes of the character k-grams of the normalized, lowercased text."""
+    data = normalize_text(text).lower().encode("utf-8")
+    if not data:
+        return set()
+    if len(data) <= k:
+        return {zlib.crc32(data)}
+    return {zlib.crc32(data[i : i + k]) for i in range(len(data) - k + 1)}
+
+
+def minhash(hashes: set[int]) -> tuple[int, ...]:
+    """One-permutation MinHash: the low bits pick a bin, each bin keeps its minimum.
+
+    One pass over the shingles instead of one pass per permutation, which is
+    what keeps a lookup in the tens of microseconds. Bins no shingle fell into
+    stay `EMPTY`.
+    """
+    sig = [EMPTY] * NUM_BINS
+    mask = NUM_BINS - 1
+    for h in hashes:
+        b = h & mask
+        v = h >> _BIN_BITS
+        if v < sig[b]:
+            sig[b] = v
+    return tuple(sig)
+
+
+def _empty_mask(signature: tuple[int, ...]) -> int:
+    mask = 0
+    for i, v in enumerate(signature):
+        if v == EMPTY:
+            mask |= 1 << i
+    return mask
+
+
+def similarity(a: tuple[int, ...], b: tuple[int, ...], empty_a: Optional[int] = None, empty_b: Optional[int] = None) -> float:
+    """Estimated Jaccard similarity: agreement over the bins either side filled."""
+    both_empty = bin((_empty_mask(a) if empty_a is None else empty_a) & (_empty_mask(b) if empty_b is None else empty_b)).count("1")
+    filled = len(a) - both_empty
+    return (sum(map(operator.eq, a, b)) - both_empty) / filled if filled else 0.0
+
+
+def _band_keys(app: str, signature: tuple[int, ...]) -> list[tuple]:
+    rows = len(signature) // BANDS
+    keys = []
+    for band in range(BANDS):
+        values = signature[band * rows : (band + 1) * rows]
+        # All-empty bands would put every short text in one bucket.
+        if any(v != EMPTY for v in values):
+            keys.append((app, band, values))
+    return keys
+
+
+@dataclass
+class Cluster:
+    id: str
+    app: str
+    text: str  # first report, normalized
+    signature: tuple[int, ...]
+    count: int = 1
+    first_ts: float = 0.0
+    last_ts: float = 0.0
+    issue_url: Optional[str] = None
+    issue_pending_since: Optional[float] = None
+
+
+@dataclass
+class DedupResult:
+    cluster: Cluster
+    duplicate: bool
+    similarity: float
+
+
+class DedupIndex:
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        *,
+        threshold: float = 0.5,
+        max_clusters: int = 10000,
+        save_interval_s: float = 5.0,
+    ) -> None:
+        self.path = path
+        self.threshold = float(threshold)
+        self.max_clusters = max(1, int(max_clusters))
+        self.save_interval_s = max(0.0, float(save_interval_s))
+
+        self._lock = threading.Lock()
+        self._clusters: OrderedDict[str, Cluster] = OrderedDict()  # least recently seen first
+        self._buckets: dict[tuple, set[str]] = {}
+        self._hot: set[tuple] = set()
+        self._empty: dict[str, int] = {}  # cluster id -> bitmask of its EMPTY bins
+        self._dirty = False
+        self._timer: Optional[threading.Timer] = None
+
+        self.lookups = 0
+        self.duplicates = 0
+        self.evictions = 0
+        self.saves = 0
+        self.issues_skipped = 0
+        self._lookup_us_total = 0.0
+        self.max_lookup_us = 0.0
+
+        if path and os.path.exists(path):
+            self._load(path)
+
+    # -- persistence -------------------------------------------------------
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        for raw in data.get("clusters") or []:
+            try:
+                raw["signature"] = tuple(raw["signature"])
+                cluster = Cluster(**raw)
+            except (KeyError, TypeError):
+                continue
+            if len(cluster.signature) == NUM_BINS:
+                self._insert(cluster)
+
+    def save(self) -> None:
+        """Write the index now (atomic replace). No-op without a path."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self.path or not self._dirty:
+                return
+            data = {"version": 1, "clusters": [asdict(c) for c in self._clusters.values()]}
+            self._dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp, self.path)
+        with self._lock:
+            self.saves += 1
+
+    def _mark_dirty(self) -> None:
+        # Caller holds self._lock.
+        self._dirty = True
+        if self.path and self._timer is None:
+            self._timer = threading.Timer(self.save_interval_s, self._save_quietly)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _save_quietly(self) -> None:
+        with self._lock:
+            self._timer = None
+        try:
+            self.save()
+        except OSError:
+            with self._lock:
+                self._dirty = True
+
+    def close(self) -> None:
+        self.save()
+
+    # -- index -------------------------------------------------------------
+
+    def _insert(self, cluster: Cluster) -> None:
+        self._clusters[cluster.id] = cluster
+        self._empty[cluster.id] = _empty_mask(cluster.signature)
+        for key in _band_keys(cluster.app, cluster.signature):
+            if key in self._hot:
+                continue
+            ids = self._buckets.setdefault(key, set())
+            ids.add(cluster.id)
+            if len(ids) >= MAX_BUCKET_SIZE:
+                del self._buckets[key]
+                self._hot.add(key)
+        while len(self._clusters) > self.max_clusters:
+            _, old = self._clusters.popitem(last=False)
+            self._empty.pop(old.id, None)
+            for key in _band_keys(old.app, old.signature):
+                ids = self._buckets.get(key)
+                if ids is not None:
+                    ids.discard(old.id)
+                    if not ids:
+                        del self._buckets[key]
+            self.evictions += 1
+
+    def _best_match(self, app: str, signature: tuple[int, ...]) -> tuple[Optional[Cluster], float]:
+        best: Optional[Cluster] = None
+        best_sim = 0.0
+        empty = _empty_mask(signature)
+        seen: set[str] = set()
+        for key in _band_keys(app, signature):
+            for cid in self._buckets.get(key, ()):
+                if cid in seen:
+                    continue
+                seen.add(cid)
+                sim = similarity(signature, self._clusters[cid].signature, empty, self._empty[cid])
+                if sim > best_sim:
+                    best, best_sim = self._clusters[cid], sim
+        if best is not None and best_sim >= self.threshold:
+            return best, best_sim
+        return None, best_sim
+
+    def lookup(self, text: str, app: str = "") -> Optional[DedupResult]:
+        """Return the matching cluster for `text`, or None. Does not modify the index."""
+        hashes = shingles(text)
+        if not hashes:
+            return None
+        signature = minhash(hashes)
+        with self._lock:
+            cluster, sim = self._best_match(app, signature)
+        return DedupResult(cluster, True, sim) if cluster is not None else None
+
+    def add(self, text: str, app: str = "", ts: Optional[float] = None) -> Optional[DedupResult]:
+        """Attach `text` to its near-duplicate cluster, or start a new one.
+
+        Returns None for texts with nothing to index (empty after normalization).
+        """
+        started = time.perf_counter()
+        hashes = shingles(text)
+        if not hashes:
+            return None
+        signature = minhash(hashes)
+        ts = time.time() if ts is None else float(ts)
+        with self._lock:
+            cluster, sim = self._best_match(app, signature)
+            if cluster is not None:
+                cluster.count += 1
+                cluster.last_ts = ts
+                self._clusters.move_to_end(cluster.id)
+                self.duplicates += 1
+                result = DedupResult(cluster, True, sim)
+            else:
+                cluster = Cluster(
+                    id=uuid.uuid4().hex[:12],
+                    app=app,
+                    text=normalize_text(text),
+                    signature=signature,
+                    first_ts=ts,
+                    last_ts=ts,
+                )
+                self._insert(cluster)
+                result = DedupResult(cluster, False, 1.0)
+            self._mark_dirty()
+            self.lookups += 1
+            elapsed_us = (time.perf_counter() - started) * 1e6
+            self._lookup_us_total += elapsed_us
+            self.max_lookup_us = max(self.max_lookup_us, elapsed_us)
+        return result
+
+    def claim_issue(self, cluster_id: str, *, retry_after_s: float = 600.0) -> bool:
+        """True if the caller should open the issue for this cluster.
+
+        A cluster gets one issue. The caller reports back with `set_issue_url`
+        or `release_issue`; a claim that never does (e.g. the process died)
+        expires after `retry_after_s` so a later report can retry.
+        """
+        now = time.time()
+        with self._lock:
+            cluster = self._clusters.get(cluster_id)
+            if cluster is None:
+                return False
+            if cluster.issue_url or (
+                cluster.issue_pending_since is not None and now - cluster.issue_pending_since < retry_after_s
+            ):
+                self.issues_skipped += 1
+                return False
+            cluster.issue_pending_since = now
+            self._mark_dirty()
+            return True
+
+    def set_issue_url(self, cluster_id: str, issue_url: Optional[str]) -> None:
+        with self._lock:
+            cluster = self._clusters.get(cluster_id)
+            if cluster is None or not issue_url:
+                return
+            cluster.issue_url = issue_url
+            cluster.issue_pending_since = None
+            self._mark_dirty()
+
+    def release_issue(self, cluster_id: str) -> None:
+        """Drop an in-flight claim whose issue was never opened (job dropped or failed)."""
+        with self._lock:
+            cluster = self._clusters.get(cluster_id)
+            if cluster is None or cluster.issue_url or cluster.issue_pending_since is None:
+                return
+            cluster.issue_pending_since = None
+            self._mark_dirty()
+
+    def get(self, cluster_id: str) -> Optional[Cluster]:
+        with self._lock:
+            return self._clusters.get(cluster_id)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "clusters": len(self._clusters),
+                "buckets": len(self._buckets),
+                "hot_buckets": len(self._hot),
+                "lookups": self.lookups,
+                "duplicates": self.duplicates,
+                "evictions": self.evictions,
+                "saves": self.saves,
+                "issues_skipped": self.issues_skipped,
+                "lookup_us_avg": round(self._lookup_us_total / self.lookups, 1) if self.lookups else 0.0,
+                "lookup_us_max": round(self.max_lookup_us, 1),
+            }
+
+
+_indexes: dict[str, DedupIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(path: str, **kwargs: Any) -> DedupIndex:
+    """Return the process-wide index for `path` (created on first use)."""
+    with _indexes_lock:
+        index = _indexes.get(path)
+        if index is None:
+            index = _indexes[path] = DedupIndex(path, **kwargs)
+        return index
+
+
+def close_all() -> None:
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+    for index in indexes:
+        try:
+            index.close()
+        except OSError:
+            pass
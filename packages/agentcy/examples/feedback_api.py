@@ -5,18 +5,33 @@ or deployment to a simple host (Azure Functions, Cloud Run, etc.).
 """
 from __future__ import annotations
 
+import asyncio
+import base64
 import json
 import os
+import re
+import threading
 import time
 import urllib.parse
-import urllib.request
-from typing import Any, List, Optional
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
-from examples.feedback_processor import process_feedback
+from examples.feedback_processor import MAX_FEEDBACK_CHARS, process_feedback
+from examples import cloud_store
+from examples import dedup_index, feedback_store
+from examples.feedback_stats import FeedbackAggregator
+from examples.job_queue import AsyncJobQueue
+from examples.response_cache import RevalidatingCache
+from examples.save_coalescer import SaveCoalescer
+from scripts import github_client
 
 
 class FeedbackRequest(BaseModel):
@@ -41,6 +56,27 @@ class Suggestion(BaseModel):
 
 class FeedbackResponse(BaseModel):
     suggestions: List[Suggestion]
+    # Near-duplicate cluster this feedback was attached to (see examples.dedup_index).
+    cluster_id: Optional[str] = None
+    duplicate: bool = False
+
+
+class StatsPoint(BaseModel):
+    start: int
+    total: int
+    up: int
+    down: int
+    none: int
+
+
+class FeedbackStatsResponse(BaseModel):
+    since: Optional[int] = None
+    until: int
+    total: int
+    by_app: dict[str, int]
+    by_category: dict[str, int]
+    by_vote: dict[str, int]
+    series: Optional[List[StatsPoint]] = None
 
 
 class CloudSaveRequest(BaseModel):
@@ -52,8 +88,25 @@ class CloudSaveRequest(BaseModel):
 
 
 class CloudSaveResponse(BaseModel):
-    issue_url: str
-    issue_number: int
+    # GitHub backend: the issue holding the save. SQLite backend: the local row id.
+    issue_url: Optional[str] = None
+    issue_number: Optional[int] = None
+    save_id: Optional[int] = None
+
+
+class CloudSaveRecord(BaseModel):
+    id: int
+    app: str
+    kind: str
+    user: str
+    payload: dict[str, Any]
+    page_url: Optional[str] = None
+    created_at: float
+
+
+class CloudSavesResponse(BaseModel):
+    items: List[CloudSaveRecord]
+    next_before: Optional[int] = None
 
 
 class CloudIssue(BaseModel):
@@ -69,9 +122,50 @@ class CloudIssuesResponse(BaseModel):
     repo: str
     label: str
     items: List[CloudIssue]
+    next_cursor: Optional[str] = None
+
+
+def _env(name: str) -> str:
+    return os.getenv(name, "").strip()
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(_env(name) or default)
+    except ValueError:
+        return default
+
+
+# Background queue that mirrors /feedback submissions into GitHub Issues.
+issue_queue = AsyncJobQueue(
+    "feedback-issues",
+    maxsize=_env_int("FEEDBACK_ISSUE_QUEUE_SIZE", 100),
+    workers=_env_int("FEEDBACK_ISSUE_WORKERS", 2),
+    max_attempts=_env_int("FEEDBACK_ISSUE_MAX_ATTEMPTS", 3),
+    retryable=github_client.is_retryable,
+)
 
 
-app = FastAPI(title="Agentcy Feedback API")
+@asynccontextmanager
+async def _lifespan(_app: FastAPI):
+    try:
+        # Streaming pass over the local log so /feedback/stats is warm.
+        await asyncio.to_thread(_feedback_aggregator().refresh)
+    except Exception:
+        pass
+    yield
+    # Give in-flight issue creations a chance to finish on shutdown.
+    await issue_queue.stop(timeout=10.0)
+    # Write the latest coalesced saves instead of losing them.
+    await asyncio.to_thread(save_coalescer.flush_all)
+    feedback_store.close_all()
+    dedup_index.close_all()
+    for store in list(_cloud_stores.values()):
+        store.close()
+    _cloud_stores.clear()
+
+
+app = FastAPI(title="Agentcy Feedback API", lifespan=_lifespan)
 
 # For demo purposes allow all origins; in production restrict this to your site
 app.add_middleware(
@@ -83,26 +177,73 @@ app.add_middleware(
 )
 
 
-def _env(name: str) -> str:
-    return os.getenv(name, "").strip()
+def _feedback_store() -> feedback_store.FeedbackStore:
+    # NOTE: on many free hosting tiers, local disk may be ephemeral.
+    path = _env("FEEDBACK_STORE_PATH") or "data/feedback.jsonl"
+    return feedback_store.get_store(
+        path,
+        max_batch=_env_int("FEEDBACK_FLUSH_MAX_RECORDS", 64),
+        flush_interval_s=_env_int("FEEDBACK_FLUSH_INTERVAL_MS", 500) / 1000.0,
+        fsync=_env("FEEDBACK_FSYNC").lower() in {"1", "true", "yes"},
+        max_segment_bytes=_env_int("FEEDBACK_SEGMENT_MAX_BYTES", 32 * 1024 * 1024),
+        max_segment_age_s=_env_int("FEEDBACK_SEGMENT_MAX_AGE_S", 0),
+        compress=_env("FEEDBACK_SEGMENT_COMPRESS") or None,
+    )
 
 
-def _github_request(method: str, url: str, token: str | None, payload: dict | None = None) -> Any:
-    data = None
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    if payload is not None:
-        data = json.dumps(payload).encode("utf-8")
-        headers["Content-Type"] = "application/json"
+def _dedup_index() -> Optional[dedup_index.DedupIndex]:
+    if _env("FEEDBACK_DEDUP").lower() in {"0", "false", "no"}:
+        return None
+    path = _env("FEEDBACK_DEDUP_PATH") or "data/feedback_dedup.json"
+    return dedup_index.get_index(
+        path,
+        threshold=_env_int("FEEDBACK_DEDUP_THRESHOLD_PCT", 50) / 100.0,
+        max_clusters=_env_int("FEEDBACK_DEDUP_MAX_CLUSTERS", 10000),
+    )
+
+
+_aggregators: dict[str, FeedbackAggregator] = {}
+
+
+def _feedback_aggregator() -> FeedbackAggregator:
+    store = _feedback_store()
+    agg = _aggregators.get(store.path)
+    if agg is None:
+        agg = _aggregators.setdefault(store.path, FeedbackAggregator(store.log))
+    return agg
+
+
+_cloud_stores: dict[str, cloud_store.CloudStore] = {}
+_cloud_stores_lock = threading.Lock()
+
 
-    req = urllib.request.Request(url, data=data, method=method.upper(), headers=headers)
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        body = resp.read().decode("utf-8")
-        return json.loads(body) if body else None
+def _cloud_backend() -> str:
+    backend = (_env("CLOUD_SAVE_BACKEND") or "github").lower()
+    if backend != "github" and backend not in cloud_store.BACKENDS:
+        raise HTTPException(status_code=500, detail=f"Server not configured: unknown CLOUD_SAVE_BACKEND {backend!r}")
+    return backend
+
+
+def _cloud_store() -> cloud_store.CloudStore:
+    backend = _cloud_backend()
+    if backend == "github":
+        raise HTTPException(status_code=503, detail="Local cloud saves not configured: set CLOUD_SAVE_BACKEND=sqlite")
+    # NOTE: same caveat as FEEDBACK_STORE_PATH, on ephemeral disks keep GitHub replication on.
+    path = _env("CLOUD_SAVE_DB_PATH") or "data/cloud_saves.db"
+    key = f"{backend}:{path}"
+    store = _cloud_stores.get(key)
+    if store is None:
+        # Opened once per key: concurrent first requests must not each open (and leak) a store.
+        with _cloud_stores_lock:
+            store = _cloud_stores.get(key)
+            if store is None:
+                store = _cloud_stores[key] = cloud_store.get_store(backend, path=path)
+    return store
+
+
+def _github_request(method: str, url: str, token: str | None, payload: dict | None = None, timeout: float = 30) -> Any:
+    # Pooled keep-alive connections shared with the other GitHub callers in this process.
+    return github_client.github_request(method, url, token, payload, timeout=timeout)
 
 
 def _github_issues_repo() -> str:
@@ -129,115 +270,196 @@ def healthz():
     return {"ok": True}
 
 
-@app.post("/feedback", response_model=FeedbackResponse)
-def post_feedback(req: FeedbackRequest):
-    """Accept raw feedback and return structured suggestions."""
-    description_text = (req.description or req.feedback or "").strip()
+def _feedback_issue_payload(req: FeedbackRequest, suggestions: list[dict], description_text: str) -> dict:
+    vote = "👍" if req.thumbs_up is True else ("👎" if req.thumbs_up is False else "❔")
+    app_name = (req.app or "").strip() or "(unknown app)"
+    title = f"Feedback: {vote} {app_name}"
+
+    body_lines = [f"Vote: {vote}", f"App: {app_name}"]
+    if req.page_url:
+        body_lines.append(f"Page: {req.page_url}")
+    if suggestions:
+        body_lines.append(f"Category: {suggestions[0].get('category')} (confidence: {suggestions[0].get('confidence')})")
+    body_lines.append("")
+    body_lines.append("Description:")
+    body_lines.append(description_text if description_text else "(none)")
+
+    labels = ["feedback"]
+    if req.thumbs_up is True:
+        labels.append("thumbs-up")
+    elif req.thumbs_up is False:
+        labels.append("thumbs-down")
+    if suggestions and suggestions[0].get("category") in {"easy", "medium", "hard"}:
+        labels.append(str(suggestions[0].get("category")))
+
+    return {
+        "title": title,
+        "body": "\n".join(body_lines),
+        "labels": labels,
+    }
+
+
+@app.get("/metrics")
+def metrics():
+    """Operational counters for background work (queue depth, latencies)."""
+    dedup = _dedup_index()
+    return {
+        "issue_queue": issue_queue.stats(),
+        "feedback_store": _feedback_store().stats(),
+        "feedback_stats": _feedback_aggregator().stats(),
+        "cloud_issues_cache": issues_cache.stats(),
+        "save_coalescer": save_coalescer.stats(),
+        "cloud_store": {k: v.stats() for k, v in _cloud_stores.items()},
+        "feedback_dedup": dedup.stats() if dedup is not None else None,
+        "github_client": github_client.get_client().stats(),
+    }
+
+
+def _record_feedback(req: FeedbackRequest, description_text: str) -> tuple[list[dict], Any, Any]:
+    """Categorize, dedup and buffer one submission; returns (suggestions, dedup, match).
+
+    Blocking (CPU work, and `append()` may write inline), so `post_feedback`
+    runs it in a worker thread.
+    """
     suggestions = process_feedback(description_text)
 
-    # Append to a single local file (JSONL). Useful for quick testing.
-    # NOTE: on many free hosting tiers, local disk may be ephemeral.
-    store_path = os.getenv("FEEDBACK_STORE_PATH", "data/feedback.jsonl").strip() or "data/feedback.jsonl"
+    # Attach near-duplicates to an existing cluster (in-memory MinHash/LSH lookup).
+    dedup = None
+    match = None
+    if description_text:
+        try:
+            dedup = _dedup_index()
+            match = dedup.add(description_text, app=(req.app or "").strip()) if dedup is not None else None
+        except Exception:
+            # Non-fatal: dedup only saves redundant issues.
+            match = None
+
+    # Buffered append to a local JSONL file; written in group commits by a background thread.
+    record = {
+        "ts": int(time.time()),
+        "app": (req.app or "").strip() or None,
+        "thumbs_up": req.thumbs_up,
+        "description": description_text or None,
+        "page_url": req.page_url,
+    }
+    if suggestions:
+        record["category"] = suggestions[0].get("category")
+        record["confidence"] = suggestions[0].get("confidence")
+    if match is not None:
+        record["cluster_id"] = match.cluster.id
+        record["duplicate"] = match.duplicate
     try:
-        os.makedirs(os.path.dirname(store_path) or ".", exist_ok=True)
-        record = {
-            "ts": int(time.time()),
-            "app": (req.app or "").strip() or None,
-            "thumbs_up": req.thumbs_up,
-            "description": description_text or None,
-            "page_url": req.page_url,
-        }
-        if suggestions:
-            record["category"] = suggestions[0].get("category")
-            record["confidence"] = suggestions[0].get("confidence")
-        with open(store_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        _feedback_store().append(record)
     except Exception:
         # Non-fatal: accepting feedback should still succeed.
         pass
+    return suggestions, dedup, match
+
+
+@app.post("/feedback", response_model=FeedbackResponse)
+async def post_feedback(req: FeedbackRequest):
+    """Accept raw feedback and return structured suggestions.
+
+    GitHub issue creation (when configured) is handed to `issue_queue` so the
+    response never waits on the GitHub API; categorizing and buffering run in
+    a worker thread so a slow disk never stalls the event loop.
+    """
+    # Bounded before it reaches the splitter, the log and the GitHub issue body.
+    description_text = (req.description or req.feedback or "")[:MAX_FEEDBACK_CHARS].strip()
+    suggestions, dedup, match = await asyncio.to_thread(_record_feedback, req, description_text)
 
-    issue_url: Optional[str] = None
     issues_repo = _env("GITHUB_ISSUES_REPO")  # owner/repo
     github_token = _github_token_optional()
-    if issues_repo and github_token:
-        try:
-            vote = "👍" if req.thumbs_up is True else ("👎" if req.thumbs_up is False else "❔")
-            app_name = (req.app or "").strip() or "(unknown app)"
-            title = f"Feedback: {vote} {app_name}"
-
-            body_lines = [f"Vote: {vote}", f"App: {app_name}"]
-            if req.page_url:
-                body_lines.append(f"Page: {req.page_url}")
-            if suggestions:
-                body_lines.append(f"Category: {suggestions[0].get('category')} (confidence: {suggestions[0].get('confidence')})")
-            body_lines.append("")
-            body_lines.append("Description:")
-            body_lines.append(description_text if description_text else "(none)")
-
-            labels = ["feedback"]
-            if req.thumbs_up is True:
-                labels.append("thumbs-up")
-            elif req.thumbs_up is False:
-                labels.append("thumbs-down")
-            if suggestions and suggestions[0].get("category") in {"easy", "medium", "hard"}:
-                labels.append(str(suggestions[0].get("category")))
-
-            payload = {
-                "title": title,
-                "body": "\n".join(body_lines),
-                "labels": labels,
-            }
-
-            api_url = f"https://api.github.com/repos/{issues_repo}/issues"
-            data = json.dumps(payload).encode("utf-8")
-            request = urllib.request.Request(
-                api_url,
-                data=data,
-                method="POST",
-                headers={
-                    "Accept": "application/vnd.github+json",
-                    "Authorization": f"Bearer {github_token}",
-                    "X-GitHub-Api-Version": "2022-11-28",
-                    "Content-Type": "application/json",
-                },
-            )
-            with urllib.request.urlopen(request, timeout=15) as resp:
-                created = json.loads(resp.read().decode("utf-8"))
-                issue_url = created.get("html_url")
-        except Exception:
-            # Non-fatal: API should still accept feedback even if issue creation fails.
-            issue_url = None
-
-    # Keep response schema stable for existing clients.
-    # 'issue_url' is intentionally not part of the response model.
-    out = {"suggestions": suggestions}
-    if issue_url:
-        out["issue_url"] = issue_url
-    return out
+    # One issue per cluster: duplicates of reported (or in-flight) feedback don't open another.
+    if issues_repo and github_token and (match is None or dedup.claim_issue(match.cluster.id)):
+        payload = _feedback_issue_payload(req, suggestions, description_text)
+        api_url = f"https://api.github.com/repos/{issues_repo}/issues"
+        on_done = on_error = None
+        if match is not None:
+            cluster_id = match.cluster.id
+
+            def on_done(created: Any) -> None:
+                issue_url = (created or {}).get("html_url")
+                if issue_url:
+                    dedup.set_issue_url(cluster_id, issue_url)
+                else:
+                    dedup.release_issue(cluster_id)
+
+            def on_error(exc: BaseException) -> None:
+                # A 4xx means GitHub opened nothing, so the next duplicate may try again. After a
+                # timeout or 5xx the issue may exist; the claim then stands until it expires.
+                if isinstance(exc, github_client.GitHubAPIError) and exc.status < 500:
+                    dedup.release_issue(cluster_id)
+
+        # Non-fatal: if the queue is full the job is dropped (and counted in /metrics).
+        # A timed-out or 5xx POST may still have opened the issue, so only rate limits are retried.
+        submitted = issue_queue.submit(
+            lambda: _github_request("POST", api_url, github_token, payload, timeout=15),
+            on_done=on_done,
+            on_error=on_error,
+            retryable=github_client.is_rate_limited,
+        )
+        if not submitted and match is not None:
+            dedup.release_issue(match.cluster.id)
 
+    return {
+        "suggestions": suggestions,
+        "cluster_id": match.cluster.id if match is not None else None,
+        "duplicate": bool(match and match.duplicate),
+    }
 
-@app.post("/save", response_model=CloudSaveResponse)
-def cloud_save(req: CloudSaveRequest):
-    """Persist arbitrary app data to GitHub Issues (cloud DB).
 
-    This is intentionally simple: each save becomes one Issue with labels.
-    It unblocks: online saving, Render deploys (ephemeral disk), and a cloud-backed dashboard.
+_WINDOW_RE = re.compile(r"^(\d+)([hdw])$")
+_WINDOW_UNITS = {"h": 3600, "d": 86400, "w": 7 * 86400}
+_BUCKETS = {"hour": 3600, "day": 86400}
+
+
+@app.get("/feedback/stats", response_model=FeedbackStatsResponse)
+def feedback_stats(
+    window: str = "7d",
+    app_name: Optional[str] = Query(None, alias="app"),
+    bucket: Optional[str] = None,
+):
+    """Counts per app, category and vote over a time window (e.g. 24h, 7d, 4w, all).
+
+    Served from in-memory hourly aggregates that only read newly appended
+    records, so dashboards never trigger a full scan of the log.
     """
-    repo = _github_issues_repo()
-    token = _github_token_required()
+    now = int(time.time())
+    window = (window or "7d").strip().lower()
+    since: Optional[int] = None
+    if window != "all":
+        m = _WINDOW_RE.match(window)
+        if not m:
+            raise HTTPException(status_code=422, detail="window must look like 24h, 7d, 4w or 'all'")
+        since = now - int(m.group(1)) * _WINDOW_UNITS[m.group(2)]
+    if bucket is not None and bucket not in _BUCKETS:
+        raise HTTPException(status_code=422, detail="bucket must be 'hour' or 'day'")
+
+    # Make this worker's own buffered records visible, then read anything new.
+    try:
+        _feedback_store().flush()
+    except Exception:
+        pass
+    agg = _feedback_aggregator()
+    agg.refresh()
+    out = agg.query(
+        since=since,
+        until=now,
+        app=(app_name or "").strip() or None,
+        bucket_seconds=_BUCKETS.get(bucket or ""),
+    )
+    out.update({"since": since, "until": now})
+    return out
 
-    app_name = (req.app or "").strip()
-    if not app_name:
-        raise HTTPException(status_code=422, detail="app is required")
-    kind = (req.kind or "progress").strip() or "progress"
 
-    safe_user = (req.user or "").strip() or "anon"
-    title = f"Save: {app_name} [{kind}] ({safe_user})"
+def _cloud_save_issue(repo: str, req: CloudSaveRequest, app_name: str, kind: str, user: str) -> dict[str, Any]:
+    title = f"Save: {app_name} [{kind}] ({user})"
 
     body_lines = [
         f"App: {app_name}",
         f"Kind: {kind}",
-        f"User: {safe_user}",
+        f"User: {user}",
     ]
     if req.page_url:
         body_lines.append(f"Page: {req.page_url}")
@@ -248,65 +470,367 @@ def cloud_save(req: CloudSaveRequest):
     body_lines.append("```")
 
     labels = ["cloud-save", f"app:{app_name}", f"kind:{kind}"]
-    payload = {"title": title, "body": "\n".join(body_lines), "labels": labels}
+    return {"repo": repo, "title": title, "body": "\n".join(body_lines), "labels": labels}
+
 
-    created = _github_request("POST", f"https://api.github.com/repos/{repo}/issues", token, payload)
+def _create_save_issue(issue: dict[str, Any]) -> tuple[int, str]:
+    repo = issue["repo"]
+    payload = {k: issue[k] for k in ("title", "body", "labels")}
+    created = _github_request("POST", f"https://api.github.com/repos/{repo}/issues", _github_token_required(), payload)
     try:
-        issue_url = str(created.get("html_url"))
-        issue_number = int(created.get("number"))
+        return int(created.get("number")), str(created.get("html_url"))
     except Exception as e:
         raise HTTPException(status_code=502, detail=f"Unexpected GitHub response: {e}")
 
+
+def _find_save_issue(issue: dict[str, Any]) -> Optional[tuple[int, str]]:
+    """Return the open issue already holding this (app, kind, user), if any.
+
+    Labels narrow the listing to the app and kind; the title pins the user.
+    """
+    token = _github_token_required()
+    page = 1
+    while True:
+        query = {"state": "open", "labels": ",".join(issue["labels"]), "per_page": "100", "page": str(page)}
+        url = f"https://api.github.com/repos/{issue['repo']}/issues?{urllib.parse.urlencode(query)}"
+        items = _github_request("GET", url, token, timeout=15) or []
+        for item in items:
+            if isinstance(item, dict) and "pull_request" not in item and item.get("title") == issue["title"]:
+                return int(item["number"]), str(item.get("html_url"))
+        if len(items) < 100:
+            return None
+        page += 1
+
+
+def _update_save_issue(issue_number: int, issue: dict[str, Any]) -> None:
+    repo = issue["repo"]
+    payload = {"title": issue["title"], "body": issue["body"]}
+    _github_request(
+        "PATCH", f"https://api.github.com/repos/{repo}/issues/{issue_number}", _github_token_required(), payload, timeout=15
+    )
+
+
+# Autosaves for the same (repo, app, kind, user) update one issue, at most once per window.
+save_coalescer = SaveCoalescer(
+    _create_save_issue,
+    _update_save_issue,
+    find=_find_save_issue,
+    debounce_s=_env_int("CLOUD_SAVE_DEBOUNCE_S", 10),
+    max_failures=_env_int("CLOUD_SAVE_MAX_ATTEMPTS", 3),
+)
+
+
+def _replicate_save(req: CloudSaveRequest, app_name: str, kind: str, user: str) -> bool:
+    """Queue an async copy of a locally stored save to GitHub Issues, if configured."""
+    if _env("CLOUD_SAVE_REPLICATE").lower() in {"0", "false", "no"}:
+        return False
+    repo = _env("GITHUB_ISSUES_REPO")
+    if repo.count("/") != 1 or not _github_token_optional():
+        return False
+    issue = _cloud_save_issue(repo, req, app_name, kind, user)
+    return issue_queue.submit(lambda: save_coalescer.submit((repo, app_name, kind, user), issue))
+
+
+@app.post("/save", response_model=CloudSaveResponse, response_model_exclude_none=True)
+async def cloud_save(req: CloudSaveRequest):
+    """Persist arbitrary app data (cloud DB).
+
+    With the default `CLOUD_SAVE_BACKEND=github`, the first save for an
+    (app, kind, user) reuses its open Issue (found by labels and title) or
+    creates one; later saves are coalesced by
+    `save_coalescer` and update that same Issue with the latest payload once per
+    `CLOUD_SAVE_DEBOUNCE_S` window.
+
+    With `CLOUD_SAVE_BACKEND=sqlite` the save is written to the local store and
+    answered right away; GitHub Issues (when configured) is updated in the
+    background as a replica.
+    It unblocks: online saving, Render deploys (ephemeral disk), and a cloud-backed dashboard.
+    """
+    backend = _cloud_backend()
+    if backend == "github":
+        repo = _github_issues_repo()
+        _github_token_required()
+    else:
+        store = _cloud_store()
+
+    app_name = (req.app or "").strip()
+    if not app_name:
+        raise HTTPException(status_code=422, detail="app is required")
+    kind = (req.kind or "progress").strip() or "progress"
+    safe_user = (req.user or "").strip() or "anon"
+
+    if backend != "github":
+        saved = await asyncio.to_thread(store.save, app_name, kind, safe_user, req.payload, req.page_url)
+        _replicate_save(req, app_name, kind, safe_user)
+        return {"save_id": saved.id}
+
+    issue = _cloud_save_issue(repo, req, app_name, kind, safe_user)
+    issue_number, issue_url = await asyncio.to_thread(save_coalescer.submit, (repo, app_name, kind, safe_user), issue)
     return {"issue_url": issue_url, "issue_number": issue_number}
 
 
-@app.get("/cloud/issues", response_model=CloudIssuesResponse)
-def cloud_list_issues(label: str = "cloud-save", limit: int = 25):
-    """Read Issues from GitHub (cloud DB) for dashboards.
+@app.get("/cloud/saves", response_model=CloudSavesResponse)
+def cloud_list_saves(
+    app_name: Optional[str] = Query(None, alias="app"),
+    kind: Optional[str] = None,
+    user: Optional[str] = None,
+    limit: int = 50,
+    before: Optional[int] = None,
+):
+    """List saves from the local store, newest first (no GitHub round-trip).
 
-    Works without a token for public repos (rate-limited). If a token is
-    configured, it will use it.
+    Page by passing the returned `next_before` back as `before`.
     """
-    repo = _github_issues_repo()
-    token = _github_token_optional()
+    store = _cloud_store()
+    limit = max(1, min(int(limit), 1000))
+    rows = store.list(
+        app=(app_name or "").strip() or None,
+        kind=(kind or "").strip() or None,
+        user=(user or "").strip() or None,
+        before_id=before,
+        limit=limit,
+    )
+    return {
+        "items": [r.to_dict() for r in rows],
+        "next_before": rows[-1].id if len(rows) == limit else None,
+    }
+
+
+def _cloud_issue(item: Any) -> Optional[dict[str, Any]]:
+    if not isinstance(item, dict):
+        return None
+    if "pull_request" in item:
+        return None
+    labels = item.get("labels") or []
+    label_names: list[str] = []
+    for l in labels:
+        if isinstance(l, dict) and l.get("name"):
+            label_names.append(str(l.get("name")))
+
+    return {
+        "number": int(item.get("number")),
+        "title": str(item.get("title") or ""),
+        "body": str(item.get("body") or ""),
+        "labels": label_names,
+        "html_url": str(item.get("html_url") or ""),
+        "created_at": item.get("created_at"),
+    }
+
+
+# JSON responses are built in memory; NDJSON streams page by page.
+CLOUD_ISSUES_MAX_JSON = 1000
+CLOUD_ISSUES_MAX_NDJSON = 100_000
+CLOUD_ISSUES_PREFETCH = 4
+
+
+@dataclass
+class _IssuePage:
+    page: int
+    status: int
+    items: list[dict[str, Any]]
+    links: dict[str, str]
+    etag: Optional[str] = None
+
+
+def _encode_cursor(page: int, per_page: int, skip: int) -> str:
+    raw = f"{page}:{per_page}:{skip}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode_cursor(cursor: Optional[str], limit: int) -> tuple[int, int, int]:
+    """Return (page, per_page, skip); a fresh listing starts at page 1."""
+    if not cursor:
+        return 1, min(100, limit), 0
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        page, per_page, skip = (int(x) for x in raw.split(":"))
+    except Exception:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    if page < 1 or not 1 <= per_page <= 100 or skip < 0:
+        raise HTTPException(status_code=422, detail="Invalid cursor")
+    return page, per_page, skip
 
-    limit = min(100, max(1, int(limit)))
-    label = (label or "cloud-save").strip() or "cloud-save"
 
+def _fetch_issue_page(repo: str, token: str | None, label: str, per_page: int, page: int, etag: Optional[str] = None) -> _IssuePage:
     query = {
         "state": "open",
         "labels": label,
-        "per_page": str(limit),
+        "per_page": str(per_page),
+        "page": str(page),
         "sort": "created",
         "direction": "desc",
     }
     url = f"https://api.github.com/repos/{repo}/issues?{urllib.parse.urlencode(query)}"
+    headers = {"If-None-Match": etag} if etag else None
+    resp = github_client.get_client().request("GET", url, token, headers=headers, conditional=False)
+    links = github_client.parse_link_header(resp.headers.get("link"))
+    if resp.status == 304:
+        return _IssuePage(page=page, status=304, items=[], links=links, etag=resp.headers.get("etag") or etag)
+    items = [issue for issue in map(_cloud_issue, resp.data or []) if issue is not None]
+    return _IssuePage(page=page, status=resp.status, items=items, links=links, etag=resp.headers.get("etag"))
+
+
+def _iter_issue_pages(
+    repo: str,
+    token: str | None,
+    label: str,
+    per_page: int,
+    start_page: int,
+    etag: Optional[str] = None,
+    want_pages: int = 1,
+) -> Iterator[_IssuePage]:
+    """Yield pages in order, following GitHub `Link` headers.
+
+    When the first page advertises rel="last" the total is known, so the next
+    `want_pages` pages are fetched concurrently through a sliding window of
+    CLOUD_ISSUES_PREFETCH requests (at most that many pages are held in
+    memory). Past that, pages are fetched one at a time, since the caller
+    usually stops there.
+    """
+    first = _fetch_issue_page(repo, token, label, per_page, start_page, etag)
+    yield first
+    if first.status == 304:
+        return
+
+    last = github_client.link_page_number(first.links.get("last"))
+    if last is None:
+        nxt = first.links.get("next")
+        page = start_page
+        while nxt:
+            page = github_client.link_page_number(nxt) or page + 1
+            current = _fetch_issue_page(repo, token, label, per_page, page)
+            yield current
+            nxt = current.links.get("next")
+        return
+
+    pool = ThreadPoolExecutor(max_workers=CLOUD_ISSUES_PREFETCH)
+    pending: deque = deque()
+    next_page = start_page + 1
+    planned_last = start_page + max(1, want_pages) - 1
+    try:
+        while next_page <= last or pending:
+            window = CLOUD_ISSUES_PREFETCH if next_page <= planned_last else 1
+            while next_page <= last and len(pending) < window:
+                pending.append(pool.submit(_fetch_issue_page, repo, token, label, per_page, next_page))
+                next_page += 1
+            yield pending.popleft().result()
+    finally:
+        # Consumer stopped early (limit reached or client disconnected).
+        for fut in pending:
+            fut.cancel()
+        pool.shutdown(wait=False)
+
+
+def _iter_cloud_issues(
+    repo: str, token: str | None, label: str, limit: int, cursor: Optional[str], etag: Optional[str] = None
+) -> Iterator[tuple[str, Any]]:
+    """Yield ("item", issue) up to `limit`, then ("cursor", next_cursor | None).
+
+    Yields a single ("not_modified", etag) if `etag` is given and still current.
+    """
+    page, per_page, skip = _decode_cursor(cursor, limit)
+    want_pages = -(-(skip + limit) // per_page)
+    pages = _iter_issue_pages(repo, token, label, per_page, page, etag, want_pages)
+    sent = 0
+    next_cursor: Optional[str] = None
+    try:
+        for current in pages:
+            if current.status == 304:
+                yield "not_modified", current.etag
+                return
+            if current.page == page and current.etag:
+                yield "etag", current.etag
+            offset = skip if current.page == page else 0
+            for i in range(offset, len(current.items)):
+                if sent >= limit:
+                    next_cursor = _encode_cursor(current.page, per_page, i)
+                    break
+                yield "item", current.items[i]
+                sent += 1
+            if next_cursor is not None:
+                break
+            if sent >= limit:
+                if current.links.get("next"):
+                    next_cursor = _encode_cursor(current.page + 1, per_page, 0)
+                break
+    finally:
+        pages.close()
+    yield "cursor", next_cursor
+
+
+def _fetch_cloud_issues(repo: str, token: str | None, label: str, limit: int, cursor: Optional[str], etag: Optional[str]):
+    """Fetcher for `issues_cache`: returns (value, etag), or (None, etag) on 304.
+
+    Conditional requests only apply to single-page results; a multi-page
+    listing cannot be validated by the first page's ETag alone.
+    """
+    single_page = cursor is None and limit <= 100
+    value: dict[str, Any] = {"items": [], "next_cursor": None}
+    new_etag: Optional[str] = None
+    for kind, data in _iter_cloud_issues(repo, token, label, limit, cursor, etag if single_page else None):
+        if kind == "not_modified":
+            return None, data
+        if kind == "etag":
+            new_etag = data
+        elif kind == "item":
+            value["items"].append(data)
+        elif kind == "cursor":
+            value["next_cursor"] = data
+    return value, (new_etag if single_page else None)
+
+
+# Dashboard reads of /cloud/issues: TTL + LRU with ETag revalidation and stale-while-revalidate.
+issues_cache = RevalidatingCache(
+    ttl_s=_env_int("CLOUD_ISSUES_CACHE_TTL_S", 60),
+    stale_ttl_s=_env_int("CLOUD_ISSUES_CACHE_STALE_S", 600),
+    max_entries=_env_int("CLOUD_ISSUES_CACHE_SIZE", 128),
+)
 
-    items = _github_request("GET", url, token, None)
-    out: list[dict[str, Any]] = []
-    for item in items or []:
-        if not isinstance(item, dict):
-            continue
-        if "pull_request" in item:
-            continue
-        labels = item.get("labels") or []
-        label_names: list[str] = []
-        for l in labels:
-            if isinstance(l, dict) and l.get("name"):
-                label_names.append(str(l.get("name")))
-
-        out.append(
-            {
-                "number": int(item.get("number")),
-                "title": str(item.get("title") or ""),
-                "body": str(item.get("body") or ""),
-                "labels": label_names,
-                "html_url": str(item.get("html_url") or ""),
-                "created_at": item.get("created_at"),
-            }
-        )
 
-    return {"repo": repo, "label": label, "items": out}
+@app.get("/cloud/issues", response_model=CloudIssuesResponse)
+def cloud_list_issues(
+    label: str = "cloud-save",
+    limit: int = 25,
+    cursor: Optional[str] = None,
+    fmt: str = Query("json", alias="format"),
+):
+    """Read Issues from GitHub (cloud DB) for dashboards.
+
+    Works without a token for public repos (rate-limited). If a token is
+    configured, it will use it. Responses are cached per (repo, label, limit,
+    cursor); see `issues_cache`.
+
+    Results past GitHub's 100-per-page cap are paginated: pass the returned
+    `next_cursor` back as `cursor`. With `format=ndjson` the issues stream back
+    one JSON object per line (memory stays flat); if more remain, the last
+    line is `{"next_cursor": "..."}`.
+    """
+    repo = _github_issues_repo()
+    token = _github_token_optional()
+
+    label = (label or "cloud-save").strip() or "cloud-save"
+    fmt = (fmt or "json").strip().lower()
+    if fmt not in {"json", "ndjson"}:
+        raise HTTPException(status_code=422, detail="format must be 'json' or 'ndjson'")
+    max_limit = CLOUD_ISSUES_MAX_NDJSON if fmt == "ndjson" else CLOUD_ISSUES_MAX_JSON
+    limit = min(max_limit, max(1, int(limit)))
+    _decode_cursor(cursor, limit)  # validate before any streaming starts
+
+    if fmt == "ndjson":
+        def lines() -> Iterator[bytes]:
+            for kind, data in _iter_cloud_issues(repo, token, label, limit, cursor):
+                if kind == "item":
+                    yield (json.dumps(data, ensure_ascii=False) + "\n").encode("utf-8")
+                elif kind == "cursor" and data:
+                    yield (json.dumps({"next_cursor": data}) + "\n").encode("utf-8")
+
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    value = issues_cache.get(
+        (repo, label, limit, cursor),
+        lambda etag: _fetch_cloud_issues(repo, token, label, limit, cursor, etag),
+    )
+    return {"repo": repo, "label": label, "items": value["items"], "next_cursor": value["next_cursor"]}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,458 @@
+"""Segmented feedback log with a compact binary index per segment.
+
+On-disk layout for `path = data/feedback.jsonl`:
+
+  data/feedback.jsonl             active segment (JSONL, appended in group commits)
+  data/feedback.jsonl.idx         index for the active segment
+  data/feedback.000001.jsonl      sealed segment (or `.jsonl.gz` / `.jsonl.zst` once compressed)
+  data/feedback.000001.idx        its index
+  data/feedback.000001.blk        block table (compressed segments only)
+
+The active segment is sealed (renamed to the next sequence number) once it
+passes `max_segment_bytes` or its first record is older than
+`max_segment_age_s`.
+
+Index files start with an 8-byte header (`FBIX`, version, entry size)
+followed by one fixed-size entry per record:
+
+  ts (int64) | offset (uint64) | length (uint32) | app crc32 (uint32) | vote (int8) | pad
+
+Offsets always refer to the *uncompressed* JSONL bytes. Compressed segments
+are written as a sequence of independent gzip members / zstd frames, cut on
+record boundaries, and the `.blk` table maps uncompressed block starts to
+compressed offsets. A lookup decompresses only the block that holds the
+record, so compression never invalidates the index. The concatenated output
+is still a valid `.gz`/`.zst` file for `zcat`/`zstdcat`.
+
+A query such as "thumbs-down for thermal-drift last week" reads the small
+index files, skips segments whose time range does not overlap, and seeks
+straight to the matching records.
+"""
+from __future__ import annotations
+
+import bisect
+import glob
+import gzip
+import json
+import os
+import re
+import struct
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator, Optional
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # noqa: BLE001
+    fcntl = None  # type: ignore
+
+try:
+    import zstandard  # type: ignore
+except Exception:  # noqa: BLE001
+    zstandard = None  # type: ignore
+
+
+INDEX_MAGIC = b"FBIX"
+INDEX_VERSION = 1
+INDEX_HEADER = struct.Struct("<4sHH")
+INDEX_ENTRY = struct.Struct("<qQIIb3x")
+BLOCK_ENTRY = struct.Struct("<QQ")
+
+COMPRESSED_SUFFIXES = {"gzip": ".gz", "zstd": ".zst"}
+DEFAULT_BLOCK_BYTES = 256 * 1024
+
+
+@contextmanager
+def file_lock(lock_path: str) -> Iterator[None]:
+    """Exclusive inter-process lock on `lock_path` (no-op without fcntl)."""
+    if fcntl is None:
+        yield
+        return
+    fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+def app_key(app: Optional[str]) -> int:
+    return zlib.crc32(app.encode("utf-8")) if app else 0
+
+
+def vote_code(thumbs_up: Optional[bool]) -> int:
+    return 1 if thumbs_up is True else (-1 if thumbs_up is False else 0)
+
+
+@dataclass
+class IndexEntry:
+    ts: int
+    offset: int
+    length: int
+    app_key: int
+    vote: int
+
+
+@dataclass
+class Segment:
+    seq: int  # active segment has the highest seq
+    data_path: str
+    index_path: str
+    codec: Optional[str] = None  # None (plain), "gzip" or "zstd"
+    active: bool = False
+
+    @property
+    def block_path(self) -> str:
+        return self.index_path[: -len(".idx")] + ".blk"
+
+
+def _read_index(index_path: str, start: int = 0) -> list[IndexEntry]:
+    """Read index entries from position `start` (an entry count) onwards."""
+    try:
+        with open(index_path, "rb") as f:
+            header = f.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size:
+                return []
+            magic, version, entry_size = INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION or entry_size != INDEX_ENTRY.size:
+                return []
+            if start:
+                f.seek(INDEX_HEADER.size + start * INDEX_ENTRY.size)
+            body = f.read()
+    except FileNotFoundError:
+        return []
+    usable = len(body) - (len(body) % INDEX_ENTRY.size)
+    return [IndexEntry(*fields) for fields in INDEX_ENTRY.iter_unpack(body[:usable])]
+
+
+def _index_bytes(entries: list[IndexEntry], with_header: bool) -> bytes:
+    parts = [INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, INDEX_ENTRY.size)] if with_header else []
+    parts.extend(INDEX_ENTRY.pack(e.ts, e.offset, e.length, e.app_key, e.vote) for e in entries)
+    return b"".join(parts)
+
+
+def _entry_for_line(line: bytes, offset: int) -> IndexEntry:
+    try:
+        rec = json.loads(line)
+    except ValueError:
+        rec = {}
+    if not isinstance(rec, dict):
+        rec = {}
+    ts = rec.get("ts")
+    return IndexEntry(
+        ts=int(ts) if isinstance(ts, (int, float)) else 0,
+        offset=offset,
+        length=len(line),
+        app_key=app_key(rec.get("app")),
+        vote=vote_code(rec.get("thumbs_up")),
+    )
+
+
+class _BlockReader:
+    """Random access into a block-compressed segment via its `.blk` table."""
+
+    def __init__(self, segment: Segment) -> None:
+        with open(segment.block_path, "rb") as f:
+            raw = f.read()
+        table = list(BLOCK_ENTRY.iter_unpack(raw))
+        self._ustarts = [u for u, _ in table]
+        self._cstarts = [c for _, c in table]
+        self._path = segment.data_path
+        self._codec = segment.codec
+        self._cached: tuple[int, bytes] = (-1, b"")
+
+    def _block(self, i: int) -> bytes:
+        if self._cached[0] == i:
+            return self._cached[1]
+        with open(self._path, "rb") as f:
+            f.seek(self._cstarts[i])
+            comp = f.read(self._cstarts[i + 1] - self._cstarts[i])
+        if self._codec == "zstd":
+            data = zstandard.ZstdDecompressor().decompress(comp)
+        else:
+            data = gzip.decompress(comp)
+        self._cached = (i, data)
+        return data
+
+    def read(self, offset: int, length: int) -> bytes:
+        i = bisect.bisect_right(self._ustarts, offset) - 1
+        data = self._block(i)
+        start = offset - self._ustarts[i]
+        return data[start:start + length]
+
+
+class FeedbackLog:
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_segment_bytes: int = 32 * 1024 * 1024,
+        max_segment_age_s: int = 0,
+        compress: Optional[str] = None,
+    ) -> None:
+        if compress and compress not in COMPRESSED_SUFFIXES:
+            raise ValueError(f"Unsupported codec: {compress} (use gzip or zstd)")
+        if compress == "zstd" and zstandard is None:
+            # Fail at start-up, not on the first rotation after records are already written.
+            raise RuntimeError("zstd compression requested but the 'zstandard' package is not installed")
+        self.path = path
+        self.max_segment_bytes = max(0, int(max_segment_bytes))
+        self.max_segment_age_s = max(0, int(max_segment_age_s))
+        self.compress = compress or None
+
+        base, ext = os.path.splitext(path)
+        self._base = base
+        self._ext = ext or ".jsonl"
+        self._sealed_re = re.compile(
+            re.escape(os.path.basename(base)) + r"\.(\d{6})" + re.escape(self._ext) + r"(\.gz|\.zst)?$"
+        )
+
+        self.segments_sealed = 0
+        self.segments_compressed = 0
+
+    @property
+    def index_path(self) -> str:
+        return self.path + ".idx"
+
+    @property
+    def lock_path(self) -> str:
+        return self.path + ".lock"
+
+    def _sealed_paths(self, seq: int) -> tuple[str, str]:
+        stem = f"{self._base}.{seq:06d}"
+        return stem + self._ext, stem + ".idx"
+
+    # -- listing ---------------------------------------------------------
+
+    def segments(self) -> list[Segment]:
+        """Sealed segments in order, followed by the active one.
+
+        While `compress_segment` swaps files, a seq briefly has both its
+        plain and compressed data file; the compressed one (complete once
+        it exists) wins so no record is listed twice.
+        """
+        by_seq: dict[int, Segment] = {}
+        pattern = glob.escape(self._base) + ".*" + self._ext + "*"
+        for candidate in glob.glob(pattern):
+            m = self._sealed_re.search(os.path.basename(candidate))
+            if not m:
+                continue
+            seq = int(m.group(1))
+            codec = {".gz": "gzip", ".zst": "zstd"}.get(m.group(2) or "")
+            if seq in by_seq and not codec:
+                continue
+            _, index_path = self._sealed_paths(seq)
+            by_seq[seq] = Segment(seq=seq, data_path=candidate, index_path=index_path, codec=codec)
+        out = sorted(by_seq.values(), key=lambda s: s.seq)
+        next_seq = (out[-1].seq + 1) if out else 1
+        out.append(Segment(seq=next_seq, data_path=self.path, index_path=self.index_path, active=True))
+        return out
+
+    # -- writing ---------------------------------------------------------
+
+    def append_batch(self, lines: list[tuple[bytes, IndexEntry]], fsync: bool = False) -> Optional[Segment]:
+        """Append a group commit to the active segment and index it.
+
+        `lines` holds the encoded JSONL line plus a partial index entry
+        (offset/length are filled in here). Returns the sealed segment if
+        this commit triggered a rotation.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with file_lock(self.lock_path):
+            self._repair_index()
+            with open(self.path, "ab") as data_f:
+                offset = data_f.tell()
+                entries: list[IndexEntry] = []
+                for line, entry in lines:
+                    entry.offset = offset
+                    entry.length = len(line)
+                    offset += len(line)
+                    entries.append(entry)
+                data_f.write(b"".join(line for line, _ in lines))
+                data_f.flush()
+                if fsync:
+                    os.fsync(data_f.fileno())
+            new_index = not os.path.exists(self.index_path)
+            with open(self.index_path, "ab") as idx_f:
+                idx_f.write(_index_bytes(entries, with_header=new_index))
+                idx_f.flush()
+                if fsync:
+                    os.fsync(idx_f.fileno())
+            if self._should_rotate(offset):
+                return self._seal()
+        return None
+
+    def ensure_indexed(self) -> None:
+        """Index any un-indexed tail of the active segment (e.g. a legacy file)."""
+        if os.path.exists(self.path):
+            with file_lock(self.lock_path):
+                self._repair_index()
+
+    def _repair_index(self) -> None:
+        """Index any bytes the active index does not cover (legacy files, crashes)."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        covered = 0
+        have_header = False
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as f:
+                have_header = len(f.read(INDEX_HEADER.size)) == INDEX_HEADER.size
+                idx_size = os.path.getsize(self.index_path)
+                n = (idx_size - INDEX_HEADER.size) // INDEX_ENTRY.size if have_header else 0
+                if n:
+                    f.seek(INDEX_HEADER.size + (n - 1) * INDEX_ENTRY.size)
+                    last = IndexEntry(*INDEX_ENTRY.unpack(f.read(INDEX_ENTRY.size)))
+                    covered = last.offset + last.length
+                if have_header and idx_size != INDEX_HEADER.size + n * INDEX_ENTRY.size:
+                    # Torn write of the last entry: drop the partial bytes.
+                    os.truncate(self.index_path, INDEX_HEADER.size + n * INDEX_ENTRY.size)
+        if covered >= size and have_header:
+            return
+        entries: list[IndexEntry] = []
+        with open(self.path, "rb") as f:
+            f.seek(covered)
+            offset = covered
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                entries.append(_entry_for_line(line, offset))
+                offset += len(line)
+        with open(self.index_path, "ab") as idx_f:
+            idx_f.write(_index_bytes(entries, with_header=not have_header))
+
+    def _should_rotate(self, size: int) -> bool:
+        if self.max_segment_bytes and size >= self.max_segment_bytes:
+            return True
+        if self.max_segment_age_s:
+            with open(self.index_path, "rb") as f:
+                f.seek(INDEX_HEADER.size)
+                raw = f.read(INDEX_ENTRY.size)
+            if len(raw) == INDEX_ENTRY.size:
+                first_ts = INDEX_ENTRY.unpack(raw)[0]
+                return bool(first_ts) and time.time() - first_ts >= self.max_segment_age_s
+        return False
+
+    def _seal(self) -> Segment:
+        seq = self.segments()[-1].seq
+        data_path, index_path = self._sealed_paths(seq)
+        # Index first: a reader that sees the sealed data file always finds its index.
+        os.replace(self.index_path, index_path)
+        os.replace(self.path, data_path)
+        self.segments_sealed += 1
+        return Segment(seq=seq, data_path=data_path, index_path=index_path)
+
+    def compress_segment(self, segment: Segment, codec: Optional[str] = None, block_bytes: int = DEFAULT_BLOCK_BYTES) -> Segment:
+        """Rewrite a sealed plain segment as independently compressed blocks."""
+        codec = codec or self.compress or "gzip"
+        if segment.active or segment.codec:
+            return segment
+        if codec == "zstd" and zstandard is None:
+            raise RuntimeError("zstd compression requested but the 'zstandard' package is not installed")
+        entries = _read_index(segment.index_path)
+        out_path = segment.data_path + COMPRESSED_SUFFIXES[codec]
+        compressed = Segment(seq=segment.seq, data_path=out_path, index_path=segment.index_path, codec=codec)
+        compressor = zstandard.ZstdCompressor() if codec == "zstd" else None
+
+        table: list[tuple[int, int]] = []
+        with open(segment.data_path, "rb") as src, open(out_path + ".tmp", "wb") as dst:
+            ustart = 0
+            pending = b""
+            # Cut blocks only at record ends so a record never spans two blocks.
+            cuts = [e.offset + e.length for e in entries]
+            target = block_bytes
+            for end in cuts + [None]:
+                if end is not None and end - ustart < target:
+                    continue
+                if end is None:
+                    pending = src.read()
+                    end = ustart + len(pending)
+                else:
+                    pending = src.read(end - ustart)
+                if not pending:
+                    break
+                table.append((ustart, dst.tell()))
+                dst.write(compressor.compress(pending) if compressor else gzip.compress(pending))
+                ustart = end
+            table.append((ustart, dst.tell()))
+        with open(compressed.block_path + ".tmp", "wb") as f:
+            f.write(b"".join(BLOCK_ENTRY.pack(u, c) for u, c in table))
+        os.replace(compressed.block_path + ".tmp", compressed.block_path)
+        os.replace(out_path + ".tmp", out_path)
+        os.remove(segment.data_path)
+        self.segments_compressed += 1
+        return compressed
+
+    # -- reading ---------------------------------------------------------
+
+    def read_entries(self, segment: Segment, start: int = 0) -> list[IndexEntry]:
+        return _read_index(segment.index_path, start)
+
+    def iter_raw(self, segment: Segment, entries: list[IndexEntry]) -> Iterator[bytes]:
+        """Yield the JSONL lines for `entries` (which must belong to `segment`)."""
+        if not entries:
+            return
+        if segment.codec:
+            reader = _BlockReader(segment)
+            for e in entries:
+                yield reader.read(e.offset, e.length)
+            return
+        try:
+            f = open(segment.data_path, "rb")
+        except FileNotFoundError:
+            return
+        with f:
+            for e in entries:
+                f.seek(e.offset)
+                yield f.read(e.length)
+
+    def query(
+        self,
+        *,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        app: Optional[str] = None,
+        thumbs_up: Optional[bool] = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield records matching all given filters, oldest segment first."""
+        want_app = app_key(app) if app else None
+        want_vote = vote_code(thumbs_up) if thumbs_up is not None else None
+        for segment in self.segments():
+            entries = self.read_entries(segment)
+            if not entries:
+                continue
+            if since is not None and max(e.ts for e in entries) < since:
+                continue
+            if until is not None and min(e.ts for e in entries) > until:
+                continue
+            matches = [
+                e for e in entries
+                if (since is None or e.ts >= since)
+                and (until is None or e.ts <= until)
+                and (want_app is None or e.app_key == want_app)
+                and (want_vote is None or e.vote == want_vote)
+            ]
+            for raw in self.iter_raw(segment, matches):
+                try:
+                    rec = json.loads(raw)
+                except ValueError:
+                    continue
+                # crc32 buckets can collide; confirm on the decoded record.
+                if app and rec.get("app") != app:
+                    continue
+                yield rec
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "max_segment_bytes": self.max_segment_bytes,
+            "max_segment_age_s": self.max_segment_age_s,
+            "compress": self.compress,
+            "segments_sealed": self.segments_sealed,
+            "segments_compressed": self.segments_compressed,
+        }
@@ -9,35 +9,57 @@ pipeline later.
 from __future__ import annotations
 
 import re
-from typing import List, Dict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+EASY_KEYWORDS = ("typo", "spelling", "grammar", "fix text", "small bug", "ui", "ux", "minor")
+MEDIUM_KEYWORDS = ("new level", "more levels", "sound", "music", "leaderboard", "save", "multiplayer", "settings")
+HARD_KEYWORDS = ("rewrite", "new engine", "rework", "backend", "architecture", "scale", "refactor")
+
+# Inputs are cut to this many characters before any splitting or regex work.
+MAX_FEEDBACK_CHARS = 8000
+# Fragments shorter than this (after normalization) are merged into the next one.
+MIN_SUGGESTION_CHARS = 15
+# Anything past this many suggestions is folded into the last one.
+MAX_SUGGESTIONS = 10
+
+# A sentence/clause terminator followed by whitespace, or a blank line. Neither
+# branch can backtrack into itself, so a split is one linear scan of the input.
+_BREAK_RE = re.compile(r"(?<=[.!?;])\s+|\n[^\S\n]*\n\s*")
+
+# (" .", ".") etc.: after whitespace is collapsed, a space before punctuation is always a single " ".
+_SPACED_PUNCT = tuple((" " + p, p) for p in ".,!?;:")
+
+# Built once at import. CPython's substring search is a tight C loop, and on
+# feedback-sized strings (and multi-kilobyte ones) a short run of `in` scans
+# beats a combined alternation regex, so categorize() keeps the scans and only
+# drops the per-call list building.
+_TIERED_KEYWORDS = (("easy", EASY_KEYWORDS), ("medium", MEDIUM_KEYWORDS), ("hard", HARD_KEYWORDS))
 
 
 def normalize_text(text: str) -> str:
     """Normalize whitespace and fix common punctuation spacing."""
     if not text:
         return ""
-    s = text.strip()
-    s = re.sub(r"\s+", " ", s)
-    s = re.sub(r"\s+([.,!?;:])", r"\1", s)
+    # str.split() splits on exactly the characters regex `\s` matches, and also strips.
+    s = " ".join(text.split())
+    for spaced, punct in _SPACED_PUNCT:
+        if spaced in s:
+            s = s.replace(spaced, punct)
     return s
 
 
 def categorize(text: str) -> str:
-    """Heuristic categorization into 'easy', 'medium', 'hard'."""
+    """Heuristic categorization into 'easy', 'medium', 'hard'.
+
+    Any easy keyword wins over medium ones, and medium over hard; with no
+    keyword the length decides.
+    """
     t = text.lower()
-    easy_keywords = ["typo", "spelling", "grammar", "fix text", "small bug", "ui", "ux", "minor"]
-    medium_keywords = ["new level", "more levels", "sound", "music", "leaderboard", "save", "multiplayer", "settings"]
-    hard_keywords = ["rewrite", "new engine", "rework", "backend", "architecture", "scale", "refactor"]
-
-    for kw in easy_keywords:
-        if kw in t:
-            return "easy"
-    for kw in medium_keywords:
-        if kw in t:
-            return "medium"
-    for kw in hard_keywords:
-        if kw in t:
-            return "hard"
+    for tier, keywords in _TIERED_KEYWORDS:
+        for kw in keywords:
+            if kw in t:
+                return tier
     # fallback: length-based heuristic
     if len(t) < 60:
         return "easy"
@@ -46,19 +68,121 @@ def categorize(text: str) -> str:
     return "hard"
 
 
+def confidence(text: str) -> float:
+    """Shorter/clearer suggestions get higher confidence (0.5..0.99, 2 decimals)."""
+    return round(max(0.5, min(0.99, 1.0 - (len(text) / 1000))), 2)
+
+
+def split_suggestions(text: str) -> List[str]:
+    """Split feedback into normalized sentence/clause suggestions.
+
+    Input is capped at `MAX_FEEDBACK_CHARS` first. Fragments are kept as spans
+    of the (capped) input and merged by extending spans, so each suggestion is
+    `normalize_text` of one contiguous slice; a single sentence comes back
+    exactly as `normalize_text(text)`.
+    """
+    text = text[:MAX_FEEDBACK_CHARS]
+    spans: List[Tuple[int, int]] = []
+    start = 0
+    for m in _BREAK_RE.finditer(text):
+        spans.append((start, m.start()))
+        start = m.end()
+    spans.append((start, len(text)))
+
+    kept: List[Tuple[int, int]] = []
+    pending: Optional[int] = None  # start of a too-short fragment waiting for the next one
+    for a, b in spans:
+        if pending is not None:
+            a, pending = pending, None
+        s = normalize_text(text[a:b])
+        if not s:
+            continue
+        if len(s) < MIN_SUGGESTION_CHARS:
+            pending = a
+            continue
+        kept.append((a, b))
+    if pending is not None:
+        if kept:
+            kept[-1] = (kept[-1][0], len(text))
+        else:
+            kept.append((pending, len(text)))
+    if len(kept) > MAX_SUGGESTIONS:
+        kept[MAX_SUGGESTIONS - 1 :] = [(kept[MAX_SUGGESTIONS - 1][0], kept[-1][1])]
+    return [normalize_text(text[a:b]) for a, b in kept]
+
+
+def _suggestion_rows(raw: str) -> List[Tuple[str, str, float]]:
+    return [(s, categorize(s), confidence(s)) for s in split_suggestions(raw or "")]
+
+
 def process_feedback(raw: str) -> List[Dict]:
     """Return a list of suggestion dicts with normalized text, category and confidence.
 
-    Currently returns a single suggestion per input string. Later this can split
-    multi-suggestions, apply LLM paraphrasing, or call an external classifier.
+    Long feedback is split into one suggestion per sentence/clause (see
+    `split_suggestions`). Later this can apply LLM paraphrasing or call an
+    external classifier.
     """
-    s = normalize_text(raw)
-    if not s:
-        return []
-    cat = categorize(s)
-    # Confidence heuristic: shorter/clearer suggestions get higher confidence
-    conf = max(0.5, min(0.99, 1.0 - (len(s) / 1000)))
-    return [{"text": s, "category": cat, "confidence": round(conf, 2)}]
+    return [{"text": t, "category": c, "confidence": conf} for t, c, conf in _suggestion_rows(raw)]
+
+
+BATCH_COLUMNS = ("index", "text", "category", "confidence")
+# Below this many texts a process pool costs more (spawn + pickling) than it saves.
+MIN_TEXTS_PER_WORKER = 5000
+
+
+def _batch_chunk(args: Tuple[int, Sequence[str]]) -> Dict[str, list]:
+    offset, texts = args
+    index: List[int] = []
+    text: List[str] = []
+    category: List[str] = []
+    conf: List[float] = []
+    rows = _suggestion_rows
+    for i, raw in enumerate(texts, offset):
+        for t, c, f in rows(raw):
+            index.append(i)
+            text.append(t)
+            category.append(c)
+            conf.append(f)
+    return {"index": index, "text": text, "category": category, "confidence": conf}
+
+
+def process_feedback_batch(texts: Sequence[str], *, workers: Optional[int] = None, as_numpy: bool = False):
+    """Score many feedback strings in one call and return columns instead of dicts.
+
+    The result is `{"index": [...], "text": [...], "category": [...], "confidence": [...]}`
+    with one entry per suggestion; `index` points back into `texts` (empty inputs
+    produce no rows). Row for row it equals `process_feedback(texts[index])`.
+
+    `workers > 1` fans large inputs out over a process pool (chunks stay in
+    order). `as_numpy=True` returns a NumPy structured array with the same fields.
+    """
+    texts = list(texts)
+    workers = min(int(workers or 1), max(1, len(texts) // MIN_TEXTS_PER_WORKER))
+    if workers <= 1:
+        cols = _batch_chunk((0, texts))
+    else:
+        size = -(-len(texts) // workers)
+        chunks = [(start, texts[start : start + size]) for start in range(0, len(texts), size)]
+        cols = {name: [] for name in BATCH_COLUMNS}
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for part in pool.map(_batch_chunk, chunks):
+                for name in BATCH_COLUMNS:
+                    cols[name].extend(part[name])
+
+    if not as_numpy:
+        return cols
+    try:
+        # Imported lazily: the API imports this module and never needs NumPy.
+        import numpy as np  # type: ignore
+    except Exception:
+        raise RuntimeError("as_numpy=True requires the 'numpy' package") from None
+    out = np.empty(
+        len(cols["index"]),
+        dtype=[("index", np.int64), ("text", object), ("category", "U6"), ("confidence", np.float64)],
+    )
+    for name in BATCH_COLUMNS:
+        out[name] = cols[name]
+    return out
 
 
 if __name__ == "__main__":
@@ -0,0 +1,128 @@
+"""In-memory feedback aggregates for `/feedback/stats`.
+
+The aggregator keeps hourly buckets of counts keyed by (app, category, vote).
+It is built by one streaming pass over the feedback log and then kept up to
+date incrementally: it remembers how far into the log it has read (segment
+sequence number + index entry count) and each `refresh()` only reads records
+appended since then. That also picks up records written by other uvicorn
+workers, because they all share the same log.
+
+Time windows are answered by summing the hourly buckets, so a request never
+rescans the JSONL.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from collections import Counter, defaultdict
+from typing import Any, Optional
+
+from examples.feedback_log import FeedbackLog
+
+BUCKET_SECONDS = 3600
+
+
+def _vote_label(thumbs_up: Any) -> str:
+    return "up" if thumbs_up is True else ("down" if thumbs_up is False else "none")
+
+
+class FeedbackAggregator:
+    def __init__(self, log: FeedbackLog) -> None:
+        self.log = log
+        self._lock = threading.Lock()
+        self._buckets: dict[int, Counter] = defaultdict(Counter)
+        self._seq = 0  # next segment to read from
+        self._count = 0  # index entries already consumed in that segment
+        self._rebuilt = False
+        self.records = 0
+
+    def _ingest(self, raw: bytes) -> None:
+        try:
+            rec = json.loads(raw)
+        except ValueError:
+            return
+        if not isinstance(rec, dict):
+            return
+        ts = rec.get("ts")
+        if not isinstance(ts, (int, float)):
+            return
+        key = (
+            rec.get("app") or "(unknown)",
+            rec.get("category") or "uncategorized",
+            _vote_label(rec.get("thumbs_up")),
+        )
+        self._buckets[int(ts) - int(ts) % BUCKET_SECONDS][key] += 1
+        self.records += 1
+
+    def refresh(self) -> int:
+        """Read records appended since the last refresh. Returns how many were added."""
+        with self._lock:
+            if not self._rebuilt:
+                # Legacy or crashed files may have an un-indexed tail.
+                self.log.ensure_indexed()
+                self._rebuilt = True
+            before = self.records
+            for segment in self.log.segments():
+                if segment.seq < self._seq:
+                    continue
+                start = self._count if segment.seq == self._seq else 0
+                entries = self.log.read_entries(segment, start)
+                consumed = 0
+                for raw in self.log.iter_raw(segment, entries):
+                    self._ingest(raw)
+                    consumed += 1
+                if segment.active or consumed < len(entries):
+                    # Either caught up, or the segment was rotated/compressed under us;
+                    # resume from here next time.
+                    self._seq, self._count = segment.seq, start + consumed
+                    break
+                self._seq, self._count = segment.seq + 1, 0
+            return self.records - before
+
+    def query(
+        self,
+        *,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        app: Optional[str] = None,
+        bucket_seconds: Optional[int] = None,
+    ) -> dict[str, Any]:
+        """Aggregate counts over [since, until] (hour-aligned), optionally per bucket."""
+        total = 0
+        by_app: Counter = Counter()
+        by_category: Counter = Counter()
+        by_vote: Counter = Counter({"up": 0, "down": 0, "none": 0})
+        series: dict[int, Counter] = defaultdict(Counter)
+        with self._lock:
+            for start, counts in self._buckets.items():
+                if since is not None and start + BUCKET_SECONDS <= since:
+                    continue
+                if until is not None and start > until:
+                    continue
+                for (rec_app, category, vote), n in counts.items():
+                    if app is not None and rec_app != app:
+                        continue
+                    total += n
+                    by_app[rec_app] += n
+                    by_category[category] += n
+                    by_vote[vote] += n
+                    if bucket_seconds:
+                        point = series[start - start % bucket_seconds]
+                        point["total"] += n
+                        point[vote] += n
+        out: dict[str, Any] = {
+            "total": total,
+            "by_app": dict(by_app.most_common()),
+            "by_category": dict(by_category.most_common()),
+            "by_vote": dict(by_vote),
+        }
+        if bucket_seconds:
+            out["series"] = [
+                {"start": start, "total": c["total"], "up": c["up"], "down": c["down"], "none": c["none"]}
+                for start, c in sorted(series.items())
+            ]
+        return out
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {"records": self.records, "buckets": len(self._buckets), "position": [self._seq, self._count]}
@@ -0,0 +1,241 @@
+"""Buffered JSONL feedback store with group commits.
+
+`/feedback` used to reopen `FEEDBACK_STORE_PATH` for every request. This
+store keeps records in memory and writes them in batches ("group commits")
+once `max_batch` records are pending or `flush_interval_s` has elapsed,
+whichever comes first. Each commit is a single `write()` of all pending
+lines, optionally followed by `fsync`.
+
+Several uvicorn workers may share the same file, so every commit holds an
+exclusive `flock` on a sidecar `<path>.lock` file. That keeps batches from
+interleaving mid-line and gives a total order of batches across processes.
+On platforms without `fcntl` the lock is skipped (single-writer only).
+
+Commits go through `examples.feedback_log.FeedbackLog`, which indexes each
+record and rolls the file into bounded (optionally compressed) segments.
+Compression is a separate step after the commit: if it fails the segment
+stays plain (still readable) and is retried later; the batch is never
+written again.
+
+`append()` normally only buffers and wakes a background flusher thread.
+Once `max_pending` records are waiting (the flusher is behind) it writes
+inline, so async callers should run it off the event loop. If the disk
+keeps failing, records past `max_buffered` are dropped and counted rather
+than growing the buffer without bound.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import threading
+import time
+from typing import Any, Optional
+
+from examples.feedback_log import FeedbackLog, IndexEntry, Segment, app_key, vote_code
+
+logger = logging.getLogger(__name__)
+
+# Minimum delay before retrying a sealed segment whose compression failed.
+COMPRESS_RETRY_S = 60.0
+
+
+class FeedbackStore:
+    def __init__(
+        self,
+        path: str,
+        *,
+        max_batch: int = 64,
+        flush_interval_s: float = 0.5,
+        fsync: bool = False,
+        max_segment_bytes: int = 32 * 1024 * 1024,
+        max_segment_age_s: int = 0,
+        compress: Optional[str] = None,
+        max_buffered: Optional[int] = None,
+    ) -> None:
+        self.path = path
+        self.log = FeedbackLog(
+            path,
+            max_segment_bytes=max_segment_bytes,
+            max_segment_age_s=max_segment_age_s,
+            compress=compress,
+        )
+        self.max_batch = max(1, int(max_batch))
+        self.flush_interval_s = max(0.01, float(flush_interval_s))
+        self.fsync = bool(fsync)
+        # Past this many pending records, append() flushes inline (disk is stalled).
+        self.max_pending = self.max_batch * 16
+        # Hard cap on memory while flushes keep failing; new records past it are dropped.
+        self.max_buffered = max(self.max_pending, int(max_buffered or self.max_pending * 4))
+
+        self._buffer: list[tuple[bytes, IndexEntry]] = []
+        self._buffer_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        # Sealed segments still waiting to be compressed (guarded by _flush_lock).
+        self._uncompressed: list[Segment] = []
+        self._next_compress_at = 0.0
+
+        self.flushes = 0
+        self.records_written = 0
+        self.errors = 0
+        self.dropped = 0
+        self.compress_errors = 0
+        self.last_batch_size = 0
+        self.max_batch_size = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    def _ensure_thread(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(target=self._run, name="feedback-store-flusher", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval_s)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:  # noqa: BLE001
+                # Counted in self.errors; keep the flusher alive.
+                pass
+
+    def append(self, record: dict[str, Any]) -> bool:
+        """Buffer `record`; return False if it was dropped because the buffer is full."""
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        ts = record.get("ts")
+        entry = IndexEntry(
+            ts=int(ts) if isinstance(ts, (int, float)) else int(time.time()),
+            offset=0,
+            length=0,
+            app_key=app_key(record.get("app")),
+            vote=vote_code(record.get("thumbs_up")),
+        )
+        with self._buffer_lock:
+            if len(self._buffer) >= self.max_buffered:
+                self.dropped += 1
+                return False
+            self._buffer.append((line, entry))
+            pending = len(self._buffer)
+        if pending >= self.max_pending or self._closed:
+            # Closed stores (e.g. after app shutdown) degrade to write-through.
+            self.flush()
+            return True
+        self._ensure_thread()
+        if pending >= self.max_batch:
+            self._wake.set()
+        return True
+
+    def flush(self) -> int:
+        """Write all pending records as one batch. Returns the batch size."""
+        with self._flush_lock:
+            with self._buffer_lock:
+                batch, self._buffer = self._buffer, []
+            if not batch:
+                self._compress_sealed()
+                return 0
+            start = time.monotonic()
+            try:
+                sealed = self.log.append_batch(batch, fsync=self.fsync)
+            except Exception:
+                self.errors += 1
+                # Nothing was committed: put the batch back in front so nothing is lost or reordered.
+                with self._buffer_lock:
+                    self._buffer[:0] = batch
+                raise
+            ms = (time.monotonic() - start) * 1000.0
+            self.flushes += 1
+            self.records_written += len(batch)
+            self.last_batch_size = len(batch)
+            self.max_batch_size = max(self.max_batch_size, len(batch))
+            self.last_flush_ms = ms
+            self.max_flush_ms = max(self.max_flush_ms, ms)
+            self._total_flush_ms += ms
+            if sealed is not None and self.log.compress:
+                self._uncompressed.append(sealed)
+                self._next_compress_at = 0.0
+            self._compress_sealed()
+            return len(batch)
+
+    def _compress_sealed(self) -> None:
+        """Compress segments sealed by earlier commits; failures are logged and retried later.
+
+        Runs outside the log's write lock: writers have already moved on to
+        the new active segment.
+        """
+        if not self._uncompressed or time.monotonic() < self._next_compress_at:
+            return
+        while self._uncompressed:
+            segment = self._uncompressed[0]
+            try:
+                self.log.compress_segment(segment)
+            except Exception:  # noqa: BLE001
+                self.compress_errors += 1
+                self._next_compress_at = time.monotonic() + COMPRESS_RETRY_S
+                logger.warning("compressing %s failed; will retry", segment.data_path, exc_info=True)
+                return
+            self._uncompressed.pop(0)
+
+    def pending(self) -> int:
+        with self._buffer_lock:
+            return len(self._buffer)
+
+    def close(self) -> None:
+        self._closed = True
+        self._wake.set()
+        try:
+            self.flush()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "pending": self.pending(),
+            "flushes": self.flushes,
+            "records_written": self.records_written,
+            "errors": self.errors,
+            "dropped": self.dropped,
+            "compress_errors": self.compress_errors,
+            "uncompressed_segments": len(self._uncompressed),
+            "fsync": self.fsync,
+            "log": self.log.stats(),
+            "batch_size": {
+                "last": self.last_batch_size,
+                "max": self.max_batch_size,
+                "avg": round(self.records_written / self.flushes, 2) if self.flushes else 0.0,
+            },
+            "flush_ms": {
+                "last": round(self.last_flush_ms, 3),
+                "max": round(self.max_flush_ms, 3),
+                "avg": round(self._total_flush_ms / self.flushes, 3) if self.flushes else 0.0,
+            },
+        }
+
+
+_stores: dict[str, FeedbackStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path: str, **kwargs: Any) -> FeedbackStore:
+    """Return the process-wide store for `path` (one flusher per file)."""
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = FeedbackStore(path, **kwargs)
+            _stores[path] = store
+        return store
+
+
+def close_all() -> None:
+    with _stores_lock:
+        stores = list(_stores.values())
+    for store in stores:
+        store.close()
+
+
+atexit.register(close_all)
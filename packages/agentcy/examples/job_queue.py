@@ -0,0 +1,198 @@
+"""Bounded asyncio job queue for fire-and-forget side effects.
+
+The feedback API uses this to mirror submissions into GitHub Issues without
+holding the HTTP request open: handlers enqueue a job and return right away,
+and a small pool of worker tasks runs the (blocking) job in a thread with
+retries and exponential backoff.
+
+Queue depth and per-job latency are tracked so `/metrics` can show when the
+queue backs up.
+"""
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+
+# Upper bound on how long a job waits when the server asks for a Retry-After.
+MAX_RETRY_AFTER_S = 120.0
+
+
+def _always_retry(exc: BaseException) -> bool:
+    return True
+
+
+@dataclass
+class _Job:
+    fn: Callable[[], Any]
+    on_done: Optional[Callable[[Any], None]]
+    enqueued_at: float
+    retryable: Optional[Callable[[BaseException], bool]] = None
+    on_error: Optional[Callable[[BaseException], None]] = None
+    attempts: int = 0
+
+
+class AsyncJobQueue:
+    """A bounded queue drained by `workers` asyncio tasks.
+
+    Jobs are plain callables; they run via `asyncio.to_thread` so blocking
+    network clients are fine. When the queue is full, `submit` drops the job
+    (and counts it) instead of applying backpressure to the request path.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        maxsize: int = 100,
+        workers: int = 2,
+        max_attempts: int = 3,
+        backoff_s: float = 0.5,
+        retryable: Callable[[BaseException], bool] = _always_retry,
+    ) -> None:
+        self.name = name
+        self.maxsize = max(1, int(maxsize))
+        self.workers = max(1, int(workers))
+        self.max_attempts = max(1, int(max_attempts))
+        self.backoff_s = max(0.0, float(backoff_s))
+        self.retryable = retryable
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: list[asyncio.Task] = []
+
+        self.enqueued = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.retries = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self._total_latency_ms = 0.0
+
+    def _ensure_started(self) -> asyncio.Queue:
+        loop = asyncio.get_running_loop()
+        if self._queue is None or self._loop is not loop:
+            # (Re)bind to the current loop. This matters for test clients that
+            # spin up a fresh loop per request; in production it runs once.
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.maxsize)
+            self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        return self._queue
+
+    def submit(
+        self,
+        fn: Callable[[], Any],
+        on_done: Optional[Callable[[Any], None]] = None,
+        *,
+        retryable: Optional[Callable[[BaseException], bool]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+    ) -> bool:
+        """Enqueue `fn`; return False if the queue is full and the job was dropped.
+
+        `retryable` overrides the queue's policy for this job, e.g. for a
+        non-idempotent request that must not be resent after a timeout.
+        `on_error` gets the last exception once the job has given up.
+        """
+        queue = self._ensure_started()
+        job = _Job(fn=fn, on_done=on_done, enqueued_at=time.monotonic(), retryable=retryable, on_error=on_error)
+        try:
+            queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        return True
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job: _Job = await queue.get()
+            try:
+                await self._run(job)
+            finally:
+                queue.task_done()
+
+    async def _run(self, job: _Job) -> None:
+        while True:
+            job.attempts += 1
+            try:
+                result = await asyncio.to_thread(job.fn)
+            except Exception as exc:  # noqa: BLE001
+                retryable = job.retryable or self.retryable
+                if job.attempts < self.max_attempts and retryable(exc):
+                    self.retries += 1
+                    delay = self.backoff_s * (2 ** (job.attempts - 1))
+                    # Honor a server-provided wait (e.g. GitHub's Retry-After), within reason.
+                    retry_after = getattr(exc, "retry_after", None)
+                    if isinstance(retry_after, (int, float)):
+                        delay = max(delay, min(float(retry_after), MAX_RETRY_AFTER_S))
+                    await asyncio.sleep(delay)
+                    continue
+                self.failed += 1
+                self._record_latency(job)
+                if job.on_error is not None:
+                    try:
+                        job.on_error(exc)
+                    except Exception:  # noqa: BLE001
+                        pass
+                return
+            self.completed += 1
+            self._record_latency(job)
+            if job.on_done is not None:
+                try:
+                    job.on_done(result)
+                except Exception:  # noqa: BLE001
+                    pass
+            return
+
+    def _record_latency(self, job: _Job) -> None:
+        ms = (time.monotonic() - job.enqueued_at) * 1000.0
+        self.last_latency_ms = ms
+        self.max_latency_ms = max(self.max_latency_ms, ms)
+        self._total_latency_ms += ms
+
+    def depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def join(self, timeout: Optional[float] = None) -> bool:
+        """Wait until all queued jobs are done. Returns False on timeout."""
+        if self._queue is None:
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Drain (best effort) and cancel the worker tasks."""
+        if self._queue is not None and self._loop is asyncio.get_running_loop():
+            await self.join(timeout=timeout)
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        self._queue = None
+        self._loop = None
+
+    def stats(self) -> dict[str, Any]:
+        done = self.completed + self.failed
+        return {
+            "name": self.name,
+            "depth": self.depth(),
+            "maxsize": self.maxsize,
+            "workers": self.workers,
+            "enqueued": self.enqueued,
+            "completed": self.completed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+            "retries": self.retries,
+            "latency_ms": {
+                "last": round(self.last_latency_ms, 2),
+                "max": round(self.max_latency_ms, 2),
+                "avg": round(self._total_latency_ms / done, 2) if done else 0.0,
+            },
+        }
@@ -0,0 +1,156 @@
+"""TTL + LRU response cache with ETag revalidation and stale-while-revalidate.
+
+Used in front of `/cloud/issues` so dashboard loads stop spending the GitHub
+rate limit:
+
+- Fresh entries (younger than `ttl_s`) are served from memory.
+- Expired entries still inside `stale_ttl_s` are served immediately while one
+  background thread revalidates them, so a refresh never blocks a reader.
+- Revalidation sends the stored ETag as `If-None-Match`; a 304 just extends
+  the entry (GitHub does not charge 304s against the rate limit).
+- Anything older, or missing, is fetched synchronously. Concurrent misses for
+  the same key share one fetch.
+
+The fetcher is a callable `fetch(etag) -> (value, etag)`; it returns
+`value=None` when the upstream answered 304 Not Modified.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Hashable, Iterator, Optional
+
+Fetcher = Callable[[Optional[str]], "tuple[Any, Optional[str]]"]
+
+
+@dataclass
+class _Entry:
+    value: Any
+    etag: Optional[str]
+    fetched_at: float
+    refreshing: bool = False
+
+
+class RevalidatingCache:
+    def __init__(self, *, ttl_s: float = 60.0, stale_ttl_s: float = 600.0, max_entries: int = 128) -> None:
+        self.ttl_s = max(0.0, float(ttl_s))
+        self.stale_ttl_s = max(self.ttl_s, float(stale_ttl_s))
+        self.max_entries = max(1, int(max_entries))
+
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        # key -> [lock, threads using it]; only keys with a miss in flight have one.
+        self._key_locks: dict[Hashable, list] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.not_modified = 0
+        self.background_refreshes = 0
+        self.errors = 0
+        self.evictions = 0
+
+    @contextmanager
+    def _key_lock(self, key: Hashable) -> Iterator[None]:
+        """Serialize misses for `key`; the lock is dropped once no thread uses it.
+
+        Keys come from client query params, so a lock that outlived a failed
+        fetch would leak one entry per distinct bad request.
+        """
+        with self._lock:
+            slot = self._key_locks.get(key)
+            if slot is None:
+                slot = self._key_locks[key] = [threading.Lock(), 0]
+            slot[1] += 1
+        try:
+            with slot[0]:
+                yield
+        finally:
+            with self._lock:
+                slot[1] -= 1
+                if slot[1] == 0:
+                    del self._key_locks[key]
+
+    def _store(self, key: Hashable, value: Any, etag: Optional[str]) -> None:
+        with self._lock:
+            self._entries[key] = _Entry(value=value, etag=etag, fetched_at=time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def _revalidate(self, key: Hashable, fetch: Fetcher, entry: Optional[_Entry]) -> Any:
+        value, etag = fetch(entry.etag if entry is not None else None)
+        if value is None and entry is not None:
+            # 304 Not Modified: keep the body, restart the TTL.
+            with self._lock:
+                self.not_modified += 1
+            self._store(key, entry.value, etag or entry.etag)
+            return entry.value
+        self._store(key, value, etag)
+        return value
+
+    def _background_refresh(self, key: Hashable, fetch: Fetcher, entry: _Entry) -> None:
+        try:
+            self._revalidate(key, fetch, entry)
+        except Exception:  # noqa: BLE001
+            with self._lock:
+                self.errors += 1
+                entry.refreshing = False
+
+    def get(self, key: Hashable, fetch: Fetcher) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                age = now - entry.fetched_at
+                if age < self.ttl_s:
+                    self.hits += 1
+                    return entry.value
+                if age < self.stale_ttl_s:
+                    self.stale_hits += 1
+                    if not entry.refreshing:
+                        entry.refreshing = True
+                        self.background_refreshes += 1
+                        threading.Thread(
+                            target=self._background_refresh, args=(key, fetch, entry), daemon=True
+                        ).start()
+                    return entry.value
+
+        with self._key_lock(key):
+            # Another thread may have filled the entry while we waited.
+            with self._lock:
+                current = self._entries.get(key)
+                if current is not None and current is not entry and time.monotonic() - current.fetched_at < self.ttl_s:
+                    self.hits += 1
+                    return current.value
+                self.misses += 1
+            try:
+                return self._revalidate(key, fetch, entry)
+            except Exception:
+                with self._lock:
+                    self.errors += 1
+                raise
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+                "not_modified": self.not_modified,
+                "background_refreshes": self.background_refreshes,
+                "errors": self.errors,
+                "evictions": self.evictions,
+            }
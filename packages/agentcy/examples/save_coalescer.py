@@ -0,0 +1,192 @@
+"""Write-coalescing for cloud saves.
+
+Games autosave every few seconds. Creating one GitHub Issue per `/save` call
+floods the repo and trips secondary rate limits, so saves are coalesced per
+(app, kind, user):
+
+- The first save for a key looks up an existing open issue (`find`, e.g. by
+  labels and title) and only creates one if there is none; either way this
+  happens synchronously because the caller needs its number/URL.
+- Later saves only replace the pending payload in memory. At most once per
+  `debounce_s` window the latest payload is written to the existing issue
+  with an update (PATCH) instead of a create.
+- Payloads that were replaced before being written count as `merged`;
+  updates that keep failing are given up on and count as `dropped`.
+
+The key -> issue mapping is cached in process memory; `find` is what lets a
+restarted process or a second uvicorn worker pick up the existing issue
+instead of opening another. (Two workers creating the very first issue for a
+key at the same moment can still race.)
+"""
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Hashable, Optional
+
+SaveKey = Hashable  # e.g. (repo, app, kind, user)
+
+# create(payload) -> (issue_number, issue_url); update(issue_number, payload) -> None
+CreateFn = Callable[[dict], "tuple[int, str]"]
+UpdateFn = Callable[[int, dict], None]
+# find(payload) -> (issue_number, issue_url) of an existing issue, or None
+FindFn = Callable[[dict], "Optional[tuple[int, str]]"]
+
+
+@dataclass
+class _KeyState:
+    issue_number: int
+    issue_url: str
+    last_write: float
+    pending: Optional[dict] = None
+    failures: int = 0
+    timer: Optional[threading.Timer] = None
+    writing: bool = False  # an update() is in flight (without holding `lock`)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+class SaveCoalescer:
+    def __init__(
+        self,
+        create: CreateFn,
+        update: UpdateFn,
+        *,
+        find: Optional[FindFn] = None,
+        debounce_s: float = 10.0,
+        max_failures: int = 3,
+    ) -> None:
+        self.create = create
+        self.update = update
+        self.find = find
+        self.debounce_s = max(0.0, float(debounce_s))
+        self.max_failures = max(1, int(max_failures))
+
+        self._lock = threading.Lock()
+        self._keys: dict[SaveKey, _KeyState] = {}
+        self._creating: dict[SaveKey, threading.Lock] = {}
+
+        self.received = 0
+        self.found = 0
+        self.created = 0
+        self.updated = 0
+        self.merged = 0
+        self.dropped = 0
+        self.failed = 0
+
+    def submit(self, key: SaveKey, payload: dict) -> tuple[int, str]:
+        """Record a save and return the (issue_number, issue_url) it maps to."""
+        with self._lock:
+            self.received += 1
+            state = self._keys.get(key)
+            if state is None:
+                create_lock = self._creating.setdefault(key, threading.Lock())
+        if state is None:
+            with create_lock:
+                with self._lock:
+                    state = self._keys.get(key)
+                if state is None:
+                    try:
+                        # Exceptions propagate: the caller reports the failed save.
+                        existing = self.find(payload) if self.find is not None else None
+                        if existing is None:
+                            number, url = self.create(payload)
+                            with self._lock:
+                                self.created += 1
+                                self._keys[key] = _KeyState(number, url, time.monotonic())
+                            return number, url
+                        with self._lock:
+                            self.found += 1
+                            # Written on the next timer tick: this save carries the newest payload.
+                            state = self._keys[key] = _KeyState(*existing, time.monotonic() - self.debounce_s)
+                    finally:
+                        with self._lock:
+                            self._creating.pop(key, None)
+
+        with state.lock:
+            if state.pending is not None:
+                with self._lock:
+                    self.merged += 1
+            state.pending = payload
+            self._schedule(key, state)
+            return state.issue_number, state.issue_url
+
+    def _schedule(self, key: SaveKey, state: _KeyState, delay: Optional[float] = None) -> None:
+        """Arm the flush timer for `key` (caller holds `state.lock`)."""
+        if state.timer is not None or state.writing:
+            # Already armed, or the in-flight write re-arms it when it finishes.
+            return
+        if delay is None:
+            delay = max(0.0, state.last_write + self.debounce_s - time.monotonic())
+        state.timer = threading.Timer(delay, self._flush_key, args=(key,))
+        state.timer.daemon = True
+        state.timer.start()
+
+    def _flush_key(self, key: SaveKey) -> None:
+        with self._lock:
+            state = self._keys.get(key)
+        if state is None:
+            return
+        with state.lock:
+            state.timer = None
+            if state.writing:
+                return
+            payload, state.pending = state.pending, None
+            if payload is None:
+                return
+            state.writing = True
+        # Network call without the key lock, so new saves for this key don't wait on the PATCH.
+        try:
+            self.update(state.issue_number, payload)
+        except Exception:  # noqa: BLE001
+            with state.lock:
+                state.writing = False
+                state.failures += 1
+                with self._lock:
+                    self.failed += 1
+                if state.failures >= self.max_failures:
+                    with self._lock:
+                        self.dropped += 1
+                    state.failures = 0
+                    if state.pending is not None:
+                        self._schedule(key, state)
+                    return
+                # Retry in the next window unless a newer save already replaced it.
+                if state.pending is None:
+                    state.pending = payload
+                self._schedule(key, state, delay=self.debounce_s or 1.0)
+            return
+        with state.lock:
+            state.writing = False
+            state.failures = 0
+            state.last_write = time.monotonic()
+            with self._lock:
+                self.updated += 1
+            if state.pending is not None:
+                self._schedule(key, state)
+
+    def flush_all(self) -> None:
+        """Write every pending payload now (used on shutdown)."""
+        with self._lock:
+            keys = list(self._keys.items())
+        for key, state in keys:
+            timer = state.timer
+            if timer is not None:
+                timer.cancel()
+            self._flush_key(key)
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            pending = sum(1 for s in self._keys.values() if s.pending is not None)
+            return {
+                "debounce_s": self.debounce_s,
+                "keys": len(self._keys),
+                "pending": pending,
+                "received": self.received,
+                "found": self.found,
+                "created": self.created,
+                "updated": self.updated,
+                "merged": self.merged,
+                "dropped": self.dropped,
+                "failed": self.failed,
+            }
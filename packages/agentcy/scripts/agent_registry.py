@@ -0,0 +1,157 @@
+"""Remember which agent definitions are already registered in Foundry.
+
+Every script used to call `project_client.agents.create_version(...)` before
+talking to its agent, even when the model and instructions were the same as
+last time: one control-plane round trip per run, and a new agent version each
+time. `ensure_agent` does that call only when needed:
+
+  agent = ensure_agent(project_client, endpoint=endpoint, agent_name=name, model=model, instructions=instructions)
+  ...extra_body={"agent": {"name": agent.name, "type": "agent_reference"}}
+
+The registry is a small JSON file under the cache dir (see `agentcy_cache.py`)
+mapping (endpoint, agent name) to the fingerprint (SHA-256 of the
+`PromptAgentDefinition` fields) and version last registered. Agents are
+referenced by name, i.e. their latest version, so the registry keeps one entry
+per name: registering a different definition under the same name replaces it,
+and switching back registers again. Entries older than `MAX_AGE_S` are
+re-registered in case the agent was changed or deleted elsewhere.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from scripts.agentcy_cache import cache_root
+
+MAX_AGE_S = 7 * 24 * 3600
+
+
+def definition_fingerprint(*, model: str, instructions: str) -> str:
+    """SHA-256 of a prompt agent definition."""
+    material = json.dumps({"kind": "prompt", "model": model, "instructions": instructions}, sort_keys=True)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class AgentRef:
+    name: str
+    version: str
+    reused: bool
+    # Time the skipped create_version took when it last ran (0 when it ran now).
+    saved_ms: float = 0.0
+    create_ms: float = 0.0
+
+
+class AgentRegistry:
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path else cache_root() / "agents.json"
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(endpoint: str, agent_name: str) -> str:
+        return f"{endpoint.rstrip('/')}#{agent_name}"
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def lookup(self, endpoint: str, agent_name: str, fingerprint: str) -> Optional[dict[str, Any]]:
+        """The recorded entry if `agent_name` was last registered with `fingerprint` recently enough."""
+        entry = self._load().get(self._key(endpoint, agent_name))
+        if not isinstance(entry, dict) or entry.get("fingerprint") != fingerprint:
+            return None
+        if time.time() - float(entry.get("registered_at", 0)) > MAX_AGE_S:
+            return None
+        return entry
+
+    def record(self, endpoint: str, agent_name: str, fingerprint: str, *, version: str, create_ms: float) -> None:
+        with self._lock:
+            data = self._load()
+            data[self._key(endpoint, agent_name)] = {
+                "fingerprint": fingerprint,
+                "name": agent_name,
+                "version": version,
+                "registered_at": time.time(),
+                "create_ms": round(create_ms, 1),
+            }
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_name(f"{self.path.name}.{uuid.uuid4().hex[:8]}.tmp")
+            tmp.write_text(json.dumps(data, indent=2, sort_keys=True), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+_registry: Optional[AgentRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> AgentRegistry:
+    """The process-wide registry under the default cache dir."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = AgentRegistry()
+        return _registry
+
+
+def ensure_agent(
+    project_client: Any,
+    *,
+    endpoint: str,
+    agent_name: str,
+    model: str,
+    instructions: str,
+    registry: Optional[AgentRegistry] = None,
+    refresh: bool = False,
+) -> AgentRef:
+    """Register the agent definition unless this exact one is already the latest version of `agent_name`.
+
+    `refresh=True` always calls `create_version`. Registry read/write errors
+    never fail the run; they only cost the round trip.
+    """
+    registry = registry or get_registry()
+    fingerprint = definition_fingerprint(model=model, instructions=instructions)
+    entry = None if refresh else registry.lookup(endpoint, agent_name, fingerprint)
+    if entry is not None:
+        return AgentRef(
+            name=agent_name,
+            version=str(entry.get("version", "")),
+            reused=True,
+            saved_ms=float(entry.get("create_ms", 0.0)),
+        )
+
+    from azure.ai.projects.models import PromptAgentDefinition
+
+    started = time.perf_counter()
+    agent = project_client.agents.create_version(
+        agent_name=agent_name,
+        definition=PromptAgentDefinition(model=model, instructions=instructions),
+    )
+    create_ms = (time.perf_counter() - started) * 1000
+    name = getattr(agent, "name", None) or agent_name
+    version = str(getattr(agent, "version", "") or "")
+    try:
+        registry.record(endpoint, agent_name, fingerprint, version=version, create_ms=create_ms)
+    except OSError:
+        pass
+    return AgentRef(name=name, version=version, reused=False, create_ms=create_ms)
+
+
+def describe(agent: AgentRef) -> str:
+    """One line for run output."""
+    if agent.reused:
+        return (
+            f"Agent '{agent.name}' (version {agent.version or 'unknown'}) unchanged; "
+            f"skipped create_version (~{agent.saved_ms:.0f} ms saved)"
+        )
+    return f"Registered agent '{agent.name}' (version {agent.version or 'unknown'}) in {agent.create_ms:.0f} ms"
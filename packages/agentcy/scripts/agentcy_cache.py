@@ -0,0 +1,34 @@
+"""Where the scripts keep state that is worth reusing between runs.
+
+Everything lives under one directory so it is easy to find and to wipe:
+
+  $AGENTCY_CACHE_DIR            if set
+  $XDG_CACHE_HOME/agentcy       otherwise, if XDG_CACHE_HOME is set
+  ~/.cache/agentcy              otherwise
+
+Deleting it is always safe; the next run rebuilds what it needs.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def cache_root() -> Path:
+    """Return the cache directory (created if missing)."""
+    explicit = os.getenv("AGENTCY_CACHE_DIR", "").strip()
+    if explicit:
+        root = Path(explicit).expanduser()
+    else:
+        xdg = os.getenv("XDG_CACHE_HOME", "").strip()
+        root = (Path(xdg).expanduser() if xdg else Path.home() / ".cache") / "agentcy"
+    root.mkdir(parents=True, exist_ok=True)
+    return root
+
+
+def cache_dir(name: str) -> Path:
+    """Return (and create) the cache subdirectory `name`."""
+    path = cache_root() / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
@@ -20,19 +20,21 @@ Run:
 
 from __future__ import annotations
 
+import argparse
 import os
 import re
+import sys
 from dataclasses import dataclass
-from typing import Callable, List
+from pathlib import Path
+from typing import Callable, List, Optional
 
-from azure.ai.projects import AIProjectClient
-from azure.ai.projects.models import PromptAgentDefinition
-from azure.identity import DefaultAzureCredential
+if __package__ in (None, ""):
+    # Allow `python scripts/ai900_practice_quiz.py` as well as `python -m scripts.ai900_practice_quiz`.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-try:
-    from azure.core.credentials import AzureKeyCredential  # type: ignore
-except Exception:  # noqa: BLE001
-    AzureKeyCredential = None  # type: ignore
+from scripts.agent_registry import describe as describe_agent
+from scripts.agent_registry import ensure_agent
+from scripts.foundry_session import get_openai_client, get_project_client
 
 
 def _require_env(name: str) -> str:
@@ -42,15 +44,6 @@ def _require_env(name: str) -> str:
     return value
 
 
-def _credential():
-    project_api_key = os.getenv("PROJECT_API_KEY", "").strip()
-    if project_api_key:
-        if AzureKeyCredential is None:
-            raise SystemExit("PROJECT_API_KEY is set but AzureKeyCredential is unavailable")
-        return AzureKeyCredential(project_api_key)
-    return DefaultAzureCredential()
-
-
 def _norm(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip().lower())
 
@@ -136,27 +129,29 @@ QUESTIONS = [
 ]
 
 
-def main() -> int:
+def main(argv: Optional[list[str]] = None) -> int:
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args(argv)
     endpoint = _require_env("USER_ENDPOINT")
     model = _require_env("MODEL_DEPLOYMENT_NAME")
     quiz_agent_name = os.getenv("QUIZ_AGENT_NAME", "ai900-tutor").strip() or "ai900-tutor"
 
-    project_client = AIProjectClient(endpoint=endpoint, credential=_credential())
+    project_client = get_project_client(endpoint)
 
     # Create a dedicated quiz agent so we don't overwrite your existing agent's personality.
-    agent = project_client.agents.create_version(
+    agent = ensure_agent(
+        project_client,
+        endpoint=endpoint,
         agent_name=quiz_agent_name,
-        definition=PromptAgentDefinition(
-            model=model,
-            instructions=(
-                "You are an Azure AI-900 tutor. Answer practice questions accurately and succinctly. "
-                "If unsure, say so."
-            ),
+        model=model,
+        instructions=(
+            "You are an Azure AI-900 tutor. Answer practice questions accurately and succinctly. "
+            "If unsure, say so."
         ),
     )
 
-    openai_client = project_client.get_openai_client()
+    openai_client = get_openai_client(endpoint)
 
+    print(describe_agent(agent))
     print(f"Using quiz agent: {agent.name}")
     print()
 
@@ -0,0 +1,321 @@
+"""Group exported feedback issues into clusters of related reports.
+
+`github_issues_to_pr.py` used to paste up to `--limit` raw issues into one
+prompt, so five reports of the same typo cost five times the tokens. This job
+streams the export written by `export_issues_to_jsonl.py`, groups issues by
+word overlap and writes one representative summary per cluster:
+
+  generated/feedback_clusters.jsonl   one cluster per line (largest first)
+  generated/feedback_clusters.state.json   checkpoint (clusters + seen issues)
+
+It is incremental. The exporter rewrites its file oldest-first, so earlier
+issues stay a byte-identical prefix; the checkpoint records how far the
+export was read (plus a fingerprint of the bytes just before that point) and
+a re-run seeks past them, parsing only the lines added since. If the prefix
+changed (different `--limit`, hand edits), the whole export is read again and
+issues already in the checkpoint are skipped. Pass `--rebuild` to start over
+(e.g. after changing `--threshold`).
+
+Candidate clusters are found through an inverted index of their keywords,
+so each issue is compared with a few clusters instead of all of them.
+
+Usage:
+  python3 scripts/export_issues_to_jsonl.py --repo owner/repo --limit 5000
+  python3 scripts/cluster_feedback_issues.py
+  python3 scripts/github_issues_to_pr.py --repo owner/repo --clusters generated/feedback_clusters.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import re
+import sys
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+if __package__ in (None, ""):
+    # Allow `python scripts/cluster_feedback_issues.py` as well as `python -m scripts.cluster_feedback_issues`.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+STATE_VERSION = 1
+# Bytes before the saved export offset that must match for a re-run to skip ahead.
+FINGERPRINT_BYTES = 4096
+# Keywords kept per cluster profile; enough to describe it, small enough to compare fast.
+MAX_CLUSTER_KEYWORDS = 40
+# Keywords shared by more clusters than this say nothing about which one an issue belongs to.
+MAX_POSTINGS = 200
+SUMMARY_CHARS = 400
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9'_-]{1,}")
+_STOPWORDS = frozenset(
+    """
+    a about add after again all also am an and any are as at be because been but by can could did do does
+    doing don't for from get got had has have how i i'm if in into is it it's its just like me more my no
+    not of on one only or other our out please so some still than that the their them then there these
+    they this to too up us very was we were what when where which while who why will with would you your
+    feedback issue game page
+    """.split()
+)
+
+
+def keywords(text: str) -> Counter:
+    """Lowercase word counts without stopwords (and without the feedback boilerplate words)."""
+    return Counter(w.strip("'-_") for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS)
+
+
+def similarity(a: Counter, b: Counter) -> float:
+    """Cosine similarity of keyword counts (0..1); independent of how big a cluster has grown."""
+    if not a or not b:
+        return 0.0
+    if len(a) > len(b):
+        a, b = b, a
+    dot = sum(n * b[w] for w, n in a.items() if w in b)
+    if not dot:
+        return 0.0
+    return dot / math.sqrt(sum(n * n for n in a.values()) * sum(n * n for n in b.values()))
+
+
+@dataclass
+class Cluster:
+    id: int
+    issues: list[int] = field(default_factory=list)
+    urls: list[str] = field(default_factory=list)
+    title: str = ""
+    summary: str = ""
+    profile: Counter = field(default_factory=Counter)
+    representative: Optional[int] = None
+
+    def to_record(self) -> dict[str, Any]:
+        return {
+            "cluster_id": self.id,
+            "size": len(self.issues),
+            "representative": self.representative,
+            "title": self.title,
+            "summary": self.summary,
+            "keywords": [w for w, _ in self.profile.most_common(8)],
+            "issues": self.issues,
+            "urls": self.urls,
+        }
+
+
+class IssueClusterer:
+    def __init__(self, *, threshold: float = 0.3) -> None:
+        self.threshold = float(threshold)
+        self.clusters: dict[int, Cluster] = {}
+        self.seen: set[int] = set()
+        # How far the export was read last time: {"offset": int, "fingerprint": str}.
+        self.export_position: dict[str, Any] = {}
+        self._postings: dict[str, set[int]] = {}
+        self._next_id = 1
+
+    # -- checkpoint --------------------------------------------------------
+
+    @classmethod
+    def load(cls, path: str, *, threshold: float) -> "IssueClusterer":
+        clusterer = cls(threshold=threshold)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return clusterer
+        if state.get("version") != STATE_VERSION:
+            return clusterer
+        clusterer.seen = set(int(n) for n in state.get("seen") or [])
+        clusterer._next_id = int(state.get("next_id") or 1)
+        clusterer.export_position = dict(state.get("export") or {})
+        for raw in state.get("clusters") or []:
+            cluster = Cluster(
+                id=int(raw["cluster_id"]),
+                issues=list(raw.get("issues") or []),
+                urls=list(raw.get("urls") or []),
+                title=str(raw.get("title") or ""),
+                summary=str(raw.get("summary") or ""),
+                profile=Counter(raw.get("profile") or {}),
+                representative=raw.get("representative"),
+            )
+            clusterer._add_cluster(cluster)
+        return clusterer
+
+    def save(self, path: str) -> None:
+        state = {
+            "version": STATE_VERSION,
+            "next_id": self._next_id,
+            "seen": sorted(self.seen),
+            "export": self.export_position,
+            "clusters": [dict(c.to_record(), profile=dict(c.profile)) for c in self.clusters.values()],
+        }
+        _write_atomic(path, json.dumps(state, ensure_ascii=False, separators=(",", ":")))
+
+    # -- clustering --------------------------------------------------------
+
+    def _add_cluster(self, cluster: Cluster) -> None:
+        self.clusters[cluster.id] = cluster
+        self._next_id = max(self._next_id, cluster.id + 1)
+        self._index(cluster)
+
+    def _index(self, cluster: Cluster) -> None:
+        for word in cluster.profile:
+            self._postings.setdefault(word, set()).add(cluster.id)
+
+    def _unindex(self, cluster: Cluster) -> None:
+        for word in cluster.profile:
+            ids = self._postings.get(word)
+            if ids is not None:
+                ids.discard(cluster.id)
+
+    def _best_cluster(self, words: Counter) -> tuple[Optional[Cluster], float]:
+        candidates: set[int] = set()
+        for word in words:
+            ids = self._postings.get(word)
+            if ids and len(ids) <= MAX_POSTINGS:
+                candidates |= ids
+        best, best_sim = None, 0.0
+        for cid in candidates:
+            sim = similarity(words, self.clusters[cid].profile)
+            if sim > best_sim:
+                best, best_sim = self.clusters[cid], sim
+        return best, best_sim
+
+    def add(self, number: int, title: str, body: str, url: str) -> Optional[Cluster]:
+        """Assign one issue. Returns its cluster, or None if it was already seen or has no text."""
+        if number in self.seen:
+            return None
+        self.seen.add(number)
+        # Titles are short and to the point; count them twice.
+        words = keywords(title) + keywords(title) + keywords(body)
+        if not words:
+            return None
+
+        cluster, sim = self._best_cluster(words)
+        if cluster is None or sim < self.threshold:
+            # The first issue of a cluster stands for it in the summary.
+            cluster = Cluster(id=self._next_id, representative=number, title=title)
+            summary = " ".join(body.split())
+            cluster.summary = summary[:SUMMARY_CHARS] + ("…" if len(summary) > SUMMARY_CHARS else "")
+            self._next_id += 1
+            self.clusters[cluster.id] = cluster
+        else:
+            self._unindex(cluster)
+
+        cluster.issues.append(number)
+        cluster.urls.append(url)
+        cluster.profile = Counter(dict((cluster.profile + words).most_common(MAX_CLUSTER_KEYWORDS)))
+        self._index(cluster)
+        return cluster
+
+    def ordered(self) -> list[Cluster]:
+        return sorted(self.clusters.values(), key=lambda c: (-len(c.issues), c.id))
+
+
+def iter_export(path: str, start: int = 0) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Stream (end offset, record) from an `export_issues_to_jsonl.py` file, skipping bad lines.
+
+    Reading starts at byte `start`; a trailing line without a newline (an
+    export still being written) is left for the next run.
+    """
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for raw in f:
+            if not raw.endswith(b"\n"):
+                break
+            offset += len(raw)
+            line = raw.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(rec, dict) and isinstance(rec.get("number"), int):
+                yield offset, rec
+
+
+def _fingerprint(path: str, offset: int) -> str:
+    """Hash of the `FINGERPRINT_BYTES` before `offset` (empty if the file is shorter)."""
+    start = max(0, offset - FINGERPRINT_BYTES)
+    try:
+        with open(path, "rb") as f:
+            f.seek(start)
+            data = f.read(offset - start)
+    except OSError:
+        return ""
+    if len(data) != offset - start:
+        return ""
+    return hashlib.sha256(data).hexdigest()
+
+
+def _resume_offset(path: str, position: dict[str, Any]) -> int:
+    """Where the last run stopped, if the export still starts with what it read."""
+    offset = position.get("offset")
+    if not isinstance(offset, int) or offset <= 0:
+        return 0
+    fingerprint = position.get("fingerprint")
+    return offset if fingerprint and _fingerprint(path, offset) == fingerprint else 0
+
+
+def _write_atomic(path: str, text: str) -> None:
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def cluster_export(
+    export_path: str,
+    out_path: str,
+    state_path: str,
+    *,
+    threshold: float = 0.3,
+    rebuild: bool = False,
+) -> tuple[int, int]:
+    """Cluster new issues from `export_path`. Returns (new issues, total clusters)."""
+    clusterer = IssueClusterer(threshold=threshold) if rebuild else IssueClusterer.load(state_path, threshold=threshold)
+    start = _resume_offset(export_path, clusterer.export_position)
+    offset = start
+    added = 0
+    for offset, rec in iter_export(export_path, start):
+        cluster = clusterer.add(
+            rec["number"],
+            str(rec.get("title") or "").strip(),
+            str(rec.get("body") or "").strip(),
+            str(rec.get("url") or "").strip(),
+        )
+        if cluster is not None:
+            added += 1
+    clusterer.export_position = {"offset": offset, "fingerprint": _fingerprint(export_path, offset)}
+    clusterer.save(state_path)
+    _write_atomic(
+        out_path,
+        "".join(json.dumps(c.to_record(), ensure_ascii=False) + "\n" for c in clusterer.ordered()),
+    )
+    return added, len(clusterer.clusters)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--in", dest="in_path", default="generated/all_feedback.jsonl", help="Issue export (JSONL)")
+    parser.add_argument("--out", default="generated/feedback_clusters.jsonl")
+    parser.add_argument("--state", default="", help="Checkpoint file (default: <out without .jsonl>.state.json)")
+    parser.add_argument("--threshold", type=float, default=0.3, help="Min keyword similarity to join a cluster (0..1)")
+    parser.add_argument("--rebuild", action="store_true", help="Ignore the checkpoint and recluster everything")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.in_path):
+        raise SystemExit(f"Export not found: {args.in_path} (run scripts/export_issues_to_jsonl.py first)")
+    state_path = args.state or (args.out[: -len(".jsonl")] if args.out.endswith(".jsonl") else args.out) + ".state.json"
+
+    added, total = cluster_export(args.in_path, args.out, state_path, threshold=args.threshold, rebuild=args.rebuild)
+    print(f"Clustered {added} new issues; {total} clusters in {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
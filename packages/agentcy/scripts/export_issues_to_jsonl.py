@@ -5,8 +5,14 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import sys
+from pathlib import Path
 from typing import List
 
+if __package__ in (None, ""):
+    # Allow `python scripts/export_issues_to_jsonl.py` as well as `python -m scripts.export_issues_to_jsonl`.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
 from scripts.github_issues_to_pr import _list_feedback_issues, _parse_owner_repo
 
 
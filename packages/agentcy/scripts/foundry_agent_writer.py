@@ -28,25 +28,34 @@ Optional:
 from __future__ import annotations
 
 import argparse
+import itertools
 import json
 import os
 import re
+import subprocess
+import sys
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Iterable
 
-from azure.ai.projects import AIProjectClient
-from azure.ai.projects.models import PromptAgentDefinition
-from azure.identity import DefaultAzureCredential
+if __package__ in (None, ""):
+    # Allow `python scripts/foundry_agent_writer.py` as well as `python -m scripts.foundry_agent_writer`.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-try:
-    from azure.core.credentials import AzureKeyCredential  # type: ignore
-except Exception:  # noqa: BLE001
-    AzureKeyCredential = None  # type: ignore
+from scripts.agent_registry import describe as describe_agent
+from scripts.agent_registry import ensure_agent
+from scripts.foundry_session import get_openai_client, get_project_client
+from scripts.proposal_cache import cache_key, get_cache
+from scripts.repo_retrieval import DEFAULT_BUDGET_TOKENS, select_files, summarize
 
 
 REPO_ROOT = Path(__file__).resolve().parents[3]
 DEFAULT_ALLOW_PREFIXES = ("generated/",)
+# With a context token budget, the first this many small text files in walk
+# order compete for it. This script reads the live working tree (uncommitted
+# edits included), so it cannot use the blob-SHA index from
+# repo_context_index.py the way foundry_to_github_pr.py does.
+MAX_CONTEXT_CANDIDATES = 500
 
 
 @dataclass
@@ -72,21 +81,21 @@ def _is_probably_secret_path(rel_path: str) -> bool:
 
 
 def _iter_repo_files_for_tree(root: Path) -> Iterable[str]:
-    for path in root.rglob("*"):
-        if path.is_dir():
-            continue
-        rel = path.relative_to(root).as_posix()
-        if rel.startswith(".git/") or rel.startswith(".venv/"):
-            continue
-        if _is_probably_secret_path(rel):
-            continue
-        yield rel
+    for dirpath, dirnames, filenames in os.walk(root):
+        # Prune instead of walking into .git/.venv and filtering afterwards.
+        dirnames[:] = [d for d in dirnames if d not in {".git", ".venv"}]
+        base = Path(dirpath).relative_to(root).as_posix()
+        for filename in filenames:
+            rel = filename if base == "." else f"{base}/{filename}"
+            if _is_probably_secret_path(rel):
+                continue
+            yield rel
 
 
 def _read_small_text_files(root: Path, max_bytes: int = 40_000, max_files: int = 60) -> list[dict]:
     """Return a list of {path, content} for small files. Excludes .venv/.git and secret-ish names."""
     out: list[dict] = []
-    for rel in list(_iter_repo_files_for_tree(root))[: max_files * 5]:
+    for rel in itertools.islice(_iter_repo_files_for_tree(root), max_files * 5):
         if len(out) >= max_files:
             break
         p = root / rel
@@ -106,15 +115,32 @@ def _read_small_text_files(root: Path, max_bytes: int = 40_000, max_files: int =
     return out
 
 
-def _build_context(share_files: bool) -> str:
+def _build_context(share_files: bool, query: str = "", budget_tokens: int = 0) -> tuple[str, dict]:
+    """Context JSON and file selection stats (see scripts/repo_retrieval.py; 0 = first files in walk order).
+
+    With a budget, the first `MAX_CONTEXT_CANDIDATES` small files in walk order are ranked.
+    """
     tree = sorted(_iter_repo_files_for_tree(REPO_ROOT))
     context = {
         "repo_root": REPO_ROOT.name,
         "tree": tree,
     }
+    stats: dict = {}
     if share_files:
-        context["files"] = _read_small_text_files(REPO_ROOT)
-    return json.dumps(context, ensure_ascii=False)
+        if budget_tokens > 0:
+            selection = select_files(
+                _read_small_text_files(REPO_ROOT, max_files=MAX_CONTEXT_CANDIDATES), query, budget_tokens=budget_tokens
+            )
+            context["files"], stats = selection.files, selection.stats
+        else:
+            context["files"] = _read_small_text_files(REPO_ROOT)
+    return json.dumps(context, ensure_ascii=False), stats
+
+
+def _head_revision() -> str:
+    """Commit SHA of REPO_ROOT's HEAD, or "" outside a git checkout."""
+    result = subprocess.run(["git", "rev-parse", "HEAD"], cwd=str(REPO_ROOT), capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else ""
 
 
 def _validate_rel_path(rel_path: str, allow_prefixes: tuple[str, ...]) -> None:
@@ -139,59 +165,71 @@ def _apply_files(files: list[ProposedFile], allow_prefixes: tuple[str, ...]) ->
     return written
 
 
-def _get_credential():
-    project_api_key = os.getenv("PROJECT_API_KEY", "").strip()
-    if project_api_key:
-        if AzureKeyCredential is None:
-            raise SystemExit(
-                "PROJECT_API_KEY is set but AzureKeyCredential is unavailable. "
-                "Install azure-core or use DefaultAzureCredential."
-            )
-        return AzureKeyCredential(project_api_key)
-    return DefaultAzureCredential()
-
-
-def call_agent_and_write(share_files: bool, allow_prefixes: tuple[str, ...]) -> list[str]:
+def call_agent_and_write(
+    share_files: bool,
+    allow_prefixes: tuple[str, ...],
+    context_budget_tokens: int = DEFAULT_BUDGET_TOKENS,
+    use_cache: bool = True,
+    refresh_agent: bool = False,
+) -> list[str]:
     endpoint = _require_env("USER_ENDPOINT")
     agent_name = _require_env("AGENT_NAME")
     model_deployment = _require_env("MODEL_DEPLOYMENT_NAME")
 
-    credential = _get_credential()
-    project_client = AIProjectClient(endpoint=endpoint, credential=credential)
-
-    # Ensure agent exists (bumps version if needed)
-    agent = project_client.agents.create_version(
-        agent_name=agent_name,
-        definition=PromptAgentDefinition(
-            model=model_deployment,
-            instructions=(
-                "You are a code assistant.\n"
-                'Return STRICT JSON ONLY with shape: {"files":[{"path":"generated/HELLO_WORLD.md","content":"..."}]}\n'
-                f"Policy: you may ONLY write files under these prefixes: {', '.join(allow_prefixes)}\n"
-                "Do not include markdown fences. Do not include explanations."
-            ),
-        ),
+    instructions = (
+        "You are a code assistant.\n"
+        'Return STRICT JSON ONLY with shape: {"files":[{"path":"generated/HELLO_WORLD.md","content":"..."}]}\n'
+        f"Policy: you may ONLY write files under these prefixes: {', '.join(allow_prefixes)}\n"
+        "Do not include markdown fences. Do not include explanations."
     )
-
-    openai_client = project_client.get_openai_client()
-
-    repo_context = _build_context(share_files=share_files)
-
-    prompt = (
+    task = (
         "Task: Create a file generated/HELLO_WORLD.md with a short Hello World message for this project.\n"
         "Include: a title, one sentence about Azure Foundry being connected, and one sentence about feedback pipeline.\n"
-        "Repo context (JSON):\n"
-        + repo_context
     )
+    repo_context, context_stats = _build_context(
+        share_files=share_files, query=task, budget_tokens=context_budget_tokens
+    )
+    if context_stats:
+        print(summarize(context_stats), file=sys.stderr)
 
-    response = openai_client.responses.create(
-        input=[{"role": "user", "content": prompt}],
-        extra_body={"agent": {"name": agent.name, "type": "agent_reference"}},
+    prompt = task + "Repo context (JSON):\n" + repo_context
+
+    # Identical requests (same instructions, model, prompt and base commit) reuse the last answer.
+    cache = get_cache() if use_cache else None
+    key = cache_key(
+        endpoint=endpoint,
+        agent_name=agent_name,
+        model=model_deployment,
+        instructions=instructions,
+        prompt=prompt,
+        revision=_head_revision() if cache is not None else "",
     )
+    text = cache.get(key) if cache is not None else None
+    if text is not None:
+        print("Using cached agent answer (pass --no-cache to ask the agent again)", file=sys.stderr)
+    else:
+        project_client = get_project_client(endpoint)
+
+        # Ensure agent exists (bumps version only if the definition changed)
+        agent = ensure_agent(
+            project_client,
+            endpoint=endpoint,
+            agent_name=agent_name,
+            model=model_deployment,
+            instructions=instructions,
+            refresh=refresh_agent,
+        )
+        print(describe_agent(agent), file=sys.stderr)
 
-    text = (response.output_text or "").strip()
-    if not text:
-        raise SystemExit("Agent returned empty output")
+        openai_client = get_openai_client(endpoint)
+        response = openai_client.responses.create(
+            input=[{"role": "user", "content": prompt}],
+            extra_body={"agent": {"name": agent.name, "type": "agent_reference"}},
+        )
+
+        text = (response.output_text or "").strip()
+        if not text:
+            raise SystemExit("Agent returned empty output")
 
     try:
         payload = json.loads(text)
@@ -214,6 +252,12 @@ def call_agent_and_write(share_files: bool, allow_prefixes: tuple[str, ...]) ->
     if not proposed:
         raise SystemExit("Agent JSON contained no valid files")
 
+    if cache is not None:
+        try:
+            cache.put(key, text)
+        except OSError:
+            pass  # caching is best-effort
+
     return _apply_files(proposed, allow_prefixes=allow_prefixes)
 
 
@@ -225,13 +269,36 @@ def main() -> int:
         action="store_true",
         help="Share small file contents with agent (still excludes .venv/.git/.env and secret-ish names)",
     )
+    parser.add_argument(
+        "--context-budget-tokens",
+        type=int,
+        default=DEFAULT_BUDGET_TOKENS,
+        help="With --share-files: send the most relevant files up to about this many tokens "
+        f"(default: {DEFAULT_BUDGET_TOKENS}; 0 = first files in walk order)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always ask the agent, even if an identical request has a cached answer",
+    )
+    parser.add_argument(
+        "--refresh-agent",
+        action="store_true",
+        help="Register a new agent version even if the registry says this definition is already the latest",
+    )
     args = parser.parse_args()
 
     if not args.hello:
         parser.print_help()
         return 2
 
-    written = call_agent_and_write(share_files=args.share_files, allow_prefixes=DEFAULT_ALLOW_PREFIXES)
+    written = call_agent_and_write(
+        share_files=args.share_files,
+        allow_prefixes=DEFAULT_ALLOW_PREFIXES,
+        context_budget_tokens=args.context_budget_tokens,
+        use_cache=not args.no_cache,
+        refresh_agent=args.refresh_agent,
+    )
     print("Wrote files:")
     for p in written:
         print(f"- {p}")
@@ -36,6 +36,13 @@ from __future__ import annotations
 import argparse
 import os
 import sys
+from pathlib import Path
+
+if __package__ in (None, ""):
+    # Allow `python scripts/foundry_hello_agent.py` as well as `python -m scripts.foundry_hello_agent`.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.foundry_session import get_credential, get_openai_client, get_project_client
 
 
 def _env(name: str, default: str = "") -> str:
@@ -48,32 +55,6 @@ def _require(value: str, name: str) -> str:
     return value
 
 
-def _get_credential(project_api_key: str):
-    # Import lazily so the file is importable without azure deps.
-    try:
-        from azure.identity import DefaultAzureCredential
-
-        try:
-            from azure.core.credentials import AzureKeyCredential  # type: ignore
-        except Exception:  # noqa: BLE001
-            AzureKeyCredential = None  # type: ignore
-
-    except Exception as exc:  # noqa: BLE001
-        raise SystemExit(
-            "Missing Azure dependencies. Install with: pip install -r packages/agentcy/requirements.txt"
-        ) from exc
-
-    if project_api_key:
-        if AzureKeyCredential is None:
-            raise SystemExit(
-                "PROJECT_API_KEY is set but AzureKeyCredential is unavailable. "
-                "Install azure-core or use DefaultAzureCredential instead."
-            )
-        return AzureKeyCredential(project_api_key)
-
-    return DefaultAzureCredential()
-
-
 def main() -> int:
     parser = argparse.ArgumentParser(description="Hello-world for a Foundry agent")
     parser.add_argument("--endpoint", default=_env("USER_ENDPOINT"), help="Foundry project endpoint (USER_ENDPOINT)")
@@ -107,10 +88,10 @@ def main() -> int:
     if "<" in endpoint:
         raise SystemExit("Please replace placeholder values in USER_ENDPOINT")
 
-    credential = _get_credential(args.project_api_key.strip())
+    project_api_key = args.project_api_key.strip()
+    get_credential(project_api_key)
 
     try:
-        from azure.ai.projects import AIProjectClient
         from azure.ai.projects.models import PromptAgentDefinition
     except Exception as exc:  # noqa: BLE001
         raise SystemExit(
@@ -118,7 +99,7 @@ def main() -> int:
         ) from exc
 
     try:
-        project_client = AIProjectClient(endpoint=endpoint, credential=credential)
+        project_client = get_project_client(endpoint, project_api_key)
 
         # Optional: create/update agent version. This is useful if the agent doesn't exist yet.
         if args.create_or_update:
@@ -140,7 +121,7 @@ def main() -> int:
         else:
             resolved_agent_name = agent_name
 
-        openai_client = project_client.get_openai_client()
+        openai_client = get_openai_client(endpoint, project_api_key)
         response = openai_client.responses.create(
             input=[{"role": "user", "content": args.prompt}],
             extra_body={"agent": {"name": resolved_agent_name, "type": "agent_reference"}},
@@ -0,0 +1,293 @@
+"""Shared Foundry credential and clients for the CLIs.
+
+Each script used to build `DefaultAzureCredential()` itself, and every run
+paid for it: DefaultAzureCredential probes environment, managed identity
+(a network timeout on a laptop), and then shells out to `az` for a token.
+This module does that work once:
+
+- `get_credential()` picks the chain from cheap local checks (service
+  principal env vars, a managed identity endpoint, the `az` CLI) instead of
+  probing, and wraps it so access tokens are cached on disk until shortly
+  before they expire. A repeated run with a valid cached token never builds
+  the underlying credential at all.
+- `get_project_client(endpoint)` / `get_openai_client(endpoint)` build the
+  `AIProjectClient` and its OpenAI client lazily, once per process.
+
+With `PROJECT_API_KEY` the key is used as is and nothing is cached.
+
+Tokens live in `<cache>/auth/tokens` (see `agentcy_cache.py`) as plain JSON,
+protected only by file permissions (0600 in a 0700 directory) -- the same as
+the `az` CLI's own token cache on Linux. Entries are keyed by the chain, the
+scopes, the tenant and the signed-in `az` account, so `az login` as someone
+else never reuses the previous user's token. `AGENTCY_TOKEN_CACHE=0` disables
+the disk cache.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from scripts.agentcy_cache import cache_dir
+
+# Tokens this close to expiry are refreshed (azure-core uses the same margin).
+REFRESH_MARGIN_S = 300
+
+_INSTALL_HINT = "Install with: pip install -r packages/agentcy/requirements.txt"
+
+_AccessToken = namedtuple("_AccessToken", ["token", "expires_on"])
+
+
+def _access_token(token: str, expires_on: int) -> Any:
+    try:
+        from azure.core.credentials import AccessToken
+    except Exception:  # noqa: BLE001 - same shape, so callers can still unpack it
+        return _AccessToken(token, expires_on)
+    return AccessToken(token, expires_on)
+
+
+def _az_cli_account() -> str:
+    """`user@tenant` of the default `az` subscription, read from `azureProfile.json` ("" if not logged in).
+
+    Reading the profile is a file read; `az account show` would cost a second per run.
+    """
+    config = Path(os.getenv("AZURE_CONFIG_DIR") or Path.home() / ".azure")
+    try:
+        profile = json.loads((config / "azureProfile.json").read_text(encoding="utf-8-sig"))
+    except (OSError, ValueError):
+        return ""
+    subscriptions = profile.get("subscriptions") if isinstance(profile, dict) else None
+    for sub in subscriptions or []:
+        if isinstance(sub, dict) and sub.get("isDefault"):
+            user = sub.get("user") or {}
+            return f"{user.get('name', '')}@{sub.get('tenantId', '')}"
+    return ""
+
+
+class TokenCache:
+    """On-disk map of cache key -> (token, expires_on), readable only by the owner (0600)."""
+
+    def __init__(self, root: Optional[Path] = None) -> None:
+        self.root = Path(root) if root else cache_dir("auth")
+        self.root.mkdir(parents=True, exist_ok=True)
+        try:
+            os.chmod(self.root, 0o700)
+        except OSError:
+            pass
+        self.path = self.root / "tokens"
+        self._lock = threading.Lock()
+        try:
+            (self.root / "token.key").unlink()  # left by versions that encrypted the file with a key beside it
+        except OSError:
+            pass
+
+    def _load(self) -> dict[str, Any]:
+        try:
+            data = json.loads(self.path.read_bytes())
+        except (OSError, ValueError):  # missing, corrupt, or written by an older version
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def get(self, key: str) -> Optional[tuple[str, int]]:
+        """The cached token for `key` unless it expires within `REFRESH_MARGIN_S`."""
+        entry = self._load().get(key)
+        if not isinstance(entry, dict):
+            return None
+        expires_on = int(entry.get("expires_on", 0))
+        if expires_on - REFRESH_MARGIN_S <= time.time():
+            return None
+        return str(entry.get("token", "")), expires_on
+
+    def put(self, key: str, token: str, expires_on: int) -> None:
+        with self._lock:
+            now = time.time()
+            data = {k: v for k, v in self._load().items() if isinstance(v, dict) and v.get("expires_on", 0) > now}
+            data[key] = {"token": token, "expires_on": int(expires_on)}
+            tmp = self.path.with_name(f"tokens.{os.getpid()}.tmp")
+            fd = os.open(str(tmp), os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "wb") as f:
+                f.write(json.dumps(data).encode("utf-8"))
+            os.replace(tmp, self.path)
+
+    def clear(self) -> None:
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class CachedCredential:
+    """`TokenCredential` that answers from `TokenCache` and builds the real credential only on a miss."""
+
+    def __init__(
+        self,
+        name: str,
+        factory: Callable[[], Any],
+        *,
+        cache: Optional[TokenCache] = None,
+        account: Optional[Callable[[], str]] = None,
+    ) -> None:
+        self.name = name
+        self._factory = factory
+        self._account = account
+        self._inner: Any = None
+        self._cache = cache
+        self._memory: dict[str, tuple[str, int]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, scopes: tuple[str, ...], tenant_id: Optional[str]) -> str:
+        identity = [
+            self.name,
+            sorted(scopes),
+            tenant_id or os.getenv("AZURE_TENANT_ID", ""),
+            os.getenv("AZURE_CLIENT_ID", ""),
+            # Checked on every call, so a re-login is noticed even inside a long-lived process.
+            self._account() if self._account else "",
+        ]
+        return hashlib.sha256(json.dumps(identity).encode("utf-8")).hexdigest()
+
+    @property
+    def inner(self) -> Any:
+        with self._lock:
+            if self._inner is None:
+                self._inner = self._factory()
+            return self._inner
+
+    def get_token(self, *scopes: str, claims: Optional[str] = None, tenant_id: Optional[str] = None, **kwargs: Any):
+        if claims:
+            # A claims challenge needs a fresh token from the real credential.
+            return self.inner.get_token(*scopes, claims=claims, tenant_id=tenant_id, **kwargs)
+        key = self._key(scopes, tenant_id)
+        cached = self._memory.get(key)
+        if cached is None or cached[1] - REFRESH_MARGIN_S <= time.time():
+            cached = self._cache.get(key) if self._cache is not None else None
+        if cached is not None:
+            self.hits += 1
+            self._memory[key] = cached
+            return _access_token(*cached)
+
+        self.misses += 1
+        if tenant_id:
+            kwargs["tenant_id"] = tenant_id
+        token = self.inner.get_token(*scopes, **kwargs)
+        self._memory[key] = (token.token, int(token.expires_on))
+        if self._cache is not None:
+            try:
+                self._cache.put(key, token.token, int(token.expires_on))
+            except OSError:
+                pass  # caching is best-effort
+        return token
+
+    def close(self) -> None:
+        if self._inner is not None and hasattr(self._inner, "close"):
+            self._inner.close()
+
+    def __enter__(self) -> "CachedCredential":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+
+def pick_chain() -> tuple[str, Callable[[], Any]]:
+    """Name and factory of the credential to use, decided from local state without any network probes."""
+    try:
+        import azure.identity as identity
+    except Exception as exc:  # noqa: BLE001
+        raise SystemExit(f"Missing Azure dependencies (azure-identity). {_INSTALL_HINT}") from exc
+
+    has_secret = os.getenv("AZURE_CLIENT_SECRET") or os.getenv("AZURE_CLIENT_CERTIFICATE_PATH")
+    if os.getenv("AZURE_CLIENT_ID") and has_secret:
+        return "environment", identity.EnvironmentCredential
+    if os.getenv("IDENTITY_ENDPOINT") or os.getenv("MSI_ENDPOINT"):
+        return "managed-identity", identity.ManagedIdentityCredential
+    if shutil.which("az"):
+        # `az login` is the common case; fall back to the full chain (minus the CLI) if it isn't logged in.
+        return "azure-cli", lambda: identity.ChainedTokenCredential(
+            identity.AzureCliCredential(),
+            identity.DefaultAzureCredential(exclude_cli_credential=True),
+        )
+    return "default", identity.DefaultAzureCredential
+
+
+_credentials: dict[str, Any] = {}
+_clients: dict[tuple[str, str], Any] = {}
+_openai_clients: dict[tuple[str, str], Any] = {}
+_session_lock = threading.RLock()
+
+
+def _key_id(project_api_key: str) -> str:
+    return hashlib.sha256(project_api_key.encode("utf-8")).hexdigest()[:16] if project_api_key else ""
+
+
+def auth_id(project_api_key: str) -> str:
+    """Which identity a call with `project_api_key` runs under: `key:<fingerprint>`, or `entra` without a key."""
+    project_api_key = project_api_key.strip()
+    return f"key:{_key_id(project_api_key)}" if project_api_key else "entra"
+
+
+def get_credential(project_api_key: Optional[str] = None) -> Any:
+    """Process-wide credential: `AzureKeyCredential` for a project API key, else a token-caching Entra ID chain.
+
+    `project_api_key=None` reads `PROJECT_API_KEY`.
+    """
+    if project_api_key is None:
+        project_api_key = os.getenv("PROJECT_API_KEY", "")
+    project_api_key = project_api_key.strip()
+    key_id = _key_id(project_api_key)
+    with _session_lock:
+        credential = _credentials.get(key_id)
+        if credential is not None:
+            return credential
+        if project_api_key:
+            try:
+                from azure.core.credentials import AzureKeyCredential
+            except Exception as exc:  # noqa: BLE001
+                raise SystemExit(
+                    "PROJECT_API_KEY is set but AzureKeyCredential is unavailable. "
+                    "Install azure-core or use DefaultAzureCredential instead."
+                ) from exc
+            credential = AzureKeyCredential(project_api_key)
+        else:
+            name, factory = pick_chain()
+            disk = os.getenv("AGENTCY_TOKEN_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+            # Both of these chains can answer from the `az` login.
+            account = _az_cli_account if name in ("azure-cli", "default") else None
+            credential = CachedCredential(name, factory, cache=TokenCache() if disk else None, account=account)
+        _credentials[key_id] = credential
+        return credential
+
+
+def get_project_client(endpoint: str, project_api_key: Optional[str] = None) -> Any:
+    """Process-wide `AIProjectClient` for `endpoint`."""
+    key_id = _key_id((project_api_key if project_api_key is not None else os.getenv("PROJECT_API_KEY", "")).strip())
+    with _session_lock:
+        client = _clients.get((endpoint, key_id))
+        if client is None:
+            try:
+                from azure.ai.projects import AIProjectClient
+            except Exception as exc:  # noqa: BLE001
+                raise SystemExit(f"Missing Azure AI Projects SDK. {_INSTALL_HINT}") from exc
+            client = AIProjectClient(endpoint=endpoint, credential=get_credential(project_api_key))
+            _clients[(endpoint, key_id)] = client
+        return client
+
+
+def get_openai_client(endpoint: str, project_api_key: Optional[str] = None) -> Any:
+    """Process-wide OpenAI client of the project at `endpoint`."""
+    key_id = _key_id((project_api_key if project_api_key is not None else os.getenv("PROJECT_API_KEY", "")).strip())
+    with _session_lock:
+        client = _openai_clients.get((endpoint, key_id))
+        if client is None:
+            client = get_project_client(endpoint, project_api_key).get_openai_client()
+            _openai_clients[(endpoint, key_id)] = client
+        return client
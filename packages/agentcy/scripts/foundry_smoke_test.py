@@ -20,26 +20,25 @@ Usage:
 
 Notes:
 - This script prints actionable error hints but never prints secrets.
+- The agent version is only created/updated when its definition changed since the
+  last run (see agent_registry.py); delete ~/.cache/agentcy/agents.json to force it.
 """
 
 from __future__ import annotations
 
+import argparse
 import os
 import sys
+from pathlib import Path
+from typing import Optional
 
-from azure.identity import DefaultAzureCredential
-try:
-    from azure.identity import AzureCliCredential
-except Exception:  # noqa: BLE001
-    AzureCliCredential = None  # type: ignore
-from azure.ai.projects import AIProjectClient
-from azure.ai.projects.models import PromptAgentDefinition
+if __package__ in (None, ""):
+    # Allow `python scripts/foundry_smoke_test.py` as well as `python -m scripts.foundry_smoke_test`.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-try:
-    # Optional: enable API-key auth if the SDK supports AzureKeyCredential.
-    from azure.core.credentials import AzureKeyCredential  # type: ignore
-except Exception:  # noqa: BLE001
-    AzureKeyCredential = None  # type: ignore
+from scripts.agent_registry import describe as describe_agent
+from scripts.agent_registry import ensure_agent
+from scripts.foundry_session import get_credential, get_openai_client, get_project_client
 
 
 def _require_env(name: str) -> str:
@@ -49,7 +48,9 @@ def _require_env(name: str) -> str:
     return value
 
 
-def main() -> int:
+def main(argv: Optional[list[str]] = None) -> int:
+    # No options; this only provides --help (without loading the Azure SDK).
+    argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter).parse_args(argv)
     endpoint = _require_env("USER_ENDPOINT")
     agent_name = os.getenv("AGENT_NAME", "story-agent").strip() or "story-agent"
     model_deployment = _require_env("MODEL_DEPLOYMENT_NAME")
@@ -60,39 +61,28 @@ def main() -> int:
 
     try:
         print("Connecting to Foundry project...")
-        if project_api_key:
-            if AzureKeyCredential is None:
-                raise SystemExit(
-                    "PROJECT_API_KEY is set but AzureKeyCredential is unavailable. "
-                    "Install azure-core or use DefaultAzureCredential instead."
-                )
-            credential = AzureKeyCredential(project_api_key)
-        else:
-            # Prefer Azure CLI credential when user already ran `az login`.
-            # This avoids DefaultAzureCredential trying Managed Identity / other providers that can time out.
-            if AzureCliCredential is not None:
-                credential = AzureCliCredential()
-            else:
-                credential = DefaultAzureCredential()
-
-        project_client = AIProjectClient(endpoint=endpoint, credential=credential)
+        # The credential chain is picked from local state (az login, service principal env vars, ...)
+        # without probing, and tokens are reused across runs; see foundry_session.py.
+        credential = get_credential(project_api_key)
+        print(f"Auth: {'PROJECT_API_KEY' if project_api_key else getattr(credential, 'name', 'default')}")
+        project_client = get_project_client(endpoint, project_api_key)
 
         print("Creating/updating agent version...")
-        agent = project_client.agents.create_version(
+        agent = ensure_agent(
+            project_client,
+            endpoint=endpoint,
             agent_name=agent_name,
-            definition=PromptAgentDefinition(
-                model=model_deployment,
-                instructions=(
-                    "You are a storytelling agent. You craft engaging one-line stories "
-                    "based on user prompts and context."
-                ),
+            model=model_deployment,
+            instructions=(
+                "You are a storytelling agent. You craft engaging one-line stories "
+                "based on user prompts and context."
             ),
         )
 
-        print(f"OK: created/updated agent '{agent.name}' (version: {getattr(agent, 'version', 'unknown')})")
+        print(f"OK: {describe_agent(agent)}")
 
         print("Calling Responses API...")
-        openai_client = project_client.get_openai_client()
+        openai_client = get_openai_client(endpoint, project_api_key)
         response = openai_client.responses.create(
             input=[{"role": "user", "content": "Say 'connected' in one line."}],
             extra_body={"agent": {"name": agent.name, "type": "agent_reference"}},
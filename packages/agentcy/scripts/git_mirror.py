@@ -0,0 +1,233 @@
+"""Local mirror cache for the repos the PR scripts work on.
+
+`foundry_to_github_pr.py` and `commit_aggregated_feedback.py` used to clone
+the target repo into a temp dir on every run. For a site repo with large
+assets that is seconds of network and disk per job. Instead, each remote gets
+one bare repo under the cache dir (see `agentcy_cache.cache_root()`), updated
+with an incremental `git fetch`. Every job gets its own `git worktree`:
+
+  mirror = GitMirror("https://github.com/owner/repo.git", token=token)
+  with mirror.worktree("main") as repo_dir:
+      ...edit, `git checkout -b`, commit...
+      mirror.git(["push", "-u", "origin", branch], cwd=repo_dir)
+
+Layout:
+
+  <cache>/git/mirrors/<name>.git     bare repo (one per remote URL)
+  <cache>/git/mirrors/<name>.lock    flock held while fetching / adding / removing worktrees
+  <cache>/git/worktrees/<name>/<host>-<pid>-<id>   one per job, removed when the job ends
+
+Concurrent jobs (threads or processes) only serialize on the short fetch and
+worktree bookkeeping; the worktrees themselves are independent. Worktrees and
+branches left behind by crashed jobs are garbage-collected on the next run.
+
+The token never touches disk: it is passed to git as an
+`http.extraheader` through `GIT_CONFIG_*` environment variables, so it is
+neither stored in the mirror's config nor visible in the process list.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import re
+import shutil
+import socket
+import subprocess
+import threading
+import time
+import urllib.parse
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to an in-process lock.
+    fcntl = None  # type: ignore[assignment]
+
+from scripts.agentcy_cache import cache_dir
+
+# Worktrees older than this are assumed abandoned even if their process looks alive.
+WORKTREE_MAX_AGE_S = 6 * 3600
+
+_thread_locks: dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _mirror_name(url: str) -> str:
+    """Readable, collision-free directory name for a remote URL (credentials stripped)."""
+    parsed = urllib.parse.urlsplit(url)
+    host = parsed.hostname or ""
+    path = parsed.path if parsed.scheme else url
+    readable = re.sub(r"[^A-Za-z0-9._-]+", "_", f"{host}/{path}").strip("_.")
+    if readable.endswith("_git"):
+        readable = readable[: -len("_git")]
+    digest = hashlib.sha1(redact_url(url).encode("utf-8")).hexdigest()[:8]
+    return f"{readable[-60:]}-{digest}"
+
+
+def redact_url(url: str) -> str:
+    """Drop any user:password@ part so the URL is safe to store and print."""
+    parsed = urllib.parse.urlsplit(url)
+    if not parsed.username and not parsed.password:
+        return url
+    netloc = parsed.hostname or ""
+    if parsed.port:
+        netloc += f":{parsed.port}"
+    return urllib.parse.urlunsplit(parsed._replace(netloc=netloc))
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+class GitMirror:
+    def __init__(self, url: str, *, token: str = "", root: Optional[Path] = None) -> None:
+        self.url = redact_url(url)
+        self.token = token
+        self.root = Path(root) if root else cache_dir("git")
+        self.name = _mirror_name(url)
+        self.path = self.root / "mirrors" / f"{self.name}.git"
+        self.worktrees_dir = self.root / "worktrees" / self.name
+        self._lock_path = self.root / "mirrors" / f"{self.name}.lock"
+
+    # -- git ---------------------------------------------------------------
+
+    def _env(self) -> dict[str, str]:
+        env = os.environ.copy()
+        env["GIT_TERMINAL_PROMPT"] = "0"
+        if self.token:
+            n = int(env.get("GIT_CONFIG_COUNT") or 0)
+            basic = base64.b64encode(f"x-access-token:{self.token}".encode("utf-8")).decode("ascii")
+            env["GIT_CONFIG_COUNT"] = str(n + 1)
+            env[f"GIT_CONFIG_KEY_{n}"] = "http.extraheader"
+            env[f"GIT_CONFIG_VALUE_{n}"] = f"AUTHORIZATION: basic {basic}"
+        return env
+
+    def git(self, args: list[str], cwd: Optional[Path] = None) -> str:
+        """Run git (authenticated when a token is set). Raises SystemExit on failure."""
+        result = subprocess.run(
+            ["git", *args], cwd=str(cwd or self.path), env=self._env(), capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            stderr = (result.stderr or "").strip()
+            stdout = (result.stdout or "").strip()
+            raise SystemExit(f"git {' '.join(args)} failed\nstdout: {stdout}\nstderr: {stderr}")
+        return result.stdout
+
+    # -- locking -----------------------------------------------------------
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        self._lock_path.parent.mkdir(parents=True, exist_ok=True)
+        key = str(self._lock_path)
+        with _thread_locks_guard:
+            thread_lock = _thread_locks.setdefault(key, threading.Lock())
+        with thread_lock:
+            if fcntl is None:
+                yield
+                return
+            with open(self._lock_path, "a+b") as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+    # -- mirror ------------------------------------------------------------
+
+    def _fetch_locked(self, branch: str) -> str:
+        if not (self.path / "HEAD").exists():
+            self.path.mkdir(parents=True, exist_ok=True)
+            self.git(["init", "--bare", "-q", str(self.path)], cwd=self.path.parent)
+            self.git(["config", "remote.origin.url", self.url])
+        ref = f"refs/remotes/origin/{branch}"
+        self.git(["fetch", "-q", "--no-tags", "origin", f"+refs/heads/{branch}:{ref}"])
+        return self.git(["rev-parse", ref]).strip()
+
+    def fetch(self, branch: str) -> str:
+        """Create or update the mirror's copy of `branch`; returns its commit."""
+        with self._locked():
+            return self._fetch_locked(branch)
+
+    @contextmanager
+    def worktree(self, base: str) -> Iterator[Path]:
+        """Fetch `base` and check it out (detached) in a fresh worktree for the duration of the block."""
+        with self._locked():
+            commit = self._fetch_locked(base)
+            self._gc_locked(WORKTREE_MAX_AGE_S)
+            path = self.worktrees_dir / f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.git(["worktree", "add", "-q", "--detach", str(path), commit])
+        try:
+            yield path
+        finally:
+            self.remove_worktree(path)
+
+    def remove_worktree(self, path: Path) -> None:
+        with self._locked():
+            branch = ""
+            try:
+                branch = self.git(["symbolic-ref", "-q", "--short", "HEAD"], cwd=path).strip()
+            except (SystemExit, OSError):
+                pass
+            try:
+                self.git(["worktree", "remove", "--force", str(path)])
+            except SystemExit:
+                shutil.rmtree(path, ignore_errors=True)
+                self.git(["worktree", "prune"])
+            if branch:
+                try:
+                    self.git(["branch", "-D", "-q", branch])
+                except SystemExit:
+                    pass
+
+    # -- garbage collection --------------------------------------------------
+
+    def _is_stale(self, path: Path, max_age_s: float) -> bool:
+        try:
+            age = time.time() - path.stat().st_mtime
+        except OSError:
+            return False
+        if age > max_age_s:
+            return True
+        host, _, rest = path.name.rpartition("-")[0].rpartition("-")
+        if host == socket.gethostname() and rest.isdigit():
+            return not _pid_alive(int(rest))
+        return False
+
+    def _gc_locked(self, max_age_s: float) -> int:
+        removed = 0
+        if self.worktrees_dir.is_dir():
+            for path in self.worktrees_dir.iterdir():
+                if path.is_dir() and self._is_stale(path, max_age_s):
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+        if not (self.path / "HEAD").exists():
+            return removed
+        self.git(["worktree", "prune"])
+        # Branches created in worktrees that no longer exist.
+        in_use = {
+            line[len("branch refs/heads/") :]
+            for line in self.git(["worktree", "list", "--porcelain"]).splitlines()
+            if line.startswith("branch refs/heads/")
+        }
+        for branch in self.git(["for-each-ref", "--format=%(refname:short)", "refs/heads"]).split():
+            if branch not in in_use:
+                self.git(["branch", "-D", "-q", branch])
+        self.git(["gc", "--auto", "--quiet"])
+        return removed
+
+    def gc(self, max_age_s: float = WORKTREE_MAX_AGE_S) -> int:
+        """Remove abandoned worktrees and their branches. Returns how many worktrees were removed."""
+        with self._locked():
+            return self._gc_locked(max_age_s)
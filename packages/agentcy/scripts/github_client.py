@@ -0,0 +1,343 @@
+"""Shared GitHub REST client with connection pooling, keep-alive, ETags and gzip.
+
+The feedback API, the issues-to-PR loop and the PR exporter all talk to the
+GitHub REST API. Opening a new TLS connection per call (plain `urllib`) makes
+the handshake most of the wall time when we comment on and label dozens of
+issues in a batch, so this module keeps a small pool of persistent
+`http.client` connections per host and reuses them.
+
+GET responses that carry an `ETag` are remembered; the next GET for the same
+URL (and token) is sent with `If-None-Match`, and a `304 Not Modified` is
+served from the cached body (GitHub does not count those against the rate
+limit).
+
+Usage:
+  from scripts.github_client import github_request
+  data = github_request("GET", "https://api.github.com/repos/o/r/issues", token)
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import http.client
+import json
+import threading
+import urllib.parse
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+DEFAULT_HEADERS = {
+    "Accept": "application/vnd.github+json",
+    "X-GitHub-Api-Version": "2022-11-28",
+    "Accept-Encoding": "gzip",
+    "User-Agent": "agentcy-github-client",
+    "Connection": "keep-alive",
+}
+
+# Errors that mean a pooled keep-alive connection went stale before we used it.
+_STALE_CONNECTION_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError)
+
+# Only these are safe to resend when we can't tell whether the server saw the request.
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "DELETE", "OPTIONS"})
+
+
+class GitHubAPIError(RuntimeError):
+    """Raised for non-2xx/304 responses from the GitHub API."""
+
+    def __init__(
+        self, status: int, reason: str, url: str, body: str = "", retry_after: Optional[float] = None
+    ) -> None:
+        super().__init__(f"GitHub API {status} {reason} for {url}: {body[:500]}")
+        self.status = status
+        self.reason = reason
+        self.url = url
+        self.body = body
+        # Seconds from the `Retry-After` header (set on rate-limit responses).
+        self.retry_after = retry_after
+
+
+@dataclass
+class GitHubResponse:
+    status: int
+    headers: dict[str, str] = field(default_factory=dict)  # lower-cased names
+    data: Any = None
+    from_cache: bool = False
+
+
+class GitHubClient:
+    """Thread-safe pooled client. One instance per process is enough."""
+
+    def __init__(self, *, pool_size: int = 8, timeout: float = 30.0, etag_cache_size: int = 256) -> None:
+        self.pool_size = max(1, int(pool_size))
+        self.timeout = float(timeout)
+        self.etag_cache_size = max(0, int(etag_cache_size))
+
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str, int], list[http.client.HTTPConnection]] = {}
+        self._etags: OrderedDict[tuple[str, str], tuple[str, Any]] = OrderedDict()
+
+        self.requests = 0
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self.not_modified = 0
+
+    # -- connection pool -------------------------------------------------
+
+    def _acquire(
+        self, key: tuple[str, str, int], timeout: float, fresh: bool = False
+    ) -> tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = None if fresh else self._idle.get(key)
+            if idle:
+                self.connections_reused += 1
+                conn = idle.pop()
+                conn.timeout = timeout
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                return conn, True
+            self.connections_opened += 1
+        scheme, host, port = key
+        conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return conn_cls(host, port, timeout=timeout), False
+
+    def _release(self, key: tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.pool_size:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            pools = list(self._idle.values())
+            self._idle = {}
+        for idle in pools:
+            for conn in idle:
+                conn.close()
+
+    # -- ETag cache ------------------------------------------------------
+
+    @staticmethod
+    def _cache_key(url: str, token: Optional[str]) -> tuple[str, str]:
+        # Never keep the raw token around as a dict key.
+        token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()[:16] if token else ""
+        return url, token_hash
+
+    def _etag_get(self, key: tuple[str, str]) -> Optional[tuple[str, Any]]:
+        with self._lock:
+            hit = self._etags.get(key)
+            if hit is not None:
+                self._etags.move_to_end(key)
+            return hit
+
+    def _etag_put(self, key: tuple[str, str], etag: str, data: Any) -> None:
+        if not self.etag_cache_size:
+            return
+        with self._lock:
+            self._etags[key] = (etag, data)
+            self._etags.move_to_end(key)
+            while len(self._etags) > self.etag_cache_size:
+                self._etags.popitem(last=False)
+
+    # -- requests --------------------------------------------------------
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        token: Optional[str] = None,
+        payload: Any = None,
+        *,
+        headers: Optional[dict[str, str]] = None,
+        timeout: Optional[float] = None,
+        conditional: bool = True,
+    ) -> GitHubResponse:
+        method = method.upper()
+        parts = urllib.parse.urlsplit(url)
+        scheme = parts.scheme or "https"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname or "", port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        send_headers = dict(DEFAULT_HEADERS)
+        if token:
+            send_headers["Authorization"] = f"Bearer {token}"
+        body: Optional[bytes] = None
+        if payload is not None:
+            body = json.dumps(payload).encode("utf-8")
+            send_headers["Content-Type"] = "application/json"
+        if headers:
+            send_headers.update(headers)
+
+        cache_key = self._cache_key(url, token)
+        cached = self._etag_get(cache_key) if (method == "GET" and conditional) else None
+        if cached is not None and "If-None-Match" not in send_headers:
+            send_headers["If-None-Match"] = cached[0]
+
+        timeout = self.timeout if timeout is None else float(timeout)
+        with self._lock:
+            self.requests += 1
+
+        stale_retries = 0
+        while True:
+            conn, reused = self._acquire(key, timeout, fresh=stale_retries > 0)
+            try:
+                conn.request(method, path, body=body, headers=send_headers)
+                resp = conn.getresponse()
+                raw = resp.read()
+            except _STALE_CONNECTION_ERRORS:
+                conn.close()
+                if reused and method in _IDEMPOTENT_METHODS and stale_retries < 1:
+                    # The server closed an idle keep-alive socket; retry once on a fresh one.
+                    # Never for POST/PATCH: the server may already have acted on it.
+                    stale_retries += 1
+                    continue
+                raise
+            except Exception:
+                conn.close()
+                raise
+            break
+
+        resp_headers = {k.lower(): v for k, v in resp.getheaders()}
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+        if resp.status == 304 and cached is not None:
+            with self._lock:
+                self.not_modified += 1
+            return GitHubResponse(status=304, headers=resp_headers, data=cached[1], from_cache=True)
+
+        if resp_headers.get("content-encoding", "").lower() == "gzip":
+            raw = gzip.decompress(raw)
+        text = raw.decode("utf-8") if raw else ""
+
+        if resp.status >= 400:
+            raise GitHubAPIError(resp.status, resp.reason, url, text, _retry_after(resp_headers))
+
+        data = json.loads(text) if text else None
+        etag = resp_headers.get("etag")
+        if method == "GET" and etag:
+            self._etag_put(cache_key, etag, data)
+        return GitHubResponse(status=resp.status, headers=resp_headers, data=data)
+
+    def request_json(
+        self,
+        method: str,
+        url: str,
+        token: Optional[str] = None,
+        payload: Any = None,
+        *,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        return self.request(method, url, token, payload, timeout=timeout).data
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "connections_opened": self.connections_opened,
+                "connections_reused": self.connections_reused,
+                "not_modified": self.not_modified,
+                "idle_connections": sum(len(v) for v in self._idle.values()),
+                "etag_entries": len(self._etags),
+            }
+
+
+_client: Optional[GitHubClient] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> GitHubClient:
+    """Return the process-wide client (created on first use)."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = GitHubClient()
+    return _client
+
+
+def github_request(
+    method: str,
+    url: str,
+    token: Optional[str] = None,
+    payload: Any = None,
+    timeout: Optional[float] = None,
+) -> Any:
+    """Drop-in replacement for the old per-script `_github_request` helpers."""
+    return get_client().request_json(method, url, token, payload, timeout=timeout)
+
+
+def parse_link_header(value: Optional[str]) -> dict[str, str]:
+    """Parse an RFC 8288 `Link` header into {rel: url}."""
+    links: dict[str, str] = {}
+    for part in (value or "").split(","):
+        section = part.split(";")
+        if len(section) < 2:
+            continue
+        url = section[0].strip()
+        if not (url.startswith("<") and url.endswith(">")):
+            continue
+        for param in section[1:]:
+            name, _, rel = param.strip().partition("=")
+            if name.strip() == "rel":
+                for r in rel.strip().strip('"').split():
+                    links[r] = url[1:-1]
+    return links
+
+
+def link_page_number(url: Optional[str]) -> Optional[int]:
+    """Return the `page` query parameter of a pagination link, if any."""
+    if not url:
+        return None
+    values = urllib.parse.parse_qs(urllib.parse.urlsplit(url).query).get("page")
+    try:
+        return int(values[0]) if values else None
+    except ValueError:
+        return None
+
+
+def iter_pages(url: str, token: Optional[str] = None, *, client: Optional[GitHubClient] = None):
+    """Yield each page of a list endpoint, following `Link: rel="next"`."""
+    client = client or get_client()
+    next_url: Optional[str] = url
+    while next_url:
+        resp = client.request("GET", next_url, token)
+        yield resp.data or []
+        next_url = parse_link_header(resp.headers.get("link")).get("next")
+
+
+def _retry_after(headers: dict[str, str]) -> Optional[float]:
+    try:
+        return max(0.0, float(headers["retry-after"]))
+    except (KeyError, ValueError):
+        return None
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for a 429, or GitHub's secondary rate limit (a 403 carrying `Retry-After`).
+
+    GitHub rejected the request without acting on it, so even a POST can be
+    sent again. A timeout or 5xx gives no such guarantee: the issue may
+    already exist.
+    """
+    if not isinstance(exc, GitHubAPIError):
+        return False
+    return exc.status == 429 or (exc.status == 403 and exc.retry_after is not None)
+
+
+def is_retryable(exc: BaseException) -> bool:
+    """True for rate limits, 5xx and transport errors; 4xx validation errors won't get better.
+
+    Only safe for idempotent requests; use `is_rate_limited` for a POST.
+    """
+    if isinstance(exc, GitHubAPIError):
+        return is_rate_limited(exc) or exc.status >= 500
+    return isinstance(exc, (OSError, http.client.HTTPException))
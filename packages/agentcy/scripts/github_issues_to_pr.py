@@ -24,7 +24,20 @@ Usage (dry-run proposal only):
 
 Usage (open PR):
   export GITHUB_TOKEN=...  # do NOT commit
-  python3 scripts/github_issues_to_pr.py --repo edwinestro/edwinestro.github.io --label feedback
+  python3 scripts/github_issues_to_pr.py --repo edwinestro/edwinestro.github.io --label feedback --confirm
+
+Usage (grouped issues, see scripts/cluster_feedback_issues.py):
+  python3 scripts/github_issues_to_pr.py --repo edwinestro/edwinestro.github.io \
+    --clusters generated/feedback_clusters.jsonl --limit 3
+
+Usage (one PR per group of related issues, 4 proposals at a time):
+  python3 scripts/github_issues_to_pr.py --repo edwinestro/edwinestro.github.io --limit 50 --parallel 4
+
+With --parallel, proposals share one Foundry rate limit (--foundry-rpm) and all GitHub
+writes -- pushes, PR creation, comments and labels -- share one GitHub rate limit
+(--github-rps); each group gets its own branch.
+Proposals run in-process through `foundry_to_github_pr.run_pipeline`, so all groups share
+one Foundry project client (and credential).
 
 After opening a PR, the script comments on the included issues and adds the label `in-pr`.
 """
@@ -34,12 +47,29 @@ from __future__ import annotations
 import argparse
 import json
 import os
-import re
+import sys
+import time
 import urllib.parse
-import urllib.request
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Any
 
+if __package__ in (None, ""):
+    # Allow `python scripts/github_issues_to_pr.py` as well as `python -m scripts.github_issues_to_pr`.
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.foundry_to_github_pr import (
+    GENERATED_DIR,
+    PipelineResult,
+    _check_allowed_repo,
+    make_project_client,
+    run_pipeline,
+)
+from scripts.github_client import github_request, iter_pages
+from scripts.repo_retrieval import DEFAULT_BUDGET_TOKENS
+from scripts.rate_limit import configure as configure_limiter, get_limiter
+
 
 @dataclass
 class Issue:
@@ -49,6 +79,50 @@ class Issue:
     html_url: str
 
 
+@dataclass
+class IssueCluster:
+    """One line of `cluster_feedback_issues.py` output, narrowed to still-open issues."""
+
+    cluster_id: int
+    title: str
+    summary: str
+    keywords: list[str]
+    issues: list[Issue]
+
+
+@dataclass
+class IssueGroup:
+    """Issues that go into one PR."""
+
+    key: str  # suffix for branch and proposal file names ("" for the single-PR mode)
+    issues: list[Issue]
+    feedback_text: str
+
+
+@dataclass
+class GroupResult:
+    group: IssueGroup
+    ok: bool
+    pipeline: PipelineResult | None = None
+    error: str = ""
+
+    @property
+    def pr_url(self) -> str:
+        return self.pipeline.pr_url if self.pipeline else ""
+
+    def summary(self) -> str:
+        if self.pipeline is None:
+            return ""
+        if self.pipeline.pr_url:
+            line = self.pipeline.pr_url
+        elif self.pipeline.proposal_path:
+            line = f"Dry run: wrote proposal to {self.pipeline.proposal_path}"
+        else:
+            line = "(PR created; no URL returned)"
+        context = self.pipeline.context_summary()
+        return f"{line}\n{context}" if context else line
+
+
 def _require_env(name: str) -> str:
     value = os.getenv(name, "").strip()
     if not value:
@@ -57,20 +131,9 @@ def _require_env(name: str) -> str:
 
 
 def _github_request(method: str, url: str, token: str, payload: dict | None = None) -> Any:
-    data = None
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "Authorization": f"Bearer {token}",
-        "X-GitHub-Api-Version": "2022-11-28",
-    }
-    if payload is not None:
-        data = json.dumps(payload).encode("utf-8")
-        headers["Content-Type"] = "application/json"
-
-    req = urllib.request.Request(url, data=data, method=method.upper(), headers=headers)
-    with urllib.request.urlopen(req, timeout=30) as resp:
-        body = resp.read().decode("utf-8")
-        return json.loads(body) if body else None
+    # Shared across worker threads so parallel comments/labels stay under GitHub's burst limits.
+    get_limiter("github").acquire()
+    return github_request(method, url, token, payload)
 
 
 def _parse_owner_repo(repo: str) -> tuple[str, str]:
@@ -83,6 +146,12 @@ def _parse_owner_repo(repo: str) -> tuple[str, str]:
     return owner, name
 
 
+def _iter_issue_items(url: str, token: str):
+    # Follow Link headers so --limit can go past GitHub's 100-per-page cap.
+    for page in iter_pages(url, token):
+        yield from page
+
+
 def _list_feedback_issues(owner: str, repo: str, token: str, label: str, limit: int) -> list[Issue]:
     # List issues (not PRs) that are open and match the label.
     # GitHub returns PRs in this endpoint too; filter out items with 'pull_request'.
@@ -94,10 +163,9 @@ def _list_feedback_issues(owner: str, repo: str, token: str, label: str, limit:
         "direction": "asc",
     }
     url = f"https://api.github.com/repos/{owner}/{repo}/issues?{urllib.parse.urlencode(query)}"
-    data = _github_request("GET", url, token)
 
     issues: list[Issue] = []
-    for item in data or []:
+    for item in _iter_issue_items(url, token):
         if not isinstance(item, dict):
             continue
         if "pull_request" in item:
@@ -139,6 +207,53 @@ def _build_feedback_text(issues: list[Issue]) -> str:
     return "\n".join(parts).strip() + "\n"
 
 
+def _load_clusters(path: str, open_issues: list[Issue], limit: int) -> list[IssueCluster]:
+    """Read clustered issues, keep the open (not in-pr) ones, largest clusters first."""
+    by_number = {issue.number: issue for issue in open_issues}
+    clusters: list[IssueCluster] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(rec, dict):
+                continue
+            members = [by_number[n] for n in rec.get("issues") or [] if n in by_number]
+            if not members:
+                continue
+            clusters.append(
+                IssueCluster(
+                    cluster_id=int(rec.get("cluster_id") or 0),
+                    title=str(rec.get("title") or members[0].title),
+                    summary=str(rec.get("summary") or ""),
+                    keywords=[str(k) for k in rec.get("keywords") or []],
+                    issues=members,
+                )
+            )
+    clusters.sort(key=lambda c: -len(c.issues))
+    return clusters[: max(0, limit)]
+
+
+def _build_cluster_feedback_text(clusters: list[IssueCluster]) -> str:
+    parts: list[str] = []
+    parts.append("You are improving a GitHub Pages site based on user feedback issues.")
+    parts.append("Related reports are grouped; each group below is one problem reported by several users.")
+    parts.append("If multiple groups conflict, pick the smallest safe change.")
+    parts.append("")
+
+    for cluster in clusters:
+        refs = ", ".join(f"#{issue.number}" for issue in cluster.issues)
+        parts.append(f"Group of {len(cluster.issues)} issue(s) ({refs}): {cluster.title}")
+        if cluster.summary:
+            parts.append(cluster.summary)
+        if cluster.keywords:
+            parts.append("Keywords: " + ", ".join(cluster.keywords))
+        parts.append("---")
+
+    return "\n".join(parts).strip() + "\n"
+
+
 def _comment_on_issue(owner: str, repo: str, token: str, issue_number: int, comment: str) -> None:
     url = f"https://api.github.com/repos/{owner}/{repo}/issues/{issue_number}/comments"
     _github_request("POST", url, token, {"body": comment})
@@ -149,11 +264,105 @@ def _add_labels(owner: str, repo: str, token: str, issue_number: int, labels: li
     _github_request("POST", url, token, {"labels": labels})
 
 
+def _partition_issues(issues: list[Issue]) -> list[list[Issue]]:
+    """Split issues into groups of related reports (same similarity as cluster_feedback_issues.py)."""
+    from scripts.cluster_feedback_issues import IssueClusterer
+
+    clusterer = IssueClusterer()
+    by_number = {issue.number: issue for issue in issues}
+    for issue in issues:
+        clusterer.add(issue.number, issue.title, issue.body, issue.html_url)
+    groups = [[by_number[n] for n in cluster.issues] for cluster in clusterer.ordered()]
+    # Issues without any keywords never join a cluster; give each its own group.
+    clustered = {issue.number for group in groups for issue in group}
+    groups.extend([issue] for issue in issues if issue.number not in clustered)
+    return groups
+
+
+def _run_pr_generation(
+    group: IssueGroup,
+    *,
+    owner_repo: str,
+    args: argparse.Namespace,
+    endpoint: str,
+    model_deployment: str,
+    token: str,
+    project_client=None,
+    branch: str = "",
+) -> GroupResult:
+    """Run the foundry_to_github_pr pipeline for one group of issues."""
+    proposal_out = ""
+    if args.dry_run and group.key:
+        proposal_out = str(GENERATED_DIR / f"pr_proposal.{group.key}.json")
+
+    # One Foundry proposal per group; the bucket spaces them out across workers.
+    get_limiter("foundry").acquire()
+    try:
+        pipeline = run_pipeline(
+            repo=owner_repo,
+            feedback_text=group.feedback_text,
+            endpoint=endpoint,
+            model_deployment_name=model_deployment,
+            base=args.base,
+            allow_prefix=args.allow_prefix,
+            share_files=args.share_files,
+            dry_run=args.dry_run,
+            token="" if args.dry_run else token,
+            branch=branch,
+            proposal_out=proposal_out,
+            project_client=project_client,
+            context_budget_tokens=args.context_budget_tokens,
+            stream=args.stream,
+            use_cache=not args.no_cache,
+            refresh_agent=args.refresh_agent,
+        )
+    except (SystemExit, Exception) as e:
+        # run_pipeline reports problems as SystemExit, like the CLI; keep other groups going.
+        return GroupResult(group, ok=False, error=str(e) or type(e).__name__)
+    return GroupResult(group, ok=True, pipeline=pipeline)
+
+
+def _mark_issues_in_pr(owner: str, repo: str, token: str, issues: list[Issue], pr_url: str, *, workers: int) -> int:
+    """Comment on and label every issue, `workers` at a time. Returns how many succeeded."""
+    if not pr_url:
+        # Non-fatal.
+        pr_url = "(PR created; no URL returned)"
+
+    comment = (
+        "Thanks for the feedback! I opened a PR to address this:\n\n"
+        f"{pr_url}\n\n"
+        "If this PR doesn't fully cover your report, please add details in a comment."
+    )
+
+    def mark(issue: Issue) -> bool:
+        try:
+            _comment_on_issue(owner, repo, token, issue.number, comment)
+            _add_labels(owner, repo, token, issue.number, ["in-pr"])
+            return True
+        except Exception:
+            # Non-fatal; PR is the main deliverable.
+            return False
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        return sum(pool.map(mark, issues))
+
+
 def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--repo", required=True, help="Target repo: owner/repo or https://github.com/owner/repo")
     parser.add_argument("--label", default="feedback", help="Label used to select feedback issues")
-    parser.add_argument("--limit", type=int, default=5, help="Max issues to include in one PR")
+    parser.add_argument(
+        "--limit",
+        type=int,
+        default=5,
+        help="Max issues to include in one PR (with --clusters: max issue groups)",
+    )
+    parser.add_argument(
+        "--clusters",
+        default="",
+        help="Use groups from scripts/cluster_feedback_issues.py (e.g. generated/feedback_clusters.jsonl) "
+        "instead of raw issues: one summary per group in the prompt",
+    )
     parser.add_argument("--base", default="main", help="Base branch (default: main)")
     parser.add_argument(
         "--allow-prefix",
@@ -165,15 +374,66 @@ def main() -> int:
         action="store_true",
         help="Share small file contents with agent (more accurate, more data shared)",
     )
+    parser.add_argument(
+        "--context-budget-tokens",
+        type=int,
+        default=DEFAULT_BUDGET_TOKENS,
+        help="With --share-files: send the files most relevant to each group's feedback, up to about this many "
+        f"tokens (default: {DEFAULT_BUDGET_TOKENS}; 0 = first files in tree order)",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream agent responses: check paths as they arrive and abort a group early on a policy violation",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always ask the agent, even if an identical request has a cached proposal",
+    )
+    parser.add_argument(
+        "--refresh-agent",
+        action="store_true",
+        help="Register a new agent version even if the registry says this definition is already the latest",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
         help="Only generate generated/pr_proposal.json (no push/PR).",
     )
+    parser.add_argument(
+        "--confirm",
+        action="store_true",
+        help="Confirm making real changes and opening PRs (required for non-dry-run)",
+    )
+    parser.add_argument(
+        "--parallel",
+        type=int,
+        default=1,
+        help="Open one PR per group of related issues, running up to N proposals at once (default: 1 = one PR)",
+    )
+    parser.add_argument(
+        "--foundry-rpm",
+        type=float,
+        default=30.0,
+        help="Max Foundry proposals started per minute across all workers (default: 30)",
+    )
+    parser.add_argument(
+        "--github-rps",
+        type=float,
+        default=5.0,
+        help="Max GitHub writes (pushes, PRs, comments, labels) per second across all workers (default: 5)",
+    )
     args = parser.parse_args()
 
     owner, name = _parse_owner_repo(args.repo)
 
+    # Same safety checks as foundry_to_github_pr.py, before any issue is read.
+    if not args.dry_run:
+        _check_allowed_repo(f"{owner}/{name}")
+        if not args.confirm:
+            raise SystemExit("Non-dry-run requires --confirm flag to proceed")
+
     endpoint = _require_env("USER_ENDPOINT")
     model_deployment = _require_env("MODEL_DEPLOYMENT_NAME")
 
@@ -182,76 +442,77 @@ def main() -> int:
     if not token:
         raise SystemExit("Missing env var: GITHUB_TOKEN (required to read issues)")
 
-    issues = _list_feedback_issues(owner, name, token, label=args.label, limit=args.limit)
+    workers = max(1, args.parallel)
+    configure_limiter("foundry", rate_per_s=max(args.foundry_rpm, 0.1) / 60.0, burst=workers)
+    configure_limiter("github", rate_per_s=max(args.github_rps, 0.1), burst=max(1.0, args.github_rps * 2))
+
+    if args.clusters:
+        if not os.path.exists(args.clusters):
+            raise SystemExit(f"Clusters file not found: {args.clusters} (run scripts/cluster_feedback_issues.py)")
+        # Only open issues that are not already in a PR count; a group can be larger than --limit.
+        open_issues = _list_feedback_issues(owner, name, token, label=args.label, limit=100_000)
+        clusters = _load_clusters(args.clusters, open_issues, args.limit)
+        issues = [issue for cluster in clusters for issue in cluster.issues]
+        if workers > 1:
+            groups = [IssueGroup(f"c{c.cluster_id}", c.issues, _build_cluster_feedback_text([c])) for c in clusters]
+        else:
+            groups = [IssueGroup("", issues, _build_cluster_feedback_text(clusters))]
+    else:
+        issues = _list_feedback_issues(owner, name, token, label=args.label, limit=args.limit)
+        if workers > 1:
+            groups = [
+                IssueGroup(f"g{i}", members, _build_feedback_text(members))
+                for i, members in enumerate(_partition_issues(issues), 1)
+            ]
+        else:
+            groups = [IssueGroup("", issues, _build_feedback_text(issues))]
     if not issues:
         print(f"No open issues found with label '{args.label}'.")
         return 0
 
-    feedback_text = _build_feedback_text(issues)
-
-    # Call the existing PR creator.
-    # We invoke it as a module/script to avoid duplicating logic.
-    import subprocess
-    import sys
-
-    cmd = [
-        sys.executable,
-        "scripts/foundry_to_github_pr.py",
-        "--repo",
-        f"{owner}/{name}",
-        "--base",
-        args.base,
-        "--allow-prefix",
-        args.allow_prefix,
-        "--feedback",
-        feedback_text,
-    ]
-    if args.share_files:
-        cmd.append("--share-files")
-    if args.dry_run:
-        cmd.append("--dry-run")
-
-    env = os.environ.copy()
-    env["USER_ENDPOINT"] = endpoint
-    env["MODEL_DEPLOYMENT_NAME"] = model_deployment
-
-    result = subprocess.run(cmd, env=env, capture_output=True, text=True)
-    stdout = (result.stdout or "").strip()
-    stderr = (result.stderr or "").strip()
-
-    if result.returncode != 0:
-        raise SystemExit(f"PR generation failed.\nSTDOUT:\n{stdout}\n\nSTDERR:\n{stderr}")
-
-    print(stdout)
-
-    if args.dry_run:
-        return 0
-
-    # Try to find the PR URL in output.
-    pr_url = ""
-    for line in stdout.splitlines():
-        if re.match(r"^https://github.com/.+/pull/\d+", line.strip()):
-            pr_url = line.strip()
-            break
-
-    if not pr_url:
-        # Non-fatal.
-        pr_url = "(PR created; URL not detected in output)"
-
-    comment = (
-        "Thanks for the feedback! I opened a PR to address this:\n\n"
-        f"{pr_url}\n\n"
-        "If this PR doesn't fully cover your report, please add details in a comment."
+    # One client (and credential) for every group; the SDK client is safe to share across threads.
+    project_client = make_project_client(endpoint)
+    run = dict(
+        owner_repo=f"{owner}/{name}",
+        args=args,
+        endpoint=endpoint,
+        model_deployment=model_deployment,
+        token=token,
+        project_client=project_client,
     )
+    if workers == 1:
+        result = _run_pr_generation(groups[0], **run)
+        if not result.ok:
+            raise SystemExit(f"PR generation failed.\n{result.error}")
+        print(result.summary())
+        if not args.dry_run:
+            _mark_issues_in_pr(owner, name, token, issues, result.pr_url, workers=8)
+        return 0
 
-    for issue in issues:
-        try:
-            _comment_on_issue(owner, name, token, issue.number, comment)
-            _add_labels(owner, name, token, issue.number, ["in-pr"])
-        except Exception:
-            # Non-fatal; PR is the main deliverable.
-            pass
-
+    # One PR per group; unique branch names so concurrent pushes never collide.
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    print(f"Generating {len(groups)} PR(s) from {len(issues)} issue(s), {workers} at a time...")
+    failed = 0
+
+    def process(group: IssueGroup) -> GroupResult:
+        result = _run_pr_generation(group, **run, branch=f"agent/feedback-{stamp}-{group.key}")
+        if result.ok and not args.dry_run:
+            # Comment while other groups are still generating.
+            _mark_issues_in_pr(owner, name, token, group.issues, result.pr_url, workers=4)
+        return result
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for result in pool.map(process, groups):
+            refs = ", ".join(f"#{issue.number}" for issue in result.group.issues)
+            if not result.ok:
+                failed += 1
+                print(f"[{result.group.key}] FAILED ({refs})\n{result.error}")
+                continue
+            print(f"[{result.group.key}] {result.summary()} ({refs})")
+
+    if failed:
+        print(f"{failed} of {len(groups)} group(s) failed.")
+        return 1
     return 0
 
 
@@ -12,8 +12,13 @@ Usage:
 The top-level repo also gets a convenience wrapper script `heyCopilot` so you can run:
   ./heyCopilot speak
 
+  # optional: keep a warm daemon in another terminal; `speak` then answers through it
+  ./heyCopilot serve
+  ./heyCopilot speak --debug      # reports warm (daemon) vs cold (in-process) latency
+
 Notes:
-- Auth: DefaultAzureCredential (recommended) or set PROJECT_API_KEY as an env var.
+- Auth: Entra ID via foundry_session.py (az login, service principal, managed identity; tokens are
+  cached between runs) or set PROJECT_API_KEY as an env var.
 - The script writes `edw_hello_world.txt` in the repo root containing the agent's response.
 """
 from __future__ import annotations
@@ -29,6 +34,14 @@ import time
 import traceback
 from typing import Optional
 
+if __package__ in (None, ""):
+    # Allow `python scripts/hey_copilot.py` as well as `python -m scripts.hey_copilot`.
+    sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+
+from scripts import hey_copilot_daemon as daemon
+from scripts.foundry_session import auth_id, get_credential, get_openai_client
+from scripts.proposal_cache import cache_key, get_cache
+
 # Repo root is three levels up from this file: packages/agentcy/scripts/hey_copilot.py
 REPO_ROOT = pathlib.Path(__file__).resolve().parents[3]
 OUTFILE = REPO_ROOT / "edw_hello_world.txt"
@@ -61,37 +74,50 @@ def _env(name: str, default: str = "") -> str:
     return os.getenv(name, default).strip()
 
 
-def _get_credential(project_api_key: str):
-    try:
-        from azure.identity import DefaultAzureCredential
-
-        try:
-            from azure.core.credentials import AzureKeyCredential  # type: ignore
-        except Exception:  # noqa: BLE001
-            AzureKeyCredential = None  # type: ignore
-
-    except Exception as exc:  # noqa: BLE001
-        raise SystemExit(
-            "Missing Azure dependencies. Install with: pip install -r packages/agentcy/requirements.txt"
-        ) from exc
-
-    if project_api_key:
-        if AzureKeyCredential is None:
-            raise SystemExit(
-                "PROJECT_API_KEY is set but AzureKeyCredential is unavailable. "
-                "Install azure-core or use DefaultAzureCredential instead."
-            )
-        return AzureKeyCredential(project_api_key)
-
-    return DefaultAzureCredential()
-
-
 def _require(value: str, name: str) -> str:
     if not value:
         raise SystemExit(f"Missing {name}. Set env var {name} or pass the CLI flag.")
     return value
 
 
+def _ask_agent(endpoint: str, agent_name: str, prompt: str, project_api_key: str) -> str:
+    openai_client = get_openai_client(endpoint, project_api_key)
+    response = openai_client.responses.create(
+        input=[{"role": "user", "content": prompt}],
+        extra_body={"agent": {"name": agent_name, "type": "agent_reference"}},
+    )
+    text = (response.output_text or "").strip()
+    if not text:
+        raise SystemExit("Agent returned empty output")
+    return text
+
+
+def _speak_via_daemon(endpoint: str, agent_name: str, prompt: str, project_api_key: str, debug: bool) -> Optional[dict]:
+    """The daemon's reply, or None when no daemon is running or it runs under another identity.
+
+    A daemon that accepted the request but then failed (timeout, reset) is reported as an error reply
+    rather than None: it may already have called the agent, so calling it again here would repeat that.
+    """
+    path = daemon.socket_path()
+    message = {
+        "cmd": "speak",
+        "endpoint": endpoint,
+        "agent": agent_name,
+        "prompt": prompt,
+        "auth": auth_id(project_api_key),
+    }
+    try:
+        reply = daemon.request(path, message)
+    except (OSError, ValueError) as exc:
+        return {"ok": False, "error": f"daemon at {path} stopped answering ({type(exc).__name__}: {exc})"}
+    if reply is not None and reply.get("auth_mismatch"):
+        print(f"heyCopilot daemon at {path} runs under a different identity; calling the agent directly.")
+        return None
+    if debug:
+        print(f"Debug: daemon={'connected' if reply is not None else 'not running'} ({path})")
+    return reply
+
+
 def run_speak(
     endpoint: str,
     agent_name: str,
@@ -99,7 +125,10 @@ def run_speak(
     project_api_key: str,
     dry_run: bool,
     debug: bool,
+    use_cache: bool = True,
+    use_daemon: bool = True,
 ) -> int:
+    invoked = _now()
     if not endpoint and not dry_run:
         try:
             endpoint = input("USER_ENDPOINT (Foundry project endpoint): ").strip()
@@ -126,6 +155,37 @@ def run_speak(
 
     endpoint = _require(endpoint, "USER_ENDPOINT/--endpoint")
 
+    # The same prompt to the same agent is answered from the local cache (no credentials, no network).
+    cache = get_cache() if use_cache else None
+    key = cache_key(endpoint=endpoint, agent_name=agent_name, model="", instructions="", prompt=prompt)
+    cached = cache.get(key) if cache is not None else None
+    if cached is not None:
+        OUTFILE.write_text(cached + "\n", encoding="utf-8")
+        print(f"Wrote: {OUTFILE} (cached answer; pass --no-cache to ask the agent again)")
+        return 0
+
+    # A running `hey_copilot serve` already has its imports, credential and clients warm.
+    reply = _speak_via_daemon(endpoint, agent_name, prompt, project_api_key, debug) if use_daemon else None
+    if reply is not None:
+        if not reply.get("ok"):
+            print("heyCopilot daemon failed to call Foundry agent.")
+            print(f"Error: {reply.get('error', 'unknown error')}")
+            return 2
+        text = str(reply.get("text", ""))
+        OUTFILE.write_text(text + "\n", encoding="utf-8")
+        print(f"Wrote: {OUTFILE}")
+        if cache is not None:
+            try:
+                cache.put(key, text)
+            except OSError:
+                pass  # caching is best-effort
+        if debug:
+            print(
+                f"Debug: latency=warm (daemon) total={_fmt_duration(invoked)} "
+                f"agent_call={reply.get('elapsed_ms', 0) / 1000:.2f}s"
+            )
+        return 0
+
     if not project_api_key:
         try:
             project_api_key = getpass.getpass(
@@ -140,12 +200,11 @@ def run_speak(
         project_api_key = ""
 
     start = _now()
-    print("Loading Azure credentials (may take a few seconds on first run)...")
-    if debug:
-        print(f"Debug: auth_mode={'PROJECT_API_KEY' if project_api_key else 'DefaultAzureCredential'}")
+    print("Loading Azure credentials...")
 
     try:
-        credential = _get_credential(project_api_key)
+        # Cheap after the first run: the chain is picked without probing and tokens are cached on disk.
+        credential = get_credential(project_api_key)
     except KeyboardInterrupt:
         print("\nCancelled.")
         return 130
@@ -159,35 +218,27 @@ def run_speak(
         return 2
 
     if debug:
+        print(f"Debug: auth_mode={'PROJECT_API_KEY' if project_api_key else getattr(credential, 'name', 'default')}")
         print(f"Debug: credential_ready in {_fmt_duration(start)}")
 
-    try:
-        print("Loading Azure AI Projects client...")
-        from azure.ai.projects import AIProjectClient
-    except Exception as exc:  # noqa: BLE001
-        raise SystemExit(
-            "Missing Azure AI Projects SDK. Install with: pip install -r packages/agentcy/requirements.txt"
-        ) from exc
-
     try:
         call_start = _now()
         print("Connecting to Foundry project and invoking agent...")
-        project_client = AIProjectClient(endpoint=endpoint, credential=credential)
-        openai_client = project_client.get_openai_client()
-
-        response = openai_client.responses.create(
-            input=[{"role": "user", "content": prompt}],
-            extra_body={"agent": {"name": agent_name, "type": "agent_reference"}},
-        )
-
-        text = (response.output_text or "").strip()
-        if not text:
-            raise SystemExit("Agent returned empty output")
+        text = _ask_agent(endpoint, agent_name, prompt, project_api_key)
 
         OUTFILE.write_text(text + "\n", encoding="utf-8")
         print(f"Wrote: {OUTFILE}")
+        if cache is not None:
+            try:
+                cache.put(key, text)
+            except OSError:
+                pass  # caching is best-effort
         if debug:
             print(f"Debug: call_completed in {_fmt_duration(call_start)}")
+            print(
+                f"Debug: latency=cold (in-process) total={_fmt_duration(invoked)} "
+                f"credential={call_start - start:.2f}s agent_call={_fmt_duration(call_start)}"
+            )
         return 0
 
     except KeyboardInterrupt:
@@ -209,6 +260,34 @@ def run_speak(
         return 2
 
 
+def run_serve(endpoint: str, project_api_key: str, debug: bool) -> int:
+    """Answer `speak` requests on the daemon socket until interrupted."""
+    start = _now()
+    if endpoint:
+        # Warm up imports, credential and clients now rather than on the first request.
+        get_openai_client(endpoint, project_api_key)
+        if debug:
+            print(f"Debug: clients_ready in {_fmt_duration(start)}")
+
+    def speak(request: dict) -> str:
+        return _ask_agent(
+            str(request.get("endpoint") or endpoint),
+            str(request.get("agent") or ""),
+            str(request.get("prompt") or ""),
+            project_api_key,
+        )
+
+    server = daemon.DaemonServer(daemon.socket_path(), speak, auth=auth_id(project_api_key))
+    print(f"heyCopilot daemon listening on {server.path} (pid {os.getpid()}); Ctrl+C to stop.")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping.")
+    finally:
+        server.server_close()
+    return 0
+
+
 def run_sanity_check(debug: bool) -> int:
     """Validate imports and print versions without calling the network."""
     if debug:
@@ -265,6 +344,17 @@ def main(argv: Optional[list[str]] = None) -> int:
     )
     sp.add_argument("--project-api-key", default=_env("PROJECT_API_KEY"), help="Foundry Project API key (optional)")
     sp.add_argument("--dry-run", action="store_true", help="Don't call network; just show what would happen")
+    sp.add_argument("--no-cache", action="store_true", help="Always call the agent, even for a prompt answered before")
+    sp.add_argument("--no-daemon", action="store_true", help="Call the agent in this process even if `serve` is running")
+
+    sv = sub.add_parser("serve", help="Keep clients warm and answer `speak` over a local Unix socket")
+    sv.add_argument("--debug", action="store_true", help="Enable verbose debug output")
+    sv.add_argument(
+        "--endpoint",
+        default=_env("USER_ENDPOINT", DEFAULT_ENDPOINT),
+        help="Foundry project endpoint to warm up (USER_ENDPOINT); requests may name another",
+    )
+    sv.add_argument("--project-api-key", default=_env("PROJECT_API_KEY"), help="Foundry Project API key (optional)")
 
     sc = sub.add_parser("sanity-check", help="Validate imports/versions (no network)")
     sc.add_argument("--debug", action="store_true", help="Enable verbose debug output")
@@ -275,7 +365,19 @@ def main(argv: Optional[list[str]] = None) -> int:
     _setup_logging(debug)
 
     if args.cmd == "speak":
-        return run_speak(args.endpoint, args.agent, args.prompt, args.project_api_key, args.dry_run, debug)
+        return run_speak(
+            args.endpoint,
+            args.agent,
+            args.prompt,
+            args.project_api_key,
+            args.dry_run,
+            debug,
+            use_cache=not args.no_cache,
+            use_daemon=not args.no_daemon,
+        )
+
+    if args.cmd == "serve":
+        return run_serve(args.endpoint, args.project_api_key, debug)
 
     if args.cmd == "sanity-check":
         return run_sanity_check(debug)
@@ -0,0 +1,172 @@
+"""Unix-socket daemon that keeps `hey_copilot` warm between invocations.
+
+`./heyCopilot speak` is a fresh interpreter every time: Python start-up, the
+Azure SDK imports, credential and client construction, then one agent call.
+`hey_copilot serve` pays for all of that once and then answers requests on a
+Unix domain socket; `speak` forwards its prompt there and only falls back to
+the in-process path when no daemon is listening or the daemon runs under a
+different identity. Once a request has been sent the client never falls back:
+the daemon may already be calling the agent, and a second call would repeat it.
+
+Protocol: one JSON object per line in each direction, one request per
+connection.
+
+  -> {"cmd": "speak", "endpoint": "...", "agent": "...", "prompt": "...", "auth": "entra"}
+  <- {"ok": true, "text": "...", "elapsed_ms": 812.4}
+  <- {"ok": false, "error": "ClientAuthenticationError: ..."}
+  <- {"ok": false, "error": "...", "auth_mismatch": true}
+
+`auth` is `foundry_session.auth_id()` of the client's `PROJECT_API_KEY`; a
+daemon started with a different key (or without one) refuses the request
+before calling the agent.
+
+  -> {"cmd": "ping"}
+  <- {"ok": true, "pid": 1234, "served": 17, "uptime_s": 3600.0}
+
+The socket is `<cache>/hey_copilot.sock` (see `agentcy_cache.py`) unless
+`HEY_COPILOT_SOCKET` is set, and is created with mode 0600: the daemon acts
+with the credentials it was started with, so only the same user may use it.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import socketserver
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from scripts.agentcy_cache import cache_root
+
+# How long the client waits for a daemon to accept before falling back.
+CONNECT_TIMEOUT_S = 0.5
+# Agent calls can be slow; this only guards against a hung daemon.
+REQUEST_TIMEOUT_S = 300.0
+MAX_REQUEST_BYTES = 1 << 20
+
+Handler = Callable[[dict[str, Any]], str]
+
+
+def socket_path() -> Path:
+    explicit = os.getenv("HEY_COPILOT_SOCKET", "").strip()
+    return Path(explicit).expanduser() if explicit else cache_root() / "hey_copilot.sock"
+
+
+def _send(sock: socket.socket, message: dict[str, Any]) -> None:
+    sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+
+
+def _recv(sock_file: Any) -> Optional[dict[str, Any]]:
+    line = sock_file.readline(MAX_REQUEST_BYTES + 1)
+    if not line or len(line) > MAX_REQUEST_BYTES:
+        return None
+    message = json.loads(line)
+    return message if isinstance(message, dict) else None
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    server: "DaemonServer"
+
+    def handle(self) -> None:
+        try:
+            request = _recv(self.rfile)
+        except ValueError:
+            request = None
+        if request is None:
+            _send(self.connection, {"ok": False, "error": "Bad request"})
+            return
+        _send(self.connection, self.server.dispatch(request))
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, speak: Handler, *, auth: Optional[str] = None) -> None:
+        self.path = Path(path)
+        self.speak = speak
+        # `auth_id()` of the daemon's credential; None accepts any request.
+        self.auth = auth
+        self.started = time.monotonic()
+        self.served = 0
+        self._count_lock = threading.Lock()
+        _claim_socket(self.path)
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(str(self.path), _RequestHandler)
+        finally:
+            os.umask(old_umask)
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        cmd = request.get("cmd")
+        if cmd == "ping":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "served": self.served,
+                "uptime_s": round(time.monotonic() - self.started, 1),
+            }
+        if cmd != "speak":
+            return {"ok": False, "error": f"Unknown command: {cmd!r}"}
+        if self.auth is not None and request.get("auth") != self.auth:
+            return {"ok": False, "error": "Daemon runs under a different identity", "auth_mismatch": True}
+        started = time.perf_counter()
+        try:
+            text = self.speak(request)
+        except BaseException as exc:  # noqa: BLE001 - SystemExit from helpers must not stop the daemon
+            if isinstance(exc, KeyboardInterrupt):
+                raise
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        with self._count_lock:
+            self.served += 1
+        return {"ok": True, "text": text, "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)}
+
+    def server_close(self) -> None:
+        super().server_close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _claim_socket(path: Path) -> None:
+    """Remove a socket left behind by a daemon that died; refuse if one is still answering."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if not path.exists():
+        return
+    if ping(path) is not None:
+        raise SystemExit(f"A heyCopilot daemon is already listening on {path}")
+    path.unlink()
+
+
+def request(path: Path, message: dict[str, Any], *, timeout: float = REQUEST_TIMEOUT_S) -> Optional[dict[str, Any]]:
+    """Send one request to the daemon at `path`; None if no daemon is listening.
+
+    Failures after connecting (timeout, reset, no reply) raise: the daemon may
+    already be acting on the request.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT_S)
+        try:
+            sock.connect(str(path))
+        except OSError:
+            return None
+        sock.settimeout(timeout)
+        _send(sock, message)
+        with sock.makefile("rb") as f:
+            reply = _recv(f)
+        if reply is None:
+            raise ConnectionError("daemon closed the connection without a reply")
+        return reply
+    finally:
+        sock.close()
+
+
+def ping(path: Path) -> Optional[dict[str, Any]]:
+    try:
+        return request(path, {"cmd": "ping"}, timeout=CONNECT_TIMEOUT_S)
+    except (OSError, ValueError):
+        return None
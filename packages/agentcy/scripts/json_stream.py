@@ -0,0 +1,313 @@
+"""Incremental JSON parsing for streamed agent output.
+
+The agent answers with one JSON object (see `foundry_to_github_pr.py`). When
+the response is streamed, the text arrives in small deltas; `JsonEventParser`
+turns them into events as soon as each piece is complete, without waiting for
+the closing brace:
+
+  ("start", path, "object" | "array")
+  ("end", path)
+  ("str", path, text, final)   string values arrive in chunks; `final` marks the last one
+  ("scalar", path, value)      numbers, true, false, null
+
+`path` is the tuple of keys/indices leading to the value, e.g.
+`("files", 0, "content")`. Object keys are never split. `JsonBuilder` folds
+the events back into the same object `json.loads` would return.
+
+The parser is strict JSON (no fences, comments or trailing commas) and raises
+`JsonStreamError` on the first invalid character or, from `close()`, on
+truncated input.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Iterable
+
+JsonPath = tuple  # tuple[str | int, ...]
+Event = tuple
+
+_WS = " \t\r\n"
+_STR_SPECIAL = re.compile(r'["\\\x00-\x1f]')
+_LITERAL_CHARS = frozenset("+-.0123456789eEtruefalsn")
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+# What the parser expects next (outside strings and literals).
+VALUE, VALUE_OR_END, KEY, KEY_OR_END, COLON, COMMA_OR_END, DONE = range(7)
+
+
+class JsonStreamError(ValueError):
+    pass
+
+
+class _Frame:
+    __slots__ = ("kind", "path", "index", "key")
+
+    def __init__(self, kind: str, path: JsonPath) -> None:
+        self.kind = kind
+        self.path = path
+        self.index = 0
+        self.key = ""
+
+
+class JsonEventParser:
+    def __init__(self) -> None:
+        self._buf = ""
+        self._pos = 0
+        self._stack: list[_Frame] = []
+        self._expect = VALUE
+        self._offset = 0  # characters consumed before _buf, for error messages
+        # Current string (key or value) and literal, if any.
+        self._in_string = False
+        self._string_is_key = False
+        self._string_path: JsonPath = ()
+        self._string_parts: list[str] = []
+        self._literal: str | None = None
+        self._literal_path: JsonPath = ()
+
+    # -- helpers -------------------------------------------------------------
+
+    def _error(self, message: str) -> JsonStreamError:
+        return JsonStreamError(f"{message} at char {self._offset + self._pos}")
+
+    def _value_path(self) -> JsonPath:
+        if not self._stack:
+            return ()
+        frame = self._stack[-1]
+        return frame.path + ((frame.index,) if frame.kind == "array" else (frame.key,))
+
+    def _after_value(self) -> None:
+        self._expect = COMMA_OR_END if self._stack else DONE
+
+    def _flush_string(self, events: list[Event], final: bool) -> None:
+        if self._string_is_key:
+            if final:
+                self._stack[-1].key = "".join(self._string_parts)
+                self._string_parts = []
+            return
+        text = "".join(self._string_parts)
+        self._string_parts = []
+        if text or final:
+            events.append(("str", self._string_path, text, final))
+
+    def _finish_literal(self, events: list[Event]) -> None:
+        literal, self._literal = self._literal or "", None
+        try:
+            value = json.loads(literal)
+        except ValueError:
+            raise self._error(f"Invalid literal {literal!r}") from None
+        if isinstance(value, (dict, list, str)):
+            raise self._error(f"Invalid literal {literal!r}")
+        events.append(("scalar", self._literal_path, value))
+        self._after_value()
+
+    # -- strings -------------------------------------------------------------
+
+    def _scan_string(self, events: list[Event]) -> bool:
+        """Consume string text. True when the closing quote was reached, False if more input is needed."""
+        buf = self._buf
+        i = self._pos
+        parts = self._string_parts
+        while True:
+            m = _STR_SPECIAL.search(buf, i)
+            if m is None:
+                parts.append(buf[i:])
+                self._pos = len(buf)
+                return False
+            j = m.start()
+            if j > i:
+                parts.append(buf[i:j])
+            ch = buf[j]
+            if ch == '"':
+                self._pos = j + 1
+                self._in_string = False
+                self._flush_string(events, final=True)
+                if self._string_is_key:
+                    self._expect = COLON
+                else:
+                    self._after_value()
+                return True
+            if ch != "\\":
+                self._pos = j
+                raise self._error("Control character in string")
+            if j + 1 >= len(buf):
+                self._pos = j
+                return False
+            esc = buf[j + 1]
+            if esc in _ESCAPES:
+                parts.append(_ESCAPES[esc])
+                i = j + 2
+                continue
+            if esc != "u":
+                self._pos = j
+                raise self._error(f"Invalid escape \\{esc}")
+            if len(buf) < j + 6:
+                self._pos = j
+                return False
+            try:
+                code = int(buf[j + 2 : j + 6], 16)
+            except ValueError:
+                self._pos = j
+                raise self._error("Invalid \\u escape") from None
+            i = j + 6
+            if 0xD800 <= code < 0xDC00:
+                # A high surrogate may be followed by its low half; wait until we can tell.
+                tail = buf[j + 6 : j + 12]
+                if len(tail) < 6 and "\\u".startswith(tail[:2]):
+                    self._pos = j
+                    return False
+                if tail[:2] == "\\u":
+                    try:
+                        low = int(tail[2:6], 16)
+                    except ValueError:
+                        low = 0
+                    if 0xDC00 <= low < 0xE000:
+                        code = 0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00)
+                        i = j + 12
+            parts.append(chr(code))
+
+    # -- main loop -----------------------------------------------------------
+
+    def feed(self, text: str) -> list[Event]:
+        """Parse the next piece of input; returns the events it completed."""
+        self._offset += self._pos
+        self._buf = self._buf[self._pos :] + text
+        self._pos = 0
+        events: list[Event] = []
+        buf = self._buf
+        n = len(buf)
+        while self._pos < n:
+            if self._in_string:
+                if not self._scan_string(events):
+                    break
+                continue
+            if self._literal is not None:
+                start = self._pos
+                while self._pos < n and buf[self._pos] in _LITERAL_CHARS:
+                    self._pos += 1
+                self._literal += buf[start : self._pos]
+                if self._pos == n:
+                    break
+                self._finish_literal(events)
+                continue
+
+            c = buf[self._pos]
+            if c in _WS:
+                self._pos += 1
+                continue
+            expect = self._expect
+            if expect in (VALUE, VALUE_OR_END):
+                if c == "]" and expect == VALUE_OR_END:
+                    self._close_container("array", events)
+                elif c == "{" or c == "[":
+                    path = self._value_path()
+                    kind = "object" if c == "{" else "array"
+                    events.append(("start", path, kind))
+                    self._stack.append(_Frame(kind, path))
+                    self._expect = KEY_OR_END if c == "{" else VALUE_OR_END
+                    self._pos += 1
+                elif c == '"':
+                    self._in_string, self._string_is_key = True, False
+                    self._string_path = self._value_path()
+                    self._pos += 1
+                elif c in _LITERAL_CHARS:
+                    self._literal, self._literal_path = "", self._value_path()
+                else:
+                    raise self._error(f"Unexpected {c!r}")
+            elif expect in (KEY, KEY_OR_END):
+                if c == '"':
+                    self._in_string, self._string_is_key = True, True
+                    self._pos += 1
+                elif c == "}" and expect == KEY_OR_END:
+                    self._close_container("object", events)
+                else:
+                    raise self._error(f"Expected a key, got {c!r}")
+            elif expect == COLON:
+                if c != ":":
+                    raise self._error(f"Expected ':', got {c!r}")
+                self._expect = VALUE
+                self._pos += 1
+            elif expect == COMMA_OR_END:
+                frame = self._stack[-1]
+                if c == ",":
+                    if frame.kind == "array":
+                        frame.index += 1
+                        self._expect = VALUE
+                    else:
+                        self._expect = KEY
+                    self._pos += 1
+                elif c == ("]" if frame.kind == "array" else "}"):
+                    self._close_container(frame.kind, events)
+                else:
+                    raise self._error(f"Expected ',' or end of {frame.kind}, got {c!r}")
+            else:
+                raise self._error("Extra data after JSON value")
+
+        if self._in_string and not self._string_is_key:
+            self._flush_string(events, final=False)
+        return events
+
+    def _close_container(self, kind: str, events: list[Event]) -> None:
+        frame = self._stack.pop()
+        if frame.kind != kind:
+            raise self._error(f"Mismatched end of {frame.kind}")
+        events.append(("end", frame.path))
+        self._pos += 1
+        self._after_value()
+
+    def close(self) -> list[Event]:
+        """Signal end of input; raises JsonStreamError if the value is incomplete."""
+        events: list[Event] = []
+        if self._literal is not None:
+            self._finish_literal(events)
+        if self._in_string or self._stack or self._expect != DONE:
+            raise self._error("Truncated JSON")
+        return events
+
+
+class JsonBuilder:
+    """Rebuilds the parsed value from events."""
+
+    def __init__(self) -> None:
+        self.value: Any = None
+        self._containers: dict[JsonPath, Any] = {}
+        self._strings: dict[JsonPath, list[str]] = {}
+
+    def _set(self, path: JsonPath, value: Any) -> None:
+        if not path:
+            self.value = value
+            return
+        parent = self._containers[path[:-1]]
+        if isinstance(parent, list):
+            parent.append(value)
+        else:
+            parent[path[-1]] = value
+
+    def handle(self, event: Event) -> None:
+        kind, path = event[0], event[1]
+        if kind == "start":
+            container: Any = {} if event[2] == "object" else []
+            self._set(path, container)
+            self._containers[path] = container
+        elif kind == "end":
+            self._containers.pop(path, None)
+        elif kind == "str":
+            parts = self._strings.setdefault(path, [])
+            parts.append(event[2])
+            if event[3]:
+                self._set(path, "".join(self._strings.pop(path)))
+        else:
+            self._set(path, event[2])
+
+
+def parse_chunks(chunks: Iterable[str]) -> Any:
+    """`json.loads` for an iterable of text pieces (mostly for tests)."""
+    parser = JsonEventParser()
+    builder = JsonBuilder()
+    for chunk in chunks:
+        for event in parser.feed(chunk):
+            builder.handle(event)
+    for event in parser.close():
+        builder.handle(event)
+    return builder.value
@@ -0,0 +1,122 @@
+"""On-disk cache of agent answers, keyed by everything that went into the request.
+
+The same feedback against the same repo revision used to cost a full Foundry
+round-trip every time: dry runs, re-runs, and retries after a failed push. The
+key is a SHA-256 of (endpoint, agent, model deployment, instructions, prompt,
+revision). `revision` is the commit the repo context was built from: without
+`--share-files` the prompt only carries the file tree, so an upstream edit to
+an existing file would not change the prompt, and a cached proposal (with
+full file contents from the older revision) would overwrite it. A hit skips
+the agent entirely (no client, no `create_version`).
+
+Entries live under `<cache>/proposals/` (see `agentcy_cache.py`), one file per
+key. Reading an entry bumps its mtime; when the directory grows past
+`max_bytes` (env `AGENTCY_PROPOSAL_CACHE_MAX_MB`, default 64) the least
+recently used entries are deleted. Scripts take `--no-cache` to bypass it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from scripts.agentcy_cache import cache_dir
+
+DEFAULT_MAX_MB = 64
+KEY_VERSION = 2
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    if not raw:
+        return default
+    try:
+        return int(raw)
+    except ValueError:
+        return default
+
+
+def cache_key(*, endpoint: str, agent_name: str, model: str, instructions: str, prompt: str, revision: str = "") -> str:
+    """Key for one agent request; pass the base commit SHA as `revision` when the answer depends on repo files."""
+    material = json.dumps([KEY_VERSION, endpoint, agent_name, model, instructions, prompt, revision], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ProposalCache:
+    def __init__(self, root: Optional[Path] = None, *, max_bytes: Optional[int] = None) -> None:
+        self.root = Path(root) if root else cache_dir("proposals")
+        self.root.mkdir(parents=True, exist_ok=True)
+        if max_bytes is None:
+            max_bytes = _env_int("AGENTCY_PROPOSAL_CACHE_MAX_MB", DEFAULT_MAX_MB) * 1024 * 1024
+        self.max_bytes = max(0, int(max_bytes))
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.txt"
+
+    def get(self, key: str) -> Optional[str]:
+        path = self._path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)  # most recently used
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp.write_text(text, encoding="utf-8")
+        os.replace(tmp, path)
+        self.evict()
+
+    def evict(self) -> int:
+        """Delete least recently used entries until the cache fits in `max_bytes`. Returns how many were deleted."""
+        entries = []
+        total = 0
+        for path in self.root.glob("*.txt"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        removed = 0
+        for _, size, path in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[ProposalCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> ProposalCache:
+    """The process-wide cache under the default cache dir."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ProposalCache()
+        return _cache
@@ -0,0 +1,91 @@
+"""Thread-safe token-bucket rate limiter shared by concurrent pipeline workers.
+
+`github_issues_to_pr.py --parallel N` runs several agent proposals and many
+GitHub comment/label calls at once. Both services have rate limits (Foundry
+requests per minute, GitHub secondary limits on bursts of writes), so every
+worker takes a token from the same named bucket before calling out:
+
+  from scripts.rate_limit import get_limiter
+  get_limiter("github", rate_per_s=10).acquire()
+
+Buckets are per process; `configure(name, ...)` replaces one (e.g. from CLI
+flags) before workers start.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """`rate_per_s` tokens per second, bursts of up to `burst` tokens."""
+
+    def __init__(self, rate_per_s: float, burst: Optional[float] = None) -> None:
+        if rate_per_s <= 0:
+            raise ValueError("rate_per_s must be > 0")
+        self.rate_per_s = float(rate_per_s)
+        self.burst = max(1.0, float(burst if burst is not None else rate_per_s))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+        self.acquired = 0
+        self.waited_s = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_s)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block until `tokens` are available. Returns False if `timeout` ran out first."""
+        tokens = min(float(tokens), self.burst)
+        started = time.monotonic()
+        deadline = None if timeout is None else started + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    self.acquired += 1
+                    self.waited_s += now - started
+                    return True
+                wait = (tokens - self._tokens) / self.rate_per_s
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "rate_per_s": self.rate_per_s,
+                "burst": self.burst,
+                "acquired": self.acquired,
+                "waited_s": round(self.waited_s, 3),
+            }
+
+
+_limiters: dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def configure(name: str, rate_per_s: float, burst: Optional[float] = None) -> TokenBucket:
+    """Create (or replace) the shared bucket called `name`."""
+    bucket = TokenBucket(rate_per_s, burst)
+    with _limiters_lock:
+        _limiters[name] = bucket
+    return bucket
+
+
+def get_limiter(name: str, rate_per_s: float = 10.0, burst: Optional[float] = None) -> TokenBucket:
+    """Return the shared bucket called `name`, creating it with these settings on first use."""
+    with _limiters_lock:
+        bucket = _limiters.get(name)
+        if bucket is None:
+            bucket = _limiters[name] = TokenBucket(rate_per_s, burst)
+        return bucket
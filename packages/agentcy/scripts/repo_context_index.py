@@ -0,0 +1,293 @@
+"""Cached repo context (file tree + small text files) for agent prompts.
+
+`foundry_to_github_pr.py` used to walk the checkout with `rglob("*")` and,
+with `--share-files`, read and decode every candidate file on every run. Both
+are answered from git instead:
+
+- the tree comes from `git ls-tree -r -l HEAD` (paths, blob SHAs and sizes,
+  without touching the working tree);
+- file contents are cached in a SQLite database keyed by blob SHA, next to
+  the mirror (see `git_mirror.py`). A blob never changes, so a later run only
+  reads (through one `git cat-file --batch` process) the blobs it has not
+  seen before.
+
+Each row records the blob size, whether it decoded as UTF-8 text and, for
+text, the decoded content. Rows unused for `MAX_UNUSED_DAYS` are dropped.
+
+Text blobs also get their BM25 term counts (see repo_retrieval.py) stored in
+`blob_terms`, so `relevant_text_files` can rank every small text file in the
+tree against the feedback without tokenizing unchanged files again, and only
+loads the content of the files it selects.
+"""
+
+from __future__ import annotations
+
+import itertools
+import json
+import sqlite3
+import subprocess
+import time
+from collections import Counter
+from contextlib import closing
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+from scripts.repo_retrieval import Selection, document, estimate_tokens, pick, selection_stats, terms
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    sha TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    is_text INTEGER NOT NULL,
+    content TEXT,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS blobs_last_used ON blobs (last_used);
+CREATE TABLE IF NOT EXISTS blob_terms (
+    sha TEXT PRIMARY KEY,
+    terms TEXT NOT NULL
+);
+"""
+# Rows per `IN (...)` query (below SQLite's host-parameter limit).
+_CHUNK = 500
+
+MAX_UNUSED_DAYS = 30
+BINARY_SUFFIXES = {".png", ".jpg", ".jpeg", ".gif", ".pdf", ".zip", ".tar", ".gz", ".so"}
+
+
+@dataclass
+class TreeEntry:
+    path: str
+    sha: str
+    size: int
+
+
+def list_tree(repo_dir: Path, rev: str = "HEAD") -> list[TreeEntry]:
+    """Blobs in `rev`, sorted by path. Submodules are skipped."""
+    result = subprocess.run(
+        ["git", "ls-tree", "-r", "-l", "-z", "--full-tree", rev],
+        cwd=str(repo_dir),
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"git ls-tree failed\nstderr: {result.stderr.decode('utf-8', 'replace').strip()}")
+    entries: list[TreeEntry] = []
+    for record in result.stdout.split(b"\0"):
+        if not record:
+            continue
+        meta, _, path = record.partition(b"\t")
+        mode, kind, sha, size = meta.split()
+        if kind != b"blob":
+            continue
+        # Symlinks are blobs too; their "content" is the link target, never worth sharing.
+        entries.append(
+            TreeEntry(
+                path=path.decode("utf-8", "surrogateescape"),
+                sha=sha.decode("ascii"),
+                size=-1 if mode == b"120000" else int(size),
+            )
+        )
+    return entries
+
+
+def read_blobs(repo_dir: Path, shas: list[str]) -> dict[str, bytes]:
+    """Contents of `shas` through a single `git cat-file --batch`."""
+    if not shas:
+        return {}
+    result = subprocess.run(
+        ["git", "cat-file", "--batch"],
+        cwd=str(repo_dir),
+        input="".join(f"{sha}\n" for sha in shas).encode("ascii"),
+        capture_output=True,
+    )
+    if result.returncode != 0:
+        raise SystemExit(f"git cat-file failed\nstderr: {result.stderr.decode('utf-8', 'replace').strip()}")
+    out: dict[str, bytes] = {}
+    data = result.stdout
+    pos = 0
+    while pos < len(data):
+        end = data.index(b"\n", pos)
+        header = data[pos:end].split()
+        pos = end + 1
+        if len(header) < 3 or header[1] == b"missing":
+            continue
+        size = int(header[2])
+        out[header[0].decode("ascii")] = data[pos : pos + size]
+        pos += size + 1  # content is followed by a newline
+    return out
+
+
+class ContextIndex:
+    """Blob-SHA -> (size, is_text, content) cache. One short-lived connection per call."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with closing(self._connect()) as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    @staticmethod
+    def _eligible(entries: Iterable[TreeEntry], is_excluded, max_bytes: int) -> Iterator[TreeEntry]:
+        return (
+            e
+            for e in entries
+            if 0 <= e.size <= max_bytes
+            and Path(e.path).suffix.lower() not in BINARY_SUFFIXES
+            and not is_excluded(e.path)
+        )
+
+    def _cache_blobs(self, conn: sqlite3.Connection, repo_dir: Path, shas: list[str], now: float) -> None:
+        """Read and store the blobs in `shas` that are not cached yet; refresh `last_used` on the rest."""
+        known: set[str] = set()
+        for chunk in range(0, len(shas), _CHUNK):
+            part = shas[chunk : chunk + _CHUNK]
+            rows = conn.execute(f"SELECT sha FROM blobs WHERE sha IN ({','.join('?' * len(part))})", part)
+            known.update(sha for (sha,) in rows)
+        missing = [sha for sha in shas if sha not in known]
+        rows_to_add = []
+        for sha, data in read_blobs(repo_dir, missing).items():
+            try:
+                text: Optional[str] = data.decode("utf-8")
+            except UnicodeDecodeError:
+                text = None
+            rows_to_add.append((sha, len(data), 0 if text is None else 1, text, now))
+        self.hits += len(shas) - len(missing)
+        self.misses += len(missing)
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?)", rows_to_add)
+            conn.executemany("UPDATE blobs SET last_used = ? WHERE sha = ?", [(now, sha) for sha in known])
+            conn.execute("DELETE FROM blobs WHERE last_used < ?", (now - MAX_UNUSED_DAYS * 86400,))
+            conn.execute("DELETE FROM blob_terms WHERE sha NOT IN (SELECT sha FROM blobs)")
+
+    def relevant_text_files(
+        self,
+        repo_dir: Path,
+        entries: Iterable[TreeEntry],
+        query: str,
+        *,
+        budget_tokens: int,
+        is_excluded=lambda path: False,
+        max_bytes: int = 50_000,
+    ) -> Selection:
+        """The small UTF-8 files most relevant to `query`, up to `budget_tokens` (see repo_retrieval.py).
+
+        Every eligible file in `entries` is ranked. Term counts come from
+        `blob_terms`; a blob is read and tokenized only the first time it is
+        seen, and only the selected files' contents are loaded.
+        """
+        started = time.perf_counter()
+        candidates = list(self._eligible(entries, is_excluded, max_bytes))
+        now = time.time()
+        shas = sorted({e.sha for e in candidates})
+        conn = self._connect()
+        try:
+            self._cache_blobs(conn, repo_dir, shas, now)
+            sizes: dict[str, int] = {}
+            counts: dict[str, str] = {}
+            for chunk in range(0, len(shas), _CHUNK):
+                part = shas[chunk : chunk + _CHUNK]
+                marks = ",".join("?" * len(part))
+                rows = conn.execute(
+                    f"SELECT b.sha, b.size, t.terms FROM blobs b LEFT JOIN blob_terms t ON t.sha = b.sha "
+                    f"WHERE b.is_text = 1 AND b.sha IN ({marks})",
+                    part,
+                )
+                for sha, size, term_json in rows:
+                    sizes[sha] = size
+                    if term_json is not None:
+                        counts[sha] = term_json
+            # Text blobs without term counts yet (new, or cached before blob_terms existed).
+            unindexed = [sha for sha in sizes if sha not in counts]
+            for chunk in range(0, len(unindexed), _CHUNK):
+                part = unindexed[chunk : chunk + _CHUNK]
+                rows = conn.execute(
+                    f"SELECT sha, content FROM blobs WHERE sha IN ({','.join('?' * len(part))})", part
+                ).fetchall()
+                added = [(sha, json.dumps(Counter(terms(content or "")), separators=(",", ":"))) for sha, content in rows]
+                counts.update(added)
+                with conn:
+                    conn.executemany("INSERT OR REPLACE INTO blob_terms VALUES (?, ?)", added)
+
+            text_entries = [e for e in candidates if e.sha in sizes]
+            parsed: dict[str, Counter] = {sha: Counter(json.loads(counts[sha])) for sha in sizes}
+            paths = [e.path for e in text_entries]
+            docs = [document(e.path, parsed[e.sha]) for e in text_entries]
+            # Same estimate as repo_retrieval._file_tokens, from the blob size.
+            costs = [estimate_tokens(e.path) + sizes[e.sha] // 4 + 1 + 8 for e in text_entries]
+            picked, used = pick(paths, docs, costs, query, budget_tokens)
+
+            chosen = sorted({text_entries[i].sha for i in picked})
+            contents: dict[str, str] = {}
+            for chunk in range(0, len(chosen), _CHUNK):
+                part = chosen[chunk : chunk + _CHUNK]
+                rows = conn.execute(
+                    f"SELECT sha, content FROM blobs WHERE sha IN ({','.join('?' * len(part))})", part
+                )
+                contents.update(rows)
+        finally:
+            conn.close()
+
+        files = [{"path": text_entries[i].path, "content": contents[text_entries[i].sha]} for i in picked]
+        total_bytes = sum(sizes[e.sha] for e in text_entries)
+        selected_bytes = sum(sizes[text_entries[i].sha] for i in picked)
+        return Selection(
+            files=files,
+            stats=selection_stats(len(text_entries), len(files), used, budget_tokens, total_bytes, selected_bytes, started),
+        )
+
+    def small_text_files(
+        self,
+        repo_dir: Path,
+        entries: Iterable[TreeEntry],
+        *,
+        is_excluded=lambda path: False,
+        max_bytes: int = 50_000,
+        max_files: int = 80,
+        max_scanned: Optional[int] = None,
+    ) -> list[dict]:
+        """{path, content} for up to `max_files` UTF-8 files of at most `max_bytes`.
+
+        Looks at the first `max_scanned` entries (default `max_files * 6`) that
+        pass the size/suffix/`is_excluded` filters; only uncached blobs are read.
+        """
+        eligible = self._eligible(entries, is_excluded, max_bytes)
+        candidates = list(itertools.islice(eligible, max_scanned if max_scanned is not None else max_files * 6))
+        if not candidates:
+            return []
+
+        now = time.time()
+        shas = sorted({e.sha for e in candidates})
+        conn = self._connect()
+        try:
+            self._cache_blobs(conn, repo_dir, shas, now)
+            cached: dict[str, tuple[int, Optional[str]]] = {}
+            for chunk in range(0, len(shas), _CHUNK):
+                part = shas[chunk : chunk + _CHUNK]
+                rows = conn.execute(
+                    f"SELECT sha, is_text, content FROM blobs WHERE sha IN ({','.join('?' * len(part))})", part
+                )
+                cached.update((sha, (is_text, content)) for sha, is_text, content in rows)
+        finally:
+            conn.close()
+
+        out: list[dict] = []
+        for e in candidates:
+            if len(out) >= max_files:
+                break
+            is_text, content = cached.get(e.sha, (0, None))
+            if is_text:
+                out.append({"path": e.path, "content": content})
+        return out
+
+    def stats(self) -> dict[str, int]:
+        with closing(self._connect()) as conn:
+            (blobs,) = conn.execute("SELECT COUNT(*) FROM blobs").fetchone()
+        return {"blobs": blobs, "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,157 @@
+"""Pick the repo files most relevant to a piece of feedback, within a token budget.
+
+With `--share-files` the PR scripts used to send the first N small files in
+walk order, whatever the feedback was about. Instead, candidates are ranked
+against the feedback with BM25 (file path words count extra, so "the snake
+game" finds `games/snake/...`) and taken best-first until the token budget is
+spent:
+
+  selection = select_files(candidates, feedback_text, budget_tokens=12000)
+  context["files"] = selection.files
+  print(selection.summary())
+
+`select_files` ranks the `{path, content}` files it is given. With a git
+checkout, `repo_context_index.ContextIndex.relevant_text_files` ranks every
+small text file instead, from term counts kept per blob SHA, so a file's
+content is tokenized once and only the selected files are loaded.
+
+Tokens are estimated at ~4 characters each, which is close enough for
+budgeting. If nothing matches (e.g. empty feedback), the first files in path
+order fill the budget, which is the old behaviour minus the overflow.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+DEFAULT_BUDGET_TOKENS = 12_000
+# Words in a file's path count this many times (names say a lot about what a file is for).
+PATH_WEIGHT = 3
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_CAMEL_RE = re.compile(r"(?<=[a-z0-9])(?=[A-Z])")
+_TERM_RE = re.compile(r"[a-z0-9]{2,}")
+_STOPWORDS = frozenset(
+    """
+    a an and are as at be but by can could do does for from has have how i if in into is it its me my no not
+    of on or our please so some than that the their them then there these they this to too us was we were
+    what when where which while who why will with would you your
+    """.split()
+)
+
+
+def terms(text: str) -> list[str]:
+    """Lowercase words of `text`, camelCase and snake_case split apart, without stopwords."""
+    return [t for t in _TERM_RE.findall(_CAMEL_RE.sub(" ", text).lower().replace("_", " ")) if t not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+
+def _file_tokens(f: dict[str, Any]) -> int:
+    # Path, content and the JSON punctuation around them.
+    return estimate_tokens(f["path"]) + estimate_tokens(f["content"]) + 8
+
+
+class BM25:
+    """Okapi BM25 over a fixed set of documents."""
+
+    def __init__(self, docs: list[Counter]) -> None:
+        self.docs = docs
+        self.lengths = [sum(d.values()) for d in docs]
+        self.avg_length = (sum(self.lengths) / len(docs)) if docs else 0.0
+        df: Counter = Counter()
+        for d in docs:
+            df.update(d.keys())
+        n = len(docs)
+        self.idf = {t: math.log(1 + (n - k + 0.5) / (k + 0.5)) for t, k in df.items()}
+
+    def scores(self, query: list[str]) -> list[float]:
+        q = [t for t in set(query) if t in self.idf]
+        out = []
+        for doc, length in zip(self.docs, self.lengths):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / self.avg_length) if self.avg_length else BM25_K1
+            s = 0.0
+            for t in q:
+                tf = doc.get(t)
+                if tf:
+                    s += self.idf[t] * tf * (BM25_K1 + 1) / (tf + norm)
+            out.append(s)
+        return out
+
+
+@dataclass
+class Selection:
+    files: list[dict[str, Any]]
+    stats: dict[str, Any] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        return summarize(self.stats)
+
+
+def summarize(stats: dict[str, Any]) -> str:
+    """One line for run output, from `Selection.stats`."""
+    return (
+        f"Context: {stats['selected']} of {stats['candidates']} file(s), "
+        f"~{stats['tokens']} of {stats['budget_tokens']} tokens, "
+        f"{stats['bytes_saved']} bytes left out, selected in {stats['selection_ms']} ms"
+    )
+
+
+def document(path: str, content_terms: Counter) -> Counter:
+    """BM25 document for a file: its content terms plus its path terms (weighted)."""
+    return content_terms + Counter({t: PATH_WEIGHT for t in terms(path)})
+
+
+def pick(paths: list[str], docs: list[Counter], costs: list[int], query: str, budget_tokens: int) -> tuple[list[int], int]:
+    """Indices of the best-matching documents that fit in `budget_tokens`, best first, and the tokens used."""
+    scores = BM25(docs).scores(terms(query))
+    ranked = sorted((i for i, s in enumerate(scores) if s > 0), key=lambda i: (-scores[i], paths[i]))
+    if not ranked:
+        ranked = sorted(range(len(paths)), key=lambda i: paths[i])
+
+    picked: list[int] = []
+    used = 0
+    for i in ranked:
+        if used + costs[i] > budget_tokens:
+            continue  # a smaller, less relevant file may still fit
+        picked.append(i)
+        used += costs[i]
+    return picked, used
+
+
+def selection_stats(
+    candidates: int, selected: int, tokens: int, budget_tokens: int, total_bytes: int, selected_bytes: int, started: float
+) -> dict[str, Any]:
+    return {
+        "candidates": candidates,
+        "selected": selected,
+        "tokens": tokens,
+        "budget_tokens": budget_tokens,
+        "bytes_selected": selected_bytes,
+        "bytes_saved": total_bytes - selected_bytes,
+        "selection_ms": round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def select_files(files: list[dict[str, Any]], query: str, *, budget_tokens: int = DEFAULT_BUDGET_TOKENS) -> Selection:
+    """Most relevant `{path, content}` files for `query` that fit in `budget_tokens` (best first)."""
+    started = time.perf_counter()
+    paths = [f["path"] for f in files]
+    docs = [document(f["path"], Counter(terms(f["content"]))) for f in files]
+    picked, used = pick(paths, docs, [_file_tokens(f) for f in files], query, budget_tokens)
+    selected = [files[i] for i in picked]
+
+    total_bytes = sum(len(f["content"].encode("utf-8")) for f in files)
+    selected_bytes = sum(len(f["content"].encode("utf-8")) for f in selected)
+    return Selection(
+        files=selected,
+        stats=selection_stats(len(files), len(selected), used, budget_tokens, total_bytes, selected_bytes, started),
+    )
@@ -8,16 +8,7 @@ from pathlib import Path
 # Add packages/agentcy/ to sys.path so we can import scripts as a top-level module
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-# Provide lightweight fake azure modules so top-level imports succeed in test environment
-import types
-sys.modules.setdefault("azure", types.ModuleType("azure"))
-sys.modules.setdefault("azure.ai", types.ModuleType("azure.ai"))
-sys.modules.setdefault("azure.ai.projects", types.ModuleType("azure.ai.projects"))
-sys.modules.setdefault("azure.ai.projects.models", types.ModuleType("azure.ai.projects.models"))
-sys.modules.setdefault("azure.identity", types.ModuleType("azure.identity"))
-sys.modules.setdefault("azure.core", types.ModuleType("azure.core"))
-sys.modules.setdefault("azure.core.credentials", types.ModuleType("azure.core.credentials"))
-
+# The scripts import the Azure SDK lazily, so no azure stubs are needed here.
 from scripts import foundry_to_github_pr
 from scripts import commit_aggregated_feedback
 
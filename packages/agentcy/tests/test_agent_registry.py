@@ -0,0 +1,63 @@
+import json
+import time
+
+from scripts.agent_registry import MAX_AGE_S, AgentRegistry, definition_fingerprint, describe, ensure_agent
+
+
+def test_fingerprint_tracks_model_and_instructions():
+    fp = definition_fingerprint(model="m", instructions="i")
+    assert fp == definition_fingerprint(model="m", instructions="i")
+    assert fp != definition_fingerprint(model="m2", instructions="i")
+    assert fp != definition_fingerprint(model="m", instructions="i2")
+
+
+def test_lookup_only_matches_latest_definition_per_name(tmp_path):
+    registry = AgentRegistry(tmp_path / "agents.json")
+    a = definition_fingerprint(model="m", instructions="a")
+    b = definition_fingerprint(model="m", instructions="b")
+    assert registry.lookup("https://e/", "agent", a) is None
+
+    registry.record("https://e/", "agent", a, version="1", create_ms=250)
+    assert registry.lookup("https://e", "agent", a)["version"] == "1"
+    assert registry.lookup("https://e", "other-agent", a) is None
+    assert registry.lookup("https://other", "agent", a) is None
+
+    # Registering b makes it the latest version; a has to be registered again.
+    registry.record("https://e", "agent", b, version="2", create_ms=250)
+    assert registry.lookup("https://e", "agent", a) is None
+    assert registry.lookup("https://e", "agent", b)["version"] == "2"
+
+
+def test_old_entries_are_not_trusted(tmp_path):
+    registry = AgentRegistry(tmp_path / "agents.json")
+    fp = definition_fingerprint(model="m", instructions="i")
+    registry.record("e", "agent", fp, version="1", create_ms=1)
+    data = json.loads(registry.path.read_text(encoding="utf-8"))
+    for entry in data.values():
+        entry["registered_at"] = time.time() - MAX_AGE_S - 1
+    registry.path.write_text(json.dumps(data), encoding="utf-8")
+    assert registry.lookup("e", "agent", fp) is None
+
+
+def test_corrupt_registry_is_ignored(tmp_path):
+    path = tmp_path / "agents.json"
+    path.write_text("{not json", encoding="utf-8")
+    registry = AgentRegistry(path)
+    fp = definition_fingerprint(model="m", instructions="i")
+    assert registry.lookup("e", "agent", fp) is None
+    registry.record("e", "agent", fp, version="3", create_ms=1)
+    assert registry.lookup("e", "agent", fp)["version"] == "3"
+
+
+def test_ensure_agent_skips_create_version_when_unchanged(tmp_path):
+    registry = AgentRegistry(tmp_path / "agents.json")
+    fp = definition_fingerprint(model="m", instructions="i")
+    registry.record("e", "agent", fp, version="7", create_ms=420)
+
+    class _NoCalls:
+        def __getattr__(self, name):
+            raise AssertionError(f"project client used: {name}")
+
+    agent = ensure_agent(_NoCalls(), endpoint="e", agent_name="agent", model="m", instructions="i", registry=registry)
+    assert (agent.name, agent.version, agent.reused, agent.saved_ms) == ("agent", "7", True, 420.0)
+    assert "skipped create_version (~420 ms saved)" in describe(agent)
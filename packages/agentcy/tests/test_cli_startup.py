@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+# `--help` must not pay for the Azure SDK / OpenAI imports (well over a second on their own);
+# the CLIs import them only when they call Foundry. That is checked everywhere; a wall-clock
+# budget is too noisy for shared CI runners, so it is only enforced when
+# AGENTCY_HELP_IMPORT_BUDGET_MS is set (e.g. 500 on a quiet dev machine).
+BUDGET_MS = float(os.getenv("AGENTCY_HELP_IMPORT_BUDGET_MS") or 0)
+HEAVY = ("azure", "openai", "cryptography")
+CLIS = [
+    "scripts/ai900_practice_quiz.py",
+    "scripts/cluster_feedback_issues.py",
+    "scripts/commit_aggregated_feedback.py",
+    "scripts/export_issues_to_jsonl.py",
+    "scripts/foundry_agent_writer.py",
+    "scripts/foundry_hello_agent.py",
+    "scripts/foundry_smoke_test.py",
+    "scripts/foundry_to_github_pr.py",
+    "scripts/github_issues_to_pr.py",
+    "scripts/hey_copilot.py",
+    "scripts/run_smoke_with_prompt.py",
+]
+
+
+def _importtime(argv):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *argv],
+        cwd=str(ROOT),
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    assert result.returncode == 0, result.stderr[-2000:]
+    modules = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        modules[name.strip()] = int(cumulative)
+        if not name.startswith("  "):  # top-level import; nested ones are in its cumulative time
+            total_us += int(cumulative)
+    return modules, total_us / 1000
+
+
+@pytest.mark.parametrize("cli", CLIS)
+def test_help_does_not_load_sdks(cli):
+    modules, total_ms = _importtime([cli, "--help"])
+    heavy = sorted(m for m in modules if m.split(".")[0] in HEAVY)
+    assert not heavy, f"{cli} --help imported {heavy[:5]}"
+    if BUDGET_MS:
+        assert total_ms <= BUDGET_MS, f"{cli} --help spent {total_ms:.0f} ms importing (budget {BUDGET_MS:.0f} ms)"
+
+
+def test_story_example_imports_lazily():
+    modules, _ = _importtime(["-c", "import sys; sys.path.insert(0, 'examples'); import azure_story_agent"])
+    assert not [m for m in modules if m.split(".")[0] in HEAVY]
@@ -0,0 +1,74 @@
+import sys
+import threading
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pytest
+
+from examples.cloud_store import SQLiteCloudStore, get_store
+
+
+def test_save_and_list_newest_first(tmp_path):
+    store = SQLiteCloudStore(str(tmp_path / "saves.db"))
+    a = store.save("science-lab", "progress", "ada", {"level": 1})
+    b = store.save("science-lab", "progress", "ada", {"level": 2}, page_url="https://x/y")
+    store.save("science-lab", "settings", "ada", {"music": False})
+    store.save("thermal-drift", "progress", "bob", {"level": 9})
+
+    rows = store.list(app="science-lab", kind="progress")
+    assert [r.id for r in rows] == [b.id, a.id]
+    assert rows[0].payload == {"level": 2} and rows[0].page_url == "https://x/y"
+    assert store.latest("science-lab", "progress", "ada").payload == {"level": 2}
+    assert [r.user for r in store.list(user="bob")] == ["bob"]
+
+    page1 = store.list(limit=2)
+    page2 = store.list(limit=2, before_id=page1[-1].id)
+    assert len(page1) == 2 and len(page2) == 2
+    assert {r.id for r in page1}.isdisjoint(r.id for r in page2)
+    store.close()
+
+
+def test_uses_wal_and_indexes(tmp_path):
+    path = tmp_path / "saves.db"
+    store = SQLiteCloudStore(str(path))
+    conn = store._conn()
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = " ".join(
+        str(r[-1])
+        for r in conn.execute(
+            "EXPLAIN QUERY PLAN SELECT * FROM cloud_saves WHERE app = ? AND kind = ? AND user = ?", ("a", "b", "c")
+        )
+    )
+    assert "cloud_saves_by_app" in plan
+    for where in ("app = ?", "kind = ?", "user = ?", "app = ? AND user = ?", "kind = ? AND user = ?"):
+        sql = f"EXPLAIN QUERY PLAN SELECT * FROM cloud_saves WHERE {where}"
+        detail = [str(r[-1]) for r in conn.execute(sql, ["a"] * where.count("?"))]
+        assert any("USING INDEX" in d for d in detail), (where, detail)
+    store.close()
+
+
+def test_concurrent_writers_and_persistence(tmp_path):
+    path = str(tmp_path / "saves.db")
+    store = SQLiteCloudStore(path)
+
+    def worker(n):
+        for i in range(25):
+            store.save("app", "progress", f"u{n}", {"i": i})
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert store.stats()["writes"] == 100
+    store.close()
+
+    reopened = SQLiteCloudStore(path)
+    assert len(reopened.list(limit=1000)) == 100
+    reopened.close()
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_store("postgres", path="x")
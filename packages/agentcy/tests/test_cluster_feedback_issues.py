@@ -0,0 +1,73 @@
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts import cluster_feedback_issues
+from scripts.cluster_feedback_issues import cluster_export
+
+
+def _write_export(path, issues):
+    path.write_text("".join(json.dumps(i) + "\n" for i in issues), encoding="utf-8")
+
+
+ISSUES = [
+    {"number": 1, "title": "Typo Draagon on level 2", "body": "The boss name says Draagon instead of Dragon.", "url": "https://x/1"},
+    {"number": 2, "title": "Music too loud", "body": "Background music volume is too loud on the title screen.", "url": "https://x/2"},
+    {"number": 3, "title": "Draagon typo", "body": "Level 2 boss: Draagon should be Dragon", "url": "https://x/3"},
+    {"number": 4, "title": "Leaderboard please", "body": "Add an online leaderboard with weekly scores.", "url": "https://x/4"},
+]
+
+
+def test_cluster_export_groups_related_issues(tmp_path):
+    export, out, state = tmp_path / "all.jsonl", tmp_path / "clusters.jsonl", tmp_path / "state.json"
+    _write_export(export, ISSUES)
+
+    added, total = cluster_export(str(export), str(out), str(state))
+    assert (added, total) == (4, 3)
+    clusters = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert clusters[0]["issues"] == [1, 3]  # largest first
+    assert clusters[0]["representative"] == 1
+    assert clusters[0]["title"] == "Typo Draagon on level 2"
+    assert "draagon" in clusters[0]["keywords"]
+    assert sorted(c["size"] for c in clusters) == [1, 1, 2]
+
+
+def test_cluster_export_is_incremental(tmp_path):
+    export, out, state = tmp_path / "all.jsonl", tmp_path / "clusters.jsonl", tmp_path / "state.json"
+    _write_export(export, ISSUES[:2])
+    assert cluster_export(str(export), str(out), str(state)) == (2, 2)
+
+    _write_export(export, ISSUES)  # the export is rewritten with old + new issues
+    assert cluster_export(str(export), str(out), str(state)) == (2, 3)
+    assert cluster_export(str(export), str(out), str(state)) == (0, 3)
+
+    clusters = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert clusters[0]["issues"] == [1, 3]
+
+    assert cluster_export(str(export), str(out), str(state), rebuild=True) == (4, 3)
+
+
+def test_rerun_reads_only_the_appended_tail(tmp_path, monkeypatch):
+    export, out, state = tmp_path / "all.jsonl", tmp_path / "clusters.jsonl", tmp_path / "state.json"
+    _write_export(export, ISSUES[:2])
+    cluster_export(str(export), str(out), str(state))
+    prefix_size = export.stat().st_size
+
+    starts = []
+    real = cluster_feedback_issues.iter_export
+
+    def spy(path, start=0):
+        starts.append(start)
+        return real(path, start)
+
+    monkeypatch.setattr(cluster_feedback_issues, "iter_export", spy)
+    _write_export(export, ISSUES)  # rewritten oldest-first: old issues are an identical prefix
+    assert cluster_export(str(export), str(out), str(state)) == (2, 3)
+    assert starts == [prefix_size]
+
+    # A changed prefix (e.g. a different --limit) falls back to a full read; seen issues are still skipped.
+    _write_export(export, ISSUES[1:])
+    assert cluster_export(str(export), str(out), str(state)) == (0, 3)
+    assert starts[-1] == 0
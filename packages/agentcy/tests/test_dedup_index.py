@@ -0,0 +1,82 @@
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from examples.dedup_index import DedupIndex, minhash, shingles, similarity
+
+
+def test_similarity_tracks_jaccard():
+    a = shingles("Please add a leaderboard and more levels to the space game")
+    b = shingles("please add a leaderboard and more levels to the space game!!")
+    c = shingles("The music is too loud on the title screen")
+    assert similarity(minhash(a), minhash(b)) > 0.8
+    assert similarity(minhash(a), minhash(c)) < 0.3
+
+
+def test_duplicates_join_cluster_per_app():
+    index = DedupIndex()
+    first = index.add("There's a typo on level 2: 'Draagon' instead of 'Dragon'.", app="thermal-drift")
+    dup = index.add("theres a typo on level 2 - 'Draagon' instead of 'Dragon'!!", app="thermal-drift")
+    other_app = index.add("There's a typo on level 2: 'Draagon' instead of 'Dragon'.", app="science-lab")
+    assert not first.duplicate
+    assert dup.duplicate and dup.cluster.id == first.cluster.id and dup.cluster.count == 2
+    assert not other_app.duplicate
+    assert index.add("   ") is None
+    assert index.lookup("There's a typo on level 2: 'Draagon' instead of 'Dragon'", app="thermal-drift").cluster.id == first.cluster.id
+
+
+def test_issue_claims():
+    index = DedupIndex()
+    cid = index.add("The music is too loud on the title screen").cluster.id
+    assert index.claim_issue(cid) is True
+    assert index.claim_issue(cid) is False  # in flight
+    assert index.claim_issue(cid, retry_after_s=0) is True  # stale claim expires
+    index.set_issue_url(cid, "https://github.com/a/b/issues/1")
+    assert index.claim_issue(cid, retry_after_s=0) is False
+    assert index.stats()["issues_skipped"] == 2
+
+
+def test_released_claim_can_be_taken_again():
+    index = DedupIndex()
+    cid = index.add("The level timer keeps running while paused").cluster.id
+    assert index.claim_issue(cid) is True
+    index.release_issue(cid)  # job dropped or rejected
+    assert index.claim_issue(cid) is True
+    index.set_issue_url(cid, "https://github.com/a/b/issues/2")
+    index.release_issue(cid)  # no effect once the issue exists
+    assert index.claim_issue(cid) is False
+
+
+def test_persistence_roundtrip(tmp_path):
+    path = str(tmp_path / "dedup.json")
+    index = DedupIndex(path, save_interval_s=60)
+    cid = index.add("Please add a leaderboard and more levels to the space game").cluster.id
+    index.set_issue_url(cid, "https://github.com/a/b/issues/3")
+    index.close()
+    assert not list(tmp_path.glob("*.tmp"))
+
+    reloaded = DedupIndex(path)
+    match = reloaded.lookup("please add a leaderboard and more levels to the space game")
+    assert match is not None and match.cluster.id == cid
+    assert match.cluster.issue_url == "https://github.com/a/b/issues/3"
+
+
+def test_eviction_and_lookup_speed():
+    import random
+
+    rng = random.Random(7)
+    texts = [" ".join("".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=6)) for _ in range(8)) for _ in range(500)]
+    index = DedupIndex(max_clusters=200)
+    for text in texts:
+        index.add(text)
+    assert index.stats()["clusters"] == 200
+    assert index.stats()["evictions"] == 300
+    assert index.lookup(texts[0]) is None  # evicted
+    assert index.lookup(texts[-1]) is not None
+
+    started = time.perf_counter()
+    for _ in range(200):
+        index.lookup(texts[42])
+    assert (time.perf_counter() - started) / 200 < 0.002
@@ -1,4 +1,5 @@
 import sys
+import time
 from pathlib import Path
 
 from fastapi.testclient import TestClient
@@ -40,3 +41,325 @@ def test_cloud_list_requires_repo(monkeypatch):
     monkeypatch.delenv("GITHUB_ISSUES_REPO", raising=False)
     r = client.get("/cloud/issues")
     assert r.status_code == 500
+
+
+def test_feedback_issue_creation_is_queued(monkeypatch, tmp_path):
+    import examples.feedback_api as api
+
+    calls = []
+
+    def fake_github_request(method, url, token, payload=None, timeout=30):
+        calls.append((method, url, payload["labels"]))
+        return {"html_url": "https://github.com/a/b/issues/1"}
+
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setattr(api, "_github_request", fake_github_request)
+    monkeypatch.setenv("FEEDBACK_DEDUP_PATH", str(tmp_path / "dedup.json"))
+
+    with TestClient(app) as c:
+        r = c.post("/feedback", json={"thumbs_up": True, "app": "thermal-drift", "description": "Love the music"})
+        assert r.status_code == 200
+        assert "issue_url" not in r.json()
+        stats = c.get("/metrics").json()["issue_queue"]
+        assert stats["enqueued"] >= 1
+
+    assert calls and calls[0][0] == "POST"
+    assert "thumbs-up" in calls[0][2]
+
+
+def test_feedback_issue_post_is_not_resent_after_a_timeout(monkeypatch, tmp_path):
+    import examples.feedback_api as api
+
+    calls = []
+
+    def timed_out_after_sending(method, url, token, payload=None, timeout=30):
+        calls.append(method)
+        raise TimeoutError("read timed out")  # GitHub may have created the issue anyway
+
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setenv("FEEDBACK_DEDUP_PATH", str(tmp_path / "dedup.json"))
+    monkeypatch.setattr(api, "_github_request", timed_out_after_sending)
+    monkeypatch.setattr(api.issue_queue, "backoff_s", 0.0)
+
+    with TestClient(app) as c:
+        before = c.get("/metrics").json()["issue_queue"]
+        c.post("/feedback", json={"thumbs_up": False, "app": "timeout-test", "description": "The jump button lags"})
+
+    stats = api.issue_queue.stats()
+    assert calls == ["POST"]
+    assert stats["failed"] == before["failed"] + 1 and stats["retries"] == before["retries"]
+
+
+def test_dropped_issue_job_releases_the_cluster_claim(monkeypatch, tmp_path):
+    import examples.feedback_api as api
+
+    submitted = []
+
+    def full_queue(fn, on_done=None, **kwargs):
+        submitted.append(fn)
+        return False  # queue full: the job is dropped
+
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setenv("FEEDBACK_DEDUP_PATH", str(tmp_path / "dedup.json"))
+    monkeypatch.setattr(api.issue_queue, "submit", full_queue)
+
+    body = {"thumbs_up": False, "app": "queue-full-test", "description": "The pause menu freezes on level three"}
+    first = client.post("/feedback", json=body).json()
+    second = client.post("/feedback", json=body).json()
+    assert second["duplicate"] and second["cluster_id"] == first["cluster_id"]
+    # Without the release the duplicate would be skipped as "issue in flight" for 10 minutes.
+    assert len(submitted) == 2
+    assert api._dedup_index().stats()["issues_skipped"] == 0
+
+
+def test_feedback_stats_counts_new_records(monkeypatch, tmp_path):
+    monkeypatch.setenv("FEEDBACK_STORE_PATH", str(tmp_path / "feedback.jsonl"))
+    before = client.get("/feedback/stats", params={"window": "24h", "app": "stats-test"}).json()
+    assert before["total"] == 0
+
+    client.post("/feedback", json={"thumbs_up": False, "app": "stats-test", "description": "typo in the menu"})
+    client.post("/feedback", json={"thumbs_up": True, "app": "stats-test", "description": "add a leaderboard"})
+    client.post("/feedback", json={"thumbs_up": True, "app": "other", "description": "nice"})
+
+    r = client.get("/feedback/stats", params={"window": "24h", "app": "stats-test", "bucket": "hour"})
+    assert r.status_code == 200
+    data = r.json()
+    assert data["total"] == 2
+    assert data["by_vote"]["up"] == 1 and data["by_vote"]["down"] == 1
+    assert data["by_category"] == {"easy": 1, "medium": 1}
+    assert sum(p["total"] for p in data["series"]) == 2
+
+    assert client.get("/feedback/stats", params={"window": "all"}).json()["total"] == 3
+    assert client.get("/feedback/stats", params={"window": "soon"}).status_code == 422
+
+
+def test_cloud_list_issues_is_cached(monkeypatch):
+    import examples.feedback_api as api
+
+    calls = []
+
+    def fake_fetch(repo, token, label, limit, cursor, etag):
+        calls.append(etag)
+        item = {"number": 1, "title": "Save", "body": "{}", "labels": [label], "html_url": "u", "created_at": None}
+        return {"items": [item], "next_cursor": None}, '"e1"'
+
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setattr(api, "_fetch_cloud_issues", fake_fetch)
+    api.issues_cache.clear()
+
+    for _ in range(3):
+        r = client.get("/cloud/issues", params={"label": "cloud-save", "limit": 5})
+        assert r.status_code == 200
+        assert r.json()["items"][0]["number"] == 1
+    assert calls == [None]
+    assert client.get("/metrics").json()["cloud_issues_cache"]["hits"] >= 2
+
+
+class _FakePagedGitHub:
+    """Serves `total` issues, newest first, with GitHub-style Link headers."""
+
+    def __init__(self, total):
+        self.total = total
+        self.pages = []
+
+    def request(self, method, url, token=None, payload=None, *, headers=None, timeout=None, conditional=True):
+        import urllib.parse as up
+        from scripts.github_client import GitHubResponse
+
+        q = {k: v[0] for k, v in up.parse_qs(up.urlsplit(url).query).items()}
+        page, per_page = int(q["page"]), int(q["per_page"])
+        self.pages.append(page)
+        last = max(1, -(-self.total // per_page))
+        start = (page - 1) * per_page
+        data = [
+            {"number": self.total - i, "title": f"Save {self.total - i}", "body": "", "labels": [], "html_url": "u"}
+            for i in range(start, min(start + per_page, self.total))
+        ]
+        base = url.split("?")[0]
+        links = []
+        if page < last:
+            links.append(f'<{base}?per_page={per_page}&page={page + 1}>; rel="next"')
+            links.append(f'<{base}?per_page={per_page}&page={last}>; rel="last"')
+        return GitHubResponse(status=200, headers={"link": ", ".join(links)}, data=data)
+
+
+def test_cloud_list_issues_paginates_past_100(monkeypatch):
+    import examples.feedback_api as api
+
+    fake = _FakePagedGitHub(total=250)
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setattr(api.github_client, "get_client", lambda: fake)
+    api.issues_cache.clear()
+
+    first = client.get("/cloud/issues", params={"limit": 150}).json()
+    assert [i["number"] for i in first["items"]] == list(range(250, 100, -1))
+    assert sorted(fake.pages) == [1, 2]  # only the pages needed for the limit
+    assert first["next_cursor"]
+
+    rest = client.get("/cloud/issues", params={"limit": 150, "cursor": first["next_cursor"]}).json()
+    assert [i["number"] for i in rest["items"]] == list(range(100, 0, -1))
+    assert rest["next_cursor"] is None
+
+    assert client.get("/cloud/issues", params={"cursor": "!!"}).status_code == 422
+
+
+def test_cloud_list_issues_streams_ndjson(monkeypatch):
+    import json as _json
+    import examples.feedback_api as api
+
+    fake = _FakePagedGitHub(total=30)
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setattr(api.github_client, "get_client", lambda: fake)
+
+    r = client.get("/cloud/issues", params={"limit": 25, "format": "ndjson"})
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    lines = [_json.loads(l) for l in r.text.splitlines()]
+    assert len(lines) == 26
+    assert lines[0]["number"] == 30
+    assert "next_cursor" in lines[-1]
+
+
+def test_cloud_save_updates_existing_issue(monkeypatch):
+    import examples.feedback_api as api
+    from examples.save_coalescer import SaveCoalescer
+
+    calls = []
+
+    def fake_github_request(method, url, token, payload=None, timeout=30):
+        calls.append((method, url, payload))
+        return {"number": 7, "html_url": "https://github.com/a/b/issues/7"}
+
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setattr(api, "_github_request", fake_github_request)
+    coalescer = SaveCoalescer(api._create_save_issue, api._update_save_issue, debounce_s=60)
+    monkeypatch.setattr(api, "save_coalescer", coalescer)
+
+    for level in (1, 2, 3):
+        r = client.post("/save", json={"app": "science-lab", "kind": "progress", "user": "ada", "payload": {"level": level}})
+        assert r.status_code == 200
+        assert r.json() == {"issue_url": "https://github.com/a/b/issues/7", "issue_number": 7}
+
+    assert [c[0] for c in calls] == ["POST"]
+    assert client.get("/metrics").json()["save_coalescer"]["merged"] == 1
+
+    coalescer.flush_all()
+    method, url, payload = calls[-1]
+    assert (method, url) == ("PATCH", "https://api.github.com/repos/a/b/issues/7")
+    assert '"level": 3' in payload["body"]
+
+
+def test_cloud_save_reuses_open_issue_after_restart(monkeypatch):
+    import examples.feedback_api as api
+    from examples.save_coalescer import SaveCoalescer
+
+    calls = []
+
+    def fake_github_request(method, url, token, payload=None, timeout=30):
+        calls.append((method, url, payload))
+        if method == "GET":
+            return [
+                {"number": 3, "title": "Save: science-lab [progress] (bob)", "html_url": "https://github.com/a/b/issues/3"},
+                {"number": 9, "title": "Save: science-lab [progress] (ada)", "html_url": "https://github.com/a/b/issues/9"},
+            ]
+        return {}
+
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setattr(api, "_github_request", fake_github_request)
+    # A fresh coalescer stands in for a restarted (or second) worker.
+    coalescer = SaveCoalescer(api._create_save_issue, api._update_save_issue, find=api._find_save_issue, debounce_s=60)
+    monkeypatch.setattr(api, "save_coalescer", coalescer)
+
+    r = client.post("/save", json={"app": "science-lab", "kind": "progress", "user": "ada", "payload": {"level": 5}})
+    assert r.json() == {"issue_url": "https://github.com/a/b/issues/9", "issue_number": 9}
+    assert calls[0][0] == "GET" and "POST" not in [c[0] for c in calls]
+    assert "labels=cloud-save%2Capp%3Ascience-lab%2Ckind%3Aprogress" in calls[0][1]
+
+    # The found issue has no recent write from this process, so the PATCH goes out right away.
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and calls[-1][0] != "PATCH":
+        time.sleep(0.01)
+    method, url, payload = calls[-1]
+    assert (method, url) == ("PATCH", "https://api.github.com/repos/a/b/issues/9")
+    assert '"level": 5' in payload["body"]
+
+
+def test_cloud_save_sqlite_backend_replicates_async(monkeypatch, tmp_path):
+    import examples.feedback_api as api
+    from examples.save_coalescer import SaveCoalescer
+
+    calls = []
+
+    def fake_github_request(method, url, token, payload=None, timeout=30):
+        calls.append((method, url))
+        return {"number": 3, "html_url": "https://github.com/a/b/issues/3"}
+
+    monkeypatch.setenv("CLOUD_SAVE_BACKEND", "sqlite")
+    monkeypatch.setenv("CLOUD_SAVE_DB_PATH", str(tmp_path / "saves.db"))
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setattr(api, "_github_request", fake_github_request)
+    monkeypatch.setattr(api, "save_coalescer", SaveCoalescer(api._create_save_issue, api._update_save_issue, debounce_s=60))
+
+    with TestClient(app) as c:
+        for level in (1, 2):
+            r = c.post("/save", json={"app": "science-lab", "user": "ada", "payload": {"level": level}})
+            assert r.status_code == 200
+            assert set(r.json()) == {"save_id"}
+
+        r = c.get("/cloud/saves", params={"app": "science-lab", "user": "ada", "limit": 1})
+        assert r.status_code == 200
+        data = r.json()
+        assert [item["payload"] for item in data["items"]] == [{"level": 2}]
+        assert data["next_before"] is not None
+        older = c.get("/cloud/saves", params={"app": "science-lab", "before": data["next_before"]}).json()
+        assert [item["payload"] for item in older["items"]] == [{"level": 1}]
+
+    # The lifespan shutdown drains the replication queue.
+    assert calls and calls[0] == ("POST", "https://api.github.com/repos/a/b/issues")
+
+
+def test_cloud_saves_requires_local_backend(monkeypatch):
+    monkeypatch.delenv("CLOUD_SAVE_BACKEND", raising=False)
+    r = client.get("/cloud/saves")
+    assert r.status_code == 503
+
+
+def test_duplicate_feedback_skips_redundant_issue(monkeypatch, tmp_path):
+    import examples.feedback_api as api
+
+    calls = []
+
+    def fake_github_request(method, url, token, payload=None, timeout=30):
+        calls.append(payload["title"])
+        return {"html_url": "https://github.com/a/b/issues/9"}
+
+    monkeypatch.setenv("GITHUB_ISSUES_REPO", "a/b")
+    monkeypatch.setenv("GITHUB_TOKEN", "t")
+    monkeypatch.setenv("FEEDBACK_STORE_PATH", str(tmp_path / "feedback.jsonl"))
+    monkeypatch.setenv("FEEDBACK_DEDUP_PATH", str(tmp_path / "dedup.json"))
+    monkeypatch.setattr(api, "_github_request", fake_github_request)
+
+    with TestClient(app) as c:
+        first = c.post("/feedback", json={"app": "thermal-drift", "description": "There's a typo on level 2: 'Draagon' instead of 'Dragon'."})
+        second = c.post("/feedback", json={"app": "thermal-drift", "description": "theres a typo on level 2 - 'Draagon' instead of 'Dragon'!!"})
+        other = c.post("/feedback", json={"app": "thermal-drift", "description": "The music is too loud on the title screen"})
+        assert first.json()["duplicate"] is False
+        assert second.json()["duplicate"] is True
+        assert second.json()["cluster_id"] == first.json()["cluster_id"]
+        assert other.json()["cluster_id"] != first.json()["cluster_id"]
+        dedup = c.get("/metrics").json()["feedback_dedup"]
+        assert dedup["duplicates"] == 1 and dedup["issues_skipped"] == 1
+
+    # The lifespan shutdown drains the queue and persists the index with the issue URL.
+    assert len(calls) == 2
+    from examples.dedup_index import DedupIndex
+
+    reloaded = DedupIndex(str(tmp_path / "dedup.json"))
+    assert reloaded.get(first.json()["cluster_id"]).issue_url == "https://github.com/a/b/issues/9"
+    assert reloaded.get(first.json()["cluster_id"]).count == 2
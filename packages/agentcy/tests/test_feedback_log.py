@@ -0,0 +1,117 @@
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from examples import feedback_log
+from examples.feedback_log import FeedbackLog
+from examples.feedback_store import FeedbackStore
+
+
+def _fill(path, n, **kwargs):
+    store = FeedbackStore(str(path), max_batch=10_000, flush_interval_s=60, **kwargs)
+    for i in range(n):
+        store.append({
+            "ts": 1_000 + i,
+            "app": "thermal-drift" if i % 2 else "frost-signal",
+            "thumbs_up": i % 3 != 0,
+            "description": f"feedback {i} " + "x" * 50,
+        })
+        if i % 10 == 9:
+            store.flush()
+    store.close()
+    return store
+
+
+def test_log_rotates_and_indexes(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    store = _fill(path, 100, max_segment_bytes=2_000)
+    segments = store.log.segments()
+    assert len(segments) > 3
+    assert segments[-1].active
+    assert (tmp_path / "feedback.000001.jsonl").exists()
+    assert (tmp_path / "feedback.000001.idx").exists()
+
+    got = list(store.log.query(app="thermal-drift", thumbs_up=False, since=1_020, until=1_080))
+    expected = [i for i in range(20, 81) if i % 2 and i % 3 == 0]
+    assert [int(r["description"].split()[1]) for r in got] == expected
+
+
+def test_compressed_segments_keep_index_valid(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    store = _fill(path, 100, max_segment_bytes=2_000, compress="gzip")
+    sealed = [s for s in store.log.segments() if not s.active]
+    assert sealed and all(s.codec == "gzip" for s in sealed)
+    assert not (tmp_path / "feedback.000001.jsonl").exists()
+
+    # Still a plain concatenated gzip file.
+    lines = gzip.decompress((tmp_path / "feedback.000001.jsonl.gz").read_bytes()).splitlines()
+    assert json.loads(lines[0])["ts"] == 1_000
+
+    log = FeedbackLog(str(path), compress="gzip")
+    assert len(list(log.query())) == 100
+    assert [r["ts"] for r in log.query(since=1_050, until=1_052)] == [1_050, 1_051, 1_052]
+
+
+def test_legacy_file_is_indexed_on_first_commit(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    path.write_text(json.dumps({"ts": 5, "app": "old", "thumbs_up": False}) + "\n", encoding="utf-8")
+    store = FeedbackStore(str(path), max_batch=10_000, flush_interval_s=60)
+    store.append({"ts": 6, "app": "new", "thumbs_up": True})
+    store.close()
+    assert [r["app"] for r in store.log.query()] == ["old", "new"]
+    assert [r["ts"] for r in store.log.query(app="old")] == [5]
+
+
+def test_failed_compression_never_rewrites_the_batch(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    store = FeedbackStore(str(path), max_batch=1000, flush_interval_s=60, max_segment_bytes=10, compress="gzip")
+    real = store.log.compress_segment
+    calls = []
+
+    def flaky(segment, *args, **kwargs):
+        calls.append(segment.seq)
+        if len(calls) == 1:
+            raise OSError("disk hiccup")
+        return real(segment, *args, **kwargs)
+
+    store.log.compress_segment = flaky
+    store.append({"ts": 1, "app": "a"})
+    store.flush()
+    store.flush()
+    assert [r["ts"] for r in store.log.query()] == [1]
+    assert store.stats()["compress_errors"] == 1
+    assert store.log.segments()[0].codec is None
+
+    store._next_compress_at = 0.0  # skip the retry delay
+    store.flush()
+    assert store.log.segments()[0].codec == "gzip"
+    assert [r["ts"] for r in store.log.query()] == [1]
+    store.close()
+
+
+def test_missing_zstandard_fails_at_construction(tmp_path, monkeypatch):
+    monkeypatch.setattr(feedback_log, "zstandard", None)
+    with pytest.raises(RuntimeError, match="zstandard"):
+        FeedbackLog(str(tmp_path / "feedback.jsonl"), compress="zstd")
+
+
+def test_segment_mid_compression_is_listed_once(tmp_path):
+    path = tmp_path / "feedback.jsonl"
+    store = _fill(path, 100, max_segment_bytes=2_000)
+    log = FeedbackLog(str(path), compress="gzip")
+    first = log.segments()[0]
+    # Simulate the window where the .gz is in place but the plain file is not yet removed.
+    plain = Path(first.data_path).read_bytes()
+    compressed = log.compress_segment(first)
+    Path(first.data_path).write_bytes(plain)
+
+    segments = log.segments()
+    assert [s.seq for s in segments] == sorted({s.seq for s in segments})
+    assert segments[0].data_path == compressed.data_path
+    assert len(list(log.query())) == 100
+    assert store.records_written == 100
@@ -28,3 +28,117 @@ def test_process_feedback_structure():
     item = out[0]
     assert item["category"] == "easy"
     assert item["confidence"] >= 0.5
+
+
+def test_categorize_keeps_substring_semantics():
+    cases = [
+        ("Please build a leaderboard", "easy"),  # "ui" inside "build" wins over "leaderboard"
+        ("Rework the SOUND settings", "medium"),  # medium keywords are checked before hard ones
+        ("new levelup system", "medium"),
+        ("savegame is broken after the refactor", "medium"),
+        ("The architecture should scale", "hard"),
+        ("Minor: rewrite the backend", "easy"),
+        ("x" * 59, "easy"),  # no keyword: falls back to length
+        ("x" * 120, "medium"),
+        ("y" * 400, "hard"),
+        ("", "easy"),
+    ]
+    for text, expected in cases:
+        assert categorize(text) == expected, text
+
+
+def test_normalize_text_matches_regex_version():
+    import re
+
+    def reference(text):
+        s = re.sub(r"\s+", " ", text.strip())
+        return re.sub(r"\s+([.,!?;:])", r"\1", s)
+
+    for text in ["a  ,  b .\tc\n!", " x  ; y ?", "..  , ,", "no change", "tail   :"]:
+        assert normalize_text(text) == reference(text), text
+
+
+_BATCH_SAMPLES = [
+    "There's a typo on level 2: 'Draagon' instead of 'Dragon'.",
+    "",
+    "Please add more levels and a leaderboard so I can compete",
+    "   ",
+    "Completely rewrite the networking to support 1000 players",
+    "x" * 1500,
+]
+
+
+def _expected_rows(texts):
+    return [(i, s["text"], s["category"], s["confidence"]) for i, t in enumerate(texts) for s in process_feedback(t)]
+
+
+def test_process_feedback_batch_matches_single_item():
+    from examples.feedback_processor import process_feedback_batch
+
+    cols = process_feedback_batch(_BATCH_SAMPLES)
+    assert set(cols) == {"index", "text", "category", "confidence"}
+    rows = list(zip(cols["index"], cols["text"], cols["category"], cols["confidence"]))
+    assert rows == _expected_rows(_BATCH_SAMPLES)
+
+
+def test_process_feedback_batch_process_pool(monkeypatch):
+    import examples.feedback_processor as fp
+
+    monkeypatch.setattr(fp, "MIN_TEXTS_PER_WORKER", 2)
+    texts = _BATCH_SAMPLES * 3
+    cols = fp.process_feedback_batch(texts, workers=3)
+    assert list(zip(cols["index"], cols["text"], cols["category"], cols["confidence"])) == _expected_rows(texts)
+
+
+def test_process_feedback_batch_numpy():
+    import pytest
+
+    np = pytest.importorskip("numpy")
+    from examples.feedback_processor import process_feedback_batch
+
+    arr = process_feedback_batch(_BATCH_SAMPLES, as_numpy=True)
+    assert arr.dtype.names == ("index", "text", "category", "confidence")
+    assert [(int(r["index"]), r["text"], str(r["category"]), float(r["confidence"])) for r in arr] == _expected_rows(
+        _BATCH_SAMPLES
+    )
+    assert isinstance(arr["confidence"], np.ndarray)
+
+
+def test_process_feedback_splits_sentences():
+    out = process_feedback("There's a typo on the title screen. Please add more levels!  Also rewrite the backend?")
+    assert [s["text"] for s in out] == [
+        "There's a typo on the title screen.",
+        "Please add more levels!",
+        "Also rewrite the backend?",
+    ]
+    assert [s["category"] for s in out] == ["easy", "medium", "hard"]
+
+
+def test_split_merges_tiny_fragments_and_blank_lines():
+    from examples.feedback_processor import split_suggestions
+
+    assert split_suggestions("Wow. Nice. Please add a leaderboard.\n\nThe music is too loud") == [
+        "Wow. Nice. Please add a leaderboard.",
+        "The music is too loud",
+    ]
+    assert split_suggestions("Add multiplayer support please. Thanks!") == ["Add multiplayer support please. Thanks!"]
+    # Decimal points and abbreviations without a following space don't split.
+    assert split_suggestions("Set the volume to 2.5 instead of 3") == ["Set the volume to 2.5 instead of 3"]
+
+
+def test_single_sentence_is_unchanged():
+    text = "  Please add more levels   and a leaderboard ,so I can compete  "
+    assert [s["text"] for s in process_feedback(text)] == [normalize_text(text)]
+
+
+def test_split_is_capped_and_fast_on_pathological_input():
+    import time
+
+    from examples.feedback_processor import MAX_FEEDBACK_CHARS, MAX_SUGGESTIONS, split_suggestions
+
+    for text in ("a" * 500_000, " " * 500_000 + "x", ". " * 250_000, "word! " * 100_000, "\n \n" * 100_000):
+        started = time.perf_counter()
+        parts = split_suggestions(text)
+        assert time.perf_counter() - started < 0.5
+        assert len(parts) <= MAX_SUGGESTIONS
+        assert sum(len(p) for p in parts) <= MAX_FEEDBACK_CHARS
@@ -0,0 +1,35 @@
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from examples.feedback_stats import FeedbackAggregator
+from examples.feedback_store import FeedbackStore
+
+
+def test_aggregator_is_incremental_across_rotation(tmp_path):
+    store = FeedbackStore(str(tmp_path / "feedback.jsonl"), max_batch=10_000, flush_interval_s=60, max_segment_bytes=500)
+    agg = FeedbackAggregator(store.log)
+
+    def add(n, start):
+        for i in range(start, start + n):
+            store.append({"ts": 7200 + i, "app": "a" if i % 2 else "b", "thumbs_up": i % 2 == 0, "category": "easy"})
+        store.flush()
+
+    add(10, 0)
+    assert agg.refresh() == 10
+    assert agg.refresh() == 0
+    add(25, 10)  # rotates the segment again
+    assert agg.refresh() == 25
+    assert len(store.log.segments()) > 2
+
+    out = agg.query(app="a")
+    assert out["total"] == 17
+    assert out["by_vote"] == {"up": 0, "down": 17, "none": 0}
+    assert agg.query(since=0, until=3599)["total"] == 0
+
+    # A fresh aggregator rebuilds the same totals in one streaming pass.
+    rebuilt = FeedbackAggregator(store.log)
+    rebuilt.refresh()
+    assert rebuilt.query() == agg.query()
+    store.close()
@@ -0,0 +1,75 @@
+import json
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from examples.feedback_store import FeedbackStore
+
+
+def _read(path):
+    return [json.loads(line) for line in Path(path).read_text(encoding="utf-8").splitlines()]
+
+
+def test_store_flushes_in_batches(tmp_path):
+    path = tmp_path / "fb.jsonl"
+    store = FeedbackStore(str(path), max_batch=1000, flush_interval_s=60)
+    for i in range(10):
+        store.append({"i": i})
+    assert not path.exists()
+    assert store.flush() == 10
+    assert [r["i"] for r in _read(path)] == list(range(10))
+    stats = store.stats()
+    assert stats["flushes"] == 1
+    assert stats["batch_size"]["last"] == 10
+    store.close()
+
+
+def test_store_flushes_on_interval(tmp_path):
+    path = tmp_path / "fb.jsonl"
+    store = FeedbackStore(str(path), max_batch=1000, flush_interval_s=0.05)
+    store.append({"i": 1})
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and store.pending():
+        time.sleep(0.01)
+    assert store.pending() == 0
+    assert _read(path) == [{"i": 1}]
+    store.close()
+
+
+def _writer(path, worker, n):
+    store = FeedbackStore(path, max_batch=7, flush_interval_s=0.01)
+    for i in range(n):
+        store.append({"worker": worker, "i": i, "pad": "x" * 200})
+    store.close()
+
+
+def test_store_is_safe_across_processes(tmp_path):
+    path = str(tmp_path / "fb.jsonl")
+    procs = [multiprocessing.Process(target=_writer, args=(path, w, 200)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(30)
+    records = _read(path)
+    assert len(records) == 800
+    for w in range(4):
+        assert [r["i"] for r in records if r["worker"] == w] == list(range(200))
+
+
+def test_store_drops_records_past_cap_when_disk_fails(tmp_path):
+    store = FeedbackStore(str(tmp_path / "fb.jsonl"), max_batch=1, flush_interval_s=60, max_buffered=20)
+
+    def broken(batch, fsync=False):
+        raise OSError("disk full")
+
+    store.log.append_batch = broken
+    for i in range(50):
+        try:
+            store.append({"i": i})
+        except OSError:
+            pass
+    assert store.pending() == 20
+    assert store.stats()["dropped"] == 30
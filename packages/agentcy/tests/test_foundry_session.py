@@ -0,0 +1,86 @@
+import json
+import stat
+import time
+from collections import namedtuple
+
+from scripts.foundry_session import REFRESH_MARGIN_S, CachedCredential, TokenCache, _az_cli_account
+
+Token = namedtuple("Token", ["token", "expires_on"])
+
+
+class _FakeCredential:
+    def __init__(self, calls):
+        self.calls = calls
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls.append((scopes, kwargs))
+        return Token(f"tok-{len(self.calls)}", int(time.time()) + 3600)
+
+
+def test_token_cache_is_private(tmp_path):
+    cache = TokenCache(tmp_path / "auth")
+    cache.put("k", "secret-token", int(time.time()) + 3600)
+    assert cache.get("k")[0] == "secret-token"
+    assert stat.S_IMODE(cache.path.stat().st_mode) == 0o600
+    assert stat.S_IMODE((tmp_path / "auth").stat().st_mode) == 0o700
+    # A second instance (next run) reads it back.
+    assert TokenCache(tmp_path / "auth").get("k")[0] == "secret-token"
+
+
+def test_token_cache_honors_expiry(tmp_path):
+    cache = TokenCache(tmp_path)
+    cache.put("soon", "t", int(time.time()) + REFRESH_MARGIN_S - 1)
+    assert cache.get("soon") is None
+    cache.path.write_bytes(b"garbage")
+    assert cache.get("soon") is None
+
+
+def test_cached_credential_skips_the_real_credential_on_later_runs(tmp_path):
+    calls, built = [], []
+
+    def factory():
+        built.append(1)
+        return _FakeCredential(calls)
+
+    first = CachedCredential("azure-cli", factory, cache=TokenCache(tmp_path))
+    assert first.get_token("scope/.default").token == "tok-1"
+    assert first.get_token("scope/.default").token == "tok-1"
+    assert (len(built), len(calls), first.hits, first.misses) == (1, 1, 1, 1)
+
+    second = CachedCredential("azure-cli", factory, cache=TokenCache(tmp_path))
+    assert second.get_token("scope/.default").token == "tok-1"
+    assert len(built) == 1
+
+    # Different scope or chain: separate entries.
+    assert second.get_token("other/.default").token == "tok-2"
+    assert CachedCredential("environment", factory, cache=TokenCache(tmp_path)).get_token("scope/.default").token == "tok-3"
+
+
+def test_claims_challenge_bypasses_cache(tmp_path):
+    calls = []
+    credential = CachedCredential("azure-cli", lambda: _FakeCredential(calls), cache=TokenCache(tmp_path))
+    credential.get_token("s")
+    credential.get_token("s", claims='{"access_token":{}}')
+    assert len(calls) == 2 and calls[1][1]["claims"]
+
+
+def test_az_login_as_another_user_misses_the_cache(tmp_path, monkeypatch):
+    def login(user):
+        (tmp_path / "azureProfile.json").write_text(
+            json.dumps({"subscriptions": [{"isDefault": True, "tenantId": "t", "user": {"name": user}}]}),
+            encoding="utf-8-sig",
+        )
+
+    monkeypatch.setenv("AZURE_CONFIG_DIR", str(tmp_path))
+    login("alice@example.com")
+    assert _az_cli_account() == "alice@example.com@t"
+
+    calls = []
+    credential = CachedCredential(
+        "azure-cli", lambda: _FakeCredential(calls), cache=TokenCache(tmp_path / "auth"), account=_az_cli_account
+    )
+    assert credential.get_token("s").token == "tok-1"
+    login("bob@example.com")
+    assert credential.get_token("s").token == "tok-2"
+    login("alice@example.com")
+    assert credential.get_token("s").token == "tok-1"
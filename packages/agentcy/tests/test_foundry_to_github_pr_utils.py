@@ -1,3 +1,5 @@
+import json
+
 import pytest
 
 from scripts.foundry_to_github_pr import _validate_rel_path, _is_probably_secret_path
@@ -39,3 +41,124 @@ def test_validate_rel_path_allow_prefix_enforced():
 
     # Allowed
     _validate_rel_path("site/index.html", allow_prefix="site/")
+
+
+def test_run_pipeline_dry_run_reuses_client_and_reports_timings(monkeypatch, tmp_path):
+    import subprocess
+
+    import scripts.foundry_to_github_pr as mod
+
+    monkeypatch.setenv("AGENTCY_CACHE_DIR", str(tmp_path / "cache"))
+    origin = tmp_path / "origin"
+    origin.mkdir()
+    (origin / "index.html").write_text("<h1>Draagon</h1>", encoding="utf-8")
+    for args in (["init", "-q", "-b", "main"], ["add", "-A"], ["-c", "user.name=t", "-c", "user.email=t@t", "commit", "-q", "-m", "init"]):
+        subprocess.run(["git", *args], cwd=origin, check=True)
+
+    seen = []
+
+    head = subprocess.run(["git", "rev-parse", "HEAD"], cwd=origin, capture_output=True, text=True).stdout.strip()
+
+    def fake_propose(**kwargs):
+        seen.append(kwargs["project_client"])
+        assert kwargs["revision"] == head
+        assert "index.html" in kwargs["repo_context_json"]
+        return {"pr_title": "Fix typo", "files": [{"path": "index.html", "content": "<h1>Dragon</h1>"}]}
+
+    monkeypatch.setattr(mod, "propose_changes_via_agent", fake_propose)
+    client = object()
+    out = tmp_path / "proposal.json"
+    for _ in range(2):
+        result = mod.run_pipeline(
+            repo="a/b",
+            feedback_text="fix the typo",
+            endpoint="https://example.invalid",
+            model_deployment_name="m",
+            dry_run=True,
+            proposal_out=str(out),
+            project_client=client,
+            clone_url=str(origin),
+            share_files=True,
+            context_budget_tokens=1000,
+        )
+    assert seen == [client, client]
+    assert result.pr_url == "" and result.proposal_path == out.as_posix()
+    assert result.proposal["pr_title"] == "Fix typo"
+    assert set(result.timings) == {"fetch", "context", "agent", "total"}
+    assert result.context["selected"] == 1 and result.context_summary().startswith("Context: 1 of 1 file(s)")
+
+
+def test_run_pipeline_rejects_disallowed_repo():
+    from scripts.foundry_to_github_pr import run_pipeline
+
+    with pytest.raises(SystemExit) as exc:
+        run_pipeline(repo="bad/other", feedback_text="x", endpoint="e", model_deployment_name="m", token="t")
+    assert "ALLOWED_REPOS" in str(exc.value)
+
+
+class _FakeStream:
+    def __init__(self, text, chunk=7):
+        self.chunks = [text[i : i + chunk] for i in range(0, len(text), chunk)]
+        self.consumed = 0
+        self.closed = False
+
+    def __iter__(self):
+        from types import SimpleNamespace
+
+        for c in self.chunks:
+            self.consumed += 1
+            yield SimpleNamespace(type="response.output_text.delta", delta=c)
+        yield SimpleNamespace(type="response.completed")
+
+    def close(self):
+        self.closed = True
+
+
+def test_streamed_files_written_while_parsing(tmp_path):
+    from scripts.foundry_to_github_pr import _iter_output_text, _read_streamed_proposal, _StreamedFiles
+
+    payload = {
+        "pr_title": "t",
+        "files": [
+            {"content": "late path", "path": "site/b.txt"},
+            {"path": "site/a/index.html", "content": "<h1>Dragon</h1>\n" * 50},
+        ],
+    }
+    sink = _StreamedFiles("site/", tmp_path)
+    stream = _FakeStream(json.dumps(payload))
+    assert _read_streamed_proposal(_iter_output_text(stream), sink, stream)[0] == payload
+    assert sink.written == ["site/b.txt", "site/a/index.html"]
+    assert (tmp_path / "site/a/index.html").read_text(encoding="utf-8") == "<h1>Dragon</h1>\n" * 50
+    assert (tmp_path / "site/b.txt").read_text(encoding="utf-8") == "late path"
+    assert stream.closed
+
+
+def test_streamed_policy_violation_aborts_early(tmp_path):
+    from scripts.foundry_to_github_pr import _iter_output_text, _read_streamed_proposal, _StreamedFiles
+
+    text = json.dumps({"files": [{"path": "index.html", "content": "x" * 5000}]})
+    stream = _FakeStream(text)
+    with pytest.raises(SystemExit) as exc:
+        _read_streamed_proposal(_iter_output_text(stream), _StreamedFiles("site/", tmp_path), stream)
+    assert "not allowed by policy" in str(exc.value)
+    assert stream.consumed < len(stream.chunks) and stream.closed
+    assert not any(tmp_path.iterdir())
+
+
+def test_streamed_invalid_json_reports_raw_output():
+    from scripts.foundry_to_github_pr import _iter_output_text, _read_streamed_proposal
+
+    with pytest.raises(SystemExit) as exc:
+        _read_streamed_proposal(_iter_output_text(_FakeStream('{"files": [}')), None)
+    assert "not valid JSON" in str(exc.value)
+
+
+def test_pr_creation_takes_a_github_rate_limit_token(monkeypatch):
+    import scripts.foundry_to_github_pr as mod
+    from scripts.rate_limit import TokenBucket
+
+    bucket = TokenBucket(rate_per_s=10)
+    monkeypatch.setattr(mod, "get_limiter", lambda name: bucket if name == "github" else None)
+    monkeypatch.setattr(mod, "github_request", lambda *args: {"html_url": "u"})
+    assert mod._github_api_request("POST", "https://api.github.com/repos/a/b/pulls", "t", {}) == {"html_url": "u"}
+    assert bucket.stats()["acquired"] == 1
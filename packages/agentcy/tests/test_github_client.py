@@ -0,0 +1,147 @@
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from scripts.github_client import GitHubAPIError, GitHubClient, is_rate_limited, is_retryable
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    connections = 0
+    etag = '"v1"'
+
+    def setup(self):
+        type(self).connections += 1
+        super().setup()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.startswith("/missing"):
+            self._send(404, b'{"message": "Not Found"}')
+            return
+        if self.headers.get("If-None-Match") == self.etag:
+            self._send(304)
+            return
+        body = json.dumps([{"number": 1}]).encode("utf-8")
+        headers = {"ETag": self.etag, "Content-Type": "application/json"}
+        if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+            body = gzip.compress(body)
+            headers["Content-Encoding"] = "gzip"
+        self._send(200, body, headers)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self._send(201, json.dumps({"echo": payload, "auth": self.headers.get("Authorization")}).encode("utf-8"))
+
+
+@pytest.fixture()
+def server():
+    _Handler.connections = 0
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_keep_alive_reuses_one_connection(server):
+    client = GitHubClient()
+    for i in range(5):
+        out = client.request_json("POST", f"{server}/comments", "tok", {"i": i})
+        assert out["echo"] == {"i": i}
+        assert out["auth"] == "Bearer tok"
+    assert _Handler.connections == 1
+    assert client.stats()["connections_reused"] == 4
+    client.close()
+
+
+def test_gzip_and_etag_revalidation(server):
+    client = GitHubClient()
+    first = client.request("GET", f"{server}/issues", "tok")
+    assert first.status == 200 and first.data == [{"number": 1}]
+    second = client.request("GET", f"{server}/issues", "tok")
+    assert second.status == 304 and second.from_cache
+    assert second.data == first.data
+    assert client.stats()["not_modified"] == 1
+    client.close()
+
+
+def test_error_status_raises(server):
+    client = GitHubClient()
+    with pytest.raises(GitHubAPIError) as exc:
+        client.request_json("GET", f"{server}/missing", None)
+    assert exc.value.status == 404
+    client.close()
+
+
+class _DroppingHandler(_Handler):
+    """Answers, then closes the socket without telling the client (a stale keep-alive)."""
+
+    def do_GET(self):
+        self._send(200, b"[]")
+        self.close_connection = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        self._send(201, b"{}")
+        self.close_connection = True
+
+    def do_PUT(self):
+        if self.path == "/limited":
+            self._send(403, b'{"message": "secondary rate limit"}', {"Retry-After": "7"})
+            return
+        self.do_GET()
+
+
+@pytest.fixture()
+def dropping_server():
+    _DroppingHandler.connections = 0
+    srv = ThreadingHTTPServer(("127.0.0.1", 0), _DroppingHandler)
+    t = threading.Thread(target=srv.serve_forever, daemon=True)
+    t.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_stale_connection_retries_get_once_but_never_post(dropping_server):
+    client = GitHubClient()
+    client.request("GET", f"{dropping_server}/a")
+    assert client.request("GET", f"{dropping_server}/b").status == 200
+    assert _DroppingHandler.connections == 2
+
+    # The pooled socket is stale again; a POST must surface that, not resend.
+    with pytest.raises(OSError):
+        client.request("POST", f"{dropping_server}/issues", None, {"title": "t"})
+    assert _DroppingHandler.connections == 2
+    client.close()
+
+
+def test_secondary_rate_limit_is_retryable(dropping_server):
+    client = GitHubClient()
+    with pytest.raises(GitHubAPIError) as exc:
+        client.request("PUT", f"{dropping_server}/limited", None, {})
+    assert exc.value.status == 403 and exc.value.retry_after == 7.0
+    assert is_retryable(exc.value)
+    assert not is_retryable(GitHubAPIError(403, "Forbidden", "u", "no access"))
+    # A POST is only resent when GitHub certainly did not act on it.
+    assert is_rate_limited(exc.value) and is_rate_limited(GitHubAPIError(429, "Too Many", "u"))
+    assert not is_rate_limited(GitHubAPIError(502, "Bad Gateway", "u"))
+    assert not is_rate_limited(TimeoutError("read timed out"))
+    client.close()
@@ -26,3 +26,107 @@ def test_build_feedback_text_contains_issue_numbers():
     assert "Issue #2" in text
     assert "Fix spelling" in text
     assert "Add WASD" in text
+
+
+def test_cluster_feedback_text_uses_open_issues_only(tmp_path):
+    import json
+
+    from scripts.github_issues_to_pr import _build_cluster_feedback_text, _load_clusters
+
+    path = tmp_path / "clusters.jsonl"
+    path.write_text(
+        "\n".join(
+            json.dumps(rec)
+            for rec in [
+                {"cluster_id": 1, "title": "Draagon typo", "summary": "Boss name typo", "keywords": ["draagon"], "issues": [1, 3, 9]},
+                {"cluster_id": 2, "title": "Closed already", "summary": "", "keywords": [], "issues": [7]},
+                {"cluster_id": 3, "title": "Music too loud", "summary": "", "keywords": ["music"], "issues": [2]},
+            ]
+        ),
+        encoding="utf-8",
+    )
+    open_issues = [
+        Issue(number=n, title=f"t{n}", body="b", html_url=f"https://x/{n}") for n in (1, 2, 3)
+    ]
+    clusters = _load_clusters(str(path), open_issues, limit=5)
+    assert [c.cluster_id for c in clusters] == [1, 3]
+    assert [i.number for i in clusters[0].issues] == [1, 3]
+
+    text = _build_cluster_feedback_text(clusters)
+    assert "Group of 2 issue(s) (#1, #3): Draagon typo" in text
+    assert "Boss name typo" in text and "#9" not in text and "Closed already" not in text
+    assert len(_load_clusters(str(path), open_issues, limit=1)) == 1
+
+
+def test_partition_issues_groups_related_reports():
+    from scripts.github_issues_to_pr import _partition_issues
+
+    issues = [
+        Issue(number=1, title="Typo Draagon on level 2", body="Boss says Draagon not Dragon", html_url="u1"),
+        Issue(number=2, title="Music too loud", body="Lower the background music volume", html_url="u2"),
+        Issue(number=3, title="Draagon typo", body="Level 2 boss Draagon should be Dragon", html_url="u3"),
+        Issue(number=4, title="?", body="!!", html_url="u4"),
+    ]
+    groups = [[i.number for i in g] for g in _partition_issues(issues)]
+    assert sorted(groups) == [[1, 3], [2], [4]]
+
+
+def test_mark_issues_in_pr_runs_in_parallel(monkeypatch):
+    import threading
+
+    import scripts.github_issues_to_pr as mod
+
+    calls = []
+    lock = threading.Lock()
+
+    def fake_request(method, url, token, payload=None):
+        with lock:
+            calls.append(url)
+        if "/5/" in url:
+            raise RuntimeError("boom")
+
+    monkeypatch.setattr(mod, "github_request", fake_request)
+    issues = [Issue(number=n, title="t", body="b", html_url="u") for n in range(1, 7)]
+    ok = mod._mark_issues_in_pr("a", "b", "t", issues, "https://github.com/a/b/pull/1", workers=4)
+    assert ok == 5
+    assert sum(url.endswith("/labels") for url in calls) == 5
+    assert sum(url.endswith("/comments") for url in calls) == 6
+
+
+def test_run_pr_generation_calls_pipeline_in_process(monkeypatch):
+    import argparse
+
+    import scripts.github_issues_to_pr as mod
+    from scripts.foundry_to_github_pr import PipelineResult
+
+    calls = []
+
+    def fake_pipeline(**kwargs):
+        calls.append(kwargs)
+        if "boom" in kwargs["feedback_text"]:
+            raise SystemExit("agent failed")
+        return PipelineResult(proposal={}, pr_url="https://github.com/a/b/pull/7", branch=kwargs["branch"])
+
+    monkeypatch.setattr(mod, "run_pipeline", fake_pipeline)
+    args = argparse.Namespace(base="main", allow_prefix="./", share_files=False, dry_run=False, context_budget_tokens=0, stream=False, no_cache=False, refresh_agent=False)
+    client = object()
+    run = dict(owner_repo="a/b", args=args, endpoint="e", model_deployment="m", token="t", project_client=client)
+
+    ok = mod._run_pr_generation(mod.IssueGroup("g1", [], "fix it"), **run, branch="agent/x-g1")
+    assert ok.ok and ok.pr_url == "https://github.com/a/b/pull/7" and ok.summary() == ok.pr_url
+    assert calls[0]["project_client"] is client and calls[0]["branch"] == "agent/x-g1"
+
+    failed = mod._run_pr_generation(mod.IssueGroup("g2", [], "boom"), **run)
+    assert not failed.ok and failed.error == "agent failed"
+
+
+def test_main_requires_confirm_for_real_prs(monkeypatch):
+    import sys
+
+    import scripts.github_issues_to_pr as mod
+
+    monkeypatch.delenv("ALLOWED_REPOS", raising=False)
+    monkeypatch.setattr(sys, "argv", ["prog", "--repo", "edwinestro/edwinestro.github.io"])
+    with pytest.raises(SystemExit) as exc:
+        mod.main()
+    assert "--confirm" in str(exc.value)
@@ -0,0 +1,127 @@
+import socket
+import threading
+
+import pytest
+
+from scripts import hey_copilot
+from scripts import hey_copilot_daemon as daemon
+from scripts.foundry_session import auth_id
+
+
+@pytest.fixture
+def sock_path(tmp_path, monkeypatch):
+    # Keep it short: Unix socket paths are limited to ~100 bytes.
+    path = tmp_path / "hc.sock"
+    monkeypatch.setenv("HEY_COPILOT_SOCKET", str(path))
+    return path
+
+
+@pytest.fixture
+def serve(sock_path):
+    servers = []
+
+    def start(speak, auth=None):
+        server = daemon.DaemonServer(sock_path, speak, auth=auth)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+def test_round_trip_and_errors(serve, sock_path):
+    def speak(request):
+        if request["prompt"] == "boom":
+            raise SystemExit("Agent returned empty output")
+        return f"{request['agent']}: {request['prompt']}"
+
+    serve(speak)
+    assert daemon.ping(sock_path)["ok"]
+    reply = daemon.request(sock_path, {"cmd": "speak", "endpoint": "e", "agent": "edw", "prompt": "hi"})
+    assert reply["ok"] and reply["text"] == "edw: hi"
+    reply = daemon.request(sock_path, {"cmd": "speak", "endpoint": "e", "agent": "edw", "prompt": "boom"})
+    assert reply == {"ok": False, "error": "SystemExit: Agent returned empty output"}
+    # The daemon survives failed requests.
+    assert daemon.ping(sock_path)["served"] == 1
+    assert not daemon.request(sock_path, {"cmd": "nope"})["ok"]
+
+
+def test_no_daemon_and_stale_socket(sock_path):
+    assert daemon.request(sock_path, {"cmd": "ping"}) is None
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(sock_path))
+    stale.close()  # socket file left behind, nobody listening
+    assert daemon.ping(sock_path) is None
+    server = daemon.DaemonServer(sock_path, lambda request: "")
+    server.server_close()
+    assert not sock_path.exists()
+
+
+def test_second_daemon_refused(serve, sock_path):
+    serve(lambda request: "")
+    with pytest.raises(SystemExit):
+        daemon.DaemonServer(sock_path, lambda request: "")
+    assert oct(sock_path.stat().st_mode & 0o777) == oct(0o600)
+
+
+def test_speak_uses_daemon_then_falls_back(serve, tmp_path, monkeypatch):
+    outfile = tmp_path / "out.txt"
+    monkeypatch.setattr(hey_copilot, "OUTFILE", outfile)
+    server = serve(lambda request: "warm hello")
+
+    rc = hey_copilot.run_speak("https://e", "edw", "hi", "", dry_run=False, debug=True, use_cache=False)
+    assert rc == 0 and outfile.read_text(encoding="utf-8") == "warm hello\n"
+
+    server.shutdown()
+    server.server_close()
+    calls = []
+    monkeypatch.setattr(hey_copilot, "get_credential", lambda key: None)
+    monkeypatch.setattr(hey_copilot, "_ask_agent", lambda *args: calls.append(args) or "cold hello")
+    rc = hey_copilot.run_speak("https://e", "edw", "hi", "key", dry_run=False, debug=False, use_cache=False)
+    assert rc == 0 and outfile.read_text(encoding="utf-8") == "cold hello\n"
+    assert calls == [("https://e", "edw", "hi", "key")]
+
+
+def test_daemon_with_another_identity_is_not_used(serve, tmp_path, monkeypatch):
+    outfile = tmp_path / "out.txt"
+    monkeypatch.setattr(hey_copilot, "OUTFILE", outfile)
+    served = []
+    serve(lambda request: served.append(request) or "daemon hello", auth=auth_id(""))
+    calls = []
+    monkeypatch.setattr(hey_copilot, "get_credential", lambda key: None)
+    monkeypatch.setattr(hey_copilot, "_ask_agent", lambda *args: calls.append(args) or "key hello")
+
+    rc = hey_copilot.run_speak("https://e", "edw", "hi", "key", dry_run=False, debug=False, use_cache=False)
+    assert rc == 0 and outfile.read_text(encoding="utf-8") == "key hello\n"
+    assert served == [] and calls == [("https://e", "edw", "hi", "key")]
+
+    rc = hey_copilot.run_speak("https://e", "edw", "hi", "", dry_run=False, debug=False, use_cache=False)
+    assert rc == 0 and outfile.read_text(encoding="utf-8") == "daemon hello\n"
+    assert served[0]["auth"] == "entra" and len(calls) == 1
+
+
+def test_daemon_dropping_an_accepted_request_is_not_retried(sock_path, tmp_path, monkeypatch):
+    monkeypatch.setattr(hey_copilot, "OUTFILE", tmp_path / "out.txt")
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(str(sock_path))
+    listener.listen(1)
+    received = []
+
+    def drop():
+        conn, _ = listener.accept()
+        with conn, conn.makefile("rb") as f:
+            received.append(f.readline())  # read the request, then close without replying
+
+    thread = threading.Thread(target=drop, daemon=True)
+    thread.start()
+    calls = []
+    monkeypatch.setattr(hey_copilot, "_ask_agent", lambda *args: calls.append(args) or "second call")
+    try:
+        rc = hey_copilot.run_speak("https://e", "edw", "hi", "", dry_run=False, debug=False, use_cache=False)
+    finally:
+        thread.join(5)
+        listener.close()
+    assert rc == 2 and received and calls == []
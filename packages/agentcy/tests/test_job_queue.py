@@ -0,0 +1,99 @@
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from examples.job_queue import AsyncJobQueue
+
+
+def test_job_queue_retries_then_succeeds():
+    attempts = []
+    results = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("boom")
+        return "ok"
+
+    async def run():
+        q = AsyncJobQueue("t", workers=1, max_attempts=3, backoff_s=0)
+        assert q.submit(flaky, on_done=results.append)
+        assert await q.join(timeout=5)
+        stats = q.stats()
+        await q.stop()
+        return stats
+
+    stats = asyncio.run(run())
+    assert results == ["ok"]
+    assert stats["completed"] == 1
+    assert stats["retries"] == 2
+    assert stats["depth"] == 0
+
+
+def test_job_queue_drops_when_full():
+    async def run():
+        q = AsyncJobQueue("t", maxsize=1, workers=1, backoff_s=0)
+        accepted = [q.submit(lambda: None) for _ in range(5)]
+        await q.join(timeout=5)
+        await q.stop()
+        return accepted, q.stats()
+
+    accepted, stats = asyncio.run(run())
+    assert accepted[0] is True
+    assert stats["dropped"] == accepted.count(False)
+    assert stats["failed"] == 0
+
+
+def test_job_queue_gives_up_on_non_retryable():
+    def bad():
+        raise ValueError("nope")
+
+    async def run():
+        q = AsyncJobQueue("t", workers=1, max_attempts=5, backoff_s=0, retryable=lambda e: False)
+        q.submit(bad)
+        await q.join(timeout=5)
+        await q.stop()
+        return q.stats()
+
+    stats = asyncio.run(run())
+    assert stats["failed"] == 1
+    assert stats["retries"] == 0
+
+
+def test_job_queue_reports_final_failure():
+    errors, results = [], []
+
+    def bad():
+        raise ConnectionError("boom")
+
+    async def run():
+        q = AsyncJobQueue("t", workers=1, max_attempts=2, backoff_s=0)
+        q.submit(bad, on_done=results.append, on_error=errors.append)
+        await q.join(timeout=5)
+        await q.stop()
+        return q.stats()
+
+    stats = asyncio.run(run())
+    assert stats["retries"] == 1 and stats["failed"] == 1
+    assert results == [] and [type(e) for e in errors] == [ConnectionError]
+
+
+def test_job_queue_per_job_retry_policy():
+    attempts = []
+
+    def post():
+        attempts.append(1)
+        raise TimeoutError("read timed out")
+
+    async def run():
+        q = AsyncJobQueue("t", workers=1, max_attempts=5, backoff_s=0)
+        q.submit(post, retryable=lambda e: False)
+        await q.join(timeout=5)
+        await q.stop()
+        return q.stats()
+
+    stats = asyncio.run(run())
+    assert len(attempts) == 1
+    assert stats["failed"] == 1 and stats["retries"] == 0
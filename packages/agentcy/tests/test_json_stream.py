@@ -0,0 +1,55 @@
+import json
+import random
+
+import pytest
+
+from scripts.json_stream import JsonEventParser, JsonStreamError, parse_chunks
+
+
+def _split(text, rnd, pieces=8):
+    cuts = sorted(rnd.sample(range(len(text) + 1), min(len(text) + 1, pieces)))
+    return [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+
+
+def test_parse_chunks_matches_json_loads_for_any_split():
+    value = {
+        "pr_title": "Fix \"Draagon\" typo",
+        "n": [1, -2.5e3, True, False, None, {}, []],
+        "files": [
+            {"path": "games/a.html", "content": "<p>café \U0001F600</p>\n\tline2\\end"},
+            {"path": "b.txt", "content": ""},
+        ],
+    }
+    rnd = random.Random(7)
+    for ensure_ascii in (True, False):
+        text = json.dumps(value, ensure_ascii=ensure_ascii, indent=1)
+        assert parse_chunks(list(text)) == value  # one character at a time
+        for _ in range(200):
+            assert parse_chunks(_split(text, rnd)) == value
+
+
+def test_events_arrive_before_the_document_ends():
+    parser = JsonEventParser()
+    events = parser.feed('{"files": [{"path": "index.html", "content": "<h1>Hel')
+    assert ("start", ("files",), "array") in events
+    assert ("str", ("files", 0, "path"), "index.html", True) in events
+    assert events[-1] == ("str", ("files", 0, "content"), "<h1>Hel", False)
+    events = parser.feed('lo</h1>"}]}')
+    assert events[0] == ("str", ("files", 0, "content"), "lo</h1>", True)
+    assert events[-1] == ("end", ())
+    assert parser.close() == []
+
+
+@pytest.mark.parametrize(
+    "bad",
+    ['{"a":1,}', '{"a" 1}', "[1 2]", '{"a":tru}', "{}x", '"\x01"', '{"a":[1}', '```json\n{}```'],
+)
+def test_invalid_json_raises(bad):
+    with pytest.raises(JsonStreamError):
+        parse_chunks([bad])
+
+
+@pytest.mark.parametrize("truncated", ['{"a":"x', '{"a":[1', '{"a"', "", '{"a":1'])
+def test_truncated_json_raises_on_close(truncated):
+    with pytest.raises(JsonStreamError):
+        parse_chunks([truncated])
@@ -0,0 +1,101 @@
+import json
+import os
+
+import pytest
+
+from scripts.proposal_cache import ProposalCache, cache_key
+
+
+def _key(**overrides):
+    fields = {"endpoint": "e", "agent_name": "a", "model": "m", "instructions": "i", "prompt": "p", "revision": "r"}
+    fields.update(overrides)
+    return cache_key(**fields)
+
+
+def test_key_changes_with_every_input():
+    base = _key()
+    assert base == _key()
+    for field in ("endpoint", "agent_name", "model", "instructions", "prompt", "revision"):
+        assert _key(**{field: "other"}) != base
+
+
+def test_get_put_roundtrip(tmp_path):
+    cache = ProposalCache(tmp_path)
+    assert cache.get(_key()) is None
+    cache.put(_key(), '{"files": []}')
+    assert cache.get(_key()) == '{"files": []}'
+    assert cache.stats() == {"hits": 1, "misses": 1}
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = ProposalCache(tmp_path, max_bytes=350)
+    for i, name in enumerate("abc"):
+        cache.put(_key(prompt=name), name * 100)
+        os.utime(cache._path(_key(prompt=name)), (1000 + i, 1000 + i))
+    # "a" is the oldest write, but reading it makes "b" the least recently used.
+    assert cache.get(_key(prompt="a")) == "a" * 100
+    cache.put(_key(prompt="d"), "d" * 100)
+    assert cache.get(_key(prompt="b")) is None
+    for name in "acd":
+        assert cache.get(_key(prompt=name)) == name * 100
+
+
+class _AlwaysHit(ProposalCache):
+    def __init__(self, root, text):
+        super().__init__(root)
+        self.text = text
+        self.keys = []
+
+    def get(self, key):
+        self.keys.append(key)
+        return self.text
+
+
+def test_propose_changes_served_from_cache_without_client(tmp_path, monkeypatch):
+    import scripts.foundry_to_github_pr as mod
+
+    proposal = {"pr_title": "t", "files": [{"path": "index.html", "content": "x"}]}
+    cache = _AlwaysHit(tmp_path / "cache", json.dumps(proposal))
+    monkeypatch.setattr(mod, "get_cache", lambda: cache)
+    monkeypatch.setattr(mod, "make_project_client", lambda endpoint: pytest.fail("agent contacted"))
+    kwargs = dict(
+        repo_context_json="{}",
+        feedback_text="fix typo",
+        allow_prefix="",
+        agent_name="a",
+        model_deployment_name="m",
+        endpoint="e",
+    )
+
+    assert mod.propose_changes_via_agent(**kwargs) == proposal
+
+    sink = mod._StreamedFiles("", tmp_path / "repo")
+    assert mod.propose_changes_via_agent(**kwargs, stream=True, sink=sink) == proposal
+    assert (tmp_path / "repo" / "index.html").read_text(encoding="utf-8") == "x"
+    # Same request, same key; different feedback, different key.
+    mod.propose_changes_via_agent(**{**kwargs, "feedback_text": "other"})
+    assert cache.keys[0] == cache.keys[1] != cache.keys[2]
+    # Same prompt against a newer base commit: files may differ even if the tree does not.
+    mod.propose_changes_via_agent(**kwargs, revision="abc123")
+    assert cache.keys[3] != cache.keys[0]
+
+
+def test_no_cache_does_not_force_a_new_agent_version(tmp_path, monkeypatch):
+    import scripts.foundry_agent_writer as mod
+
+    monkeypatch.setattr(mod, "get_cache", lambda: ProposalCache(tmp_path))
+    for name in ("USER_ENDPOINT", "AGENT_NAME", "MODEL_DEPLOYMENT_NAME"):
+        monkeypatch.setenv(name, "x")
+    monkeypatch.setattr(mod, "get_project_client", lambda endpoint: object())
+    refresh = []
+
+    def fake_ensure_agent(client, **kwargs):
+        refresh.append(kwargs["refresh"])
+        raise SystemExit("stop")
+
+    monkeypatch.setattr(mod, "ensure_agent", fake_ensure_agent)
+    for flags in ({"use_cache": False}, {"use_cache": True, "refresh_agent": True}):
+        with pytest.raises(SystemExit):
+            mod.call_agent_and_write(False, ("generated/",), context_budget_tokens=0, **flags)
+    assert refresh == [False, True]
@@ -0,0 +1,54 @@
+import threading
+import time
+
+import pytest
+
+from scripts.rate_limit import TokenBucket, configure, get_limiter
+
+
+def test_burst_then_rate():
+    bucket = TokenBucket(rate_per_s=20, burst=5)
+    started = time.monotonic()
+    for _ in range(5):
+        assert bucket.acquire()
+    assert time.monotonic() - started < 0.05
+    for _ in range(4):
+        bucket.acquire()
+    # 4 more tokens at 20/s need ~0.2 s.
+    assert 0.15 < time.monotonic() - started < 1.0
+    assert bucket.stats()["acquired"] == 9
+
+
+def test_timeout():
+    bucket = TokenBucket(rate_per_s=0.5, burst=1)
+    assert bucket.acquire(timeout=0)
+    assert bucket.acquire(timeout=0.05) is False
+
+
+def test_shared_across_threads():
+    bucket = TokenBucket(rate_per_s=50, burst=1)
+    times = []
+    lock = threading.Lock()
+
+    def worker():
+        for _ in range(5):
+            bucket.acquire()
+            with lock:
+                times.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    times.sort()
+    # 20 acquisitions, 1 burst token, then 50/s: at least ~0.38 s overall.
+    assert times[-1] - times[0] >= 0.3
+
+
+def test_registry():
+    configure("test-bucket", rate_per_s=3)
+    assert get_limiter("test-bucket").rate_per_s == 3
+    assert get_limiter("test-bucket") is get_limiter("test-bucket", rate_per_s=99)
+    with pytest.raises(ValueError):
+        TokenBucket(rate_per_s=0)
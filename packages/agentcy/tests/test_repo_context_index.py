@@ -0,0 +1,118 @@
+import json
+import subprocess
+from pathlib import Path
+
+from scripts.repo_context_index import ContextIndex, list_tree, read_blobs
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@t", *args], cwd=str(cwd), check=True, capture_output=True
+    )
+
+
+def _make_repo(root: Path) -> Path:
+    root.mkdir()
+    _git(root, "init", "-q", "-b", "main")
+    (root / "index.html").write_text("<h1>Hi</h1>", encoding="utf-8")
+    (root / "css").mkdir()
+    (root / "css" / "site.css").write_text("body{}", encoding="utf-8")
+    (root / "logo.bin").write_bytes(b"\xff\xfe\x00binary")
+    (root / "big.txt").write_text("x" * 2000, encoding="utf-8")
+    (root / "img.png").write_bytes(b"png")
+    (root / "link").symlink_to("index.html")
+    _git(root, "add", "-A")
+    _git(root, "commit", "-q", "-m", "init")
+    return root
+
+
+def test_list_tree_and_read_blobs(tmp_path):
+    repo = _make_repo(tmp_path / "repo")
+    entries = {e.path: e for e in list_tree(repo)}
+    assert sorted(entries) == ["big.txt", "css/site.css", "img.png", "index.html", "link", "logo.bin"]
+    assert entries["big.txt"].size == 2000 and entries["link"].size == -1
+
+    blobs = read_blobs(repo, [entries["index.html"].sha, entries["logo.bin"].sha])
+    assert blobs[entries["index.html"].sha] == b"<h1>Hi</h1>"
+    assert blobs[entries["logo.bin"].sha] == b"\xff\xfe\x00binary"
+
+
+def test_small_text_files_only_reads_changed_blobs(tmp_path):
+    repo = _make_repo(tmp_path / "repo")
+    index = ContextIndex(tmp_path / "ctx.db")
+
+    files = index.small_text_files(repo, list_tree(repo), max_bytes=1000)
+    assert [f["path"] for f in files] == ["css/site.css", "index.html"]
+    assert index.stats() == {"blobs": 3, "hits": 0, "misses": 3}  # logo.bin is cached as binary
+
+    (repo / "index.html").write_text("<h1>Hello</h1>", encoding="utf-8")
+    _git(repo, "commit", "-q", "-am", "edit")
+    files = index.small_text_files(repo, list_tree(repo), max_bytes=1000)
+    assert {f["path"]: f["content"] for f in files}["index.html"] == "<h1>Hello</h1>"
+    assert index.hits == 2 and index.misses == 4
+
+    # A fresh index object reuses the database.
+    again = ContextIndex(tmp_path / "ctx.db")
+    again.small_text_files(repo, list_tree(repo), max_bytes=1000)
+    assert again.misses == 0
+
+
+def test_small_text_files_respects_limits(tmp_path):
+    repo = _make_repo(tmp_path / "repo")
+    index = ContextIndex(tmp_path / "ctx.db")
+    assert len(index.small_text_files(repo, list_tree(repo), max_files=1, max_bytes=1000)) == 1
+    assert index.small_text_files(repo, list_tree(repo), is_excluded=lambda p: p.endswith(".html"), max_bytes=1000) == [
+        {"path": "css/site.css", "content": "body{}"}
+    ]
+
+
+def test_agent_context_from_index_matches_walk(tmp_path):
+    from scripts.foundry_to_github_pr import _build_agent_context
+
+    repo = _make_repo(tmp_path / "repo")
+    (repo / "secrets.txt").write_text("nope", encoding="utf-8")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "secret")
+    walked = json.loads(_build_agent_context(repo, share_files=True, repo_name="site")[0])
+    indexed = json.loads(
+        _build_agent_context(repo, share_files=True, repo_name="site", index=ContextIndex(tmp_path / "ctx.db"))[0]
+    )
+    assert indexed["repo"] == "site"
+    assert "secrets.txt" not in indexed["tree"]
+    assert sorted(indexed["tree"]) == sorted(walked["tree"])
+    by_path = lambda ctx: {f["path"]: f["content"] for f in ctx["files"]}
+    assert by_path(indexed) == {k: v for k, v in by_path(walked).items() if k != "link"}
+
+
+def test_relevant_text_files_ranks_every_file_and_caches_terms(tmp_path):
+    import sqlite3
+
+    from scripts.repo_retrieval import select_files
+
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    _git(repo, "init", "-q", "-b", "main")
+    for i in range(30):
+        (repo / f"a{i:02d}.txt").write_text(f"filler page {i}", encoding="utf-8")
+    (repo / "zz" / "snake").mkdir(parents=True)
+    (repo / "zz" / "snake" / "game.js").write_text("function moveSnake() { speed += 1 }", encoding="utf-8")
+    _git(repo, "add", "-A")
+    _git(repo, "commit", "-q", "-m", "init")
+
+    index = ContextIndex(tmp_path / "ctx.db")
+    selection = index.relevant_text_files(repo, list_tree(repo), "the snake is too fast", budget_tokens=50)
+    # Last in tree order, far past any small_text_files cap, and still found.
+    assert [f["path"] for f in selection.files][0] == "zz/snake/game.js"
+    assert selection.files[0]["content"].startswith("function moveSnake")
+    assert selection.stats["candidates"] == 31
+
+    # Same picks as ranking the loaded files directly.
+    all_files = index.small_text_files(repo, list_tree(repo), max_files=100)
+    direct = select_files(all_files, "the snake is too fast", budget_tokens=50)
+    assert [f["path"] for f in selection.files] == [f["path"] for f in direct.files]
+
+    with sqlite3.connect(str(tmp_path / "ctx.db")) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM blob_terms").fetchone()[0] == 31
+    again = ContextIndex(tmp_path / "ctx.db")
+    again.relevant_text_files(repo, list_tree(repo), "filler", budget_tokens=50)
+    assert again.misses == 0
@@ -0,0 +1,44 @@
+from collections import Counter
+
+from scripts.repo_retrieval import BM25, select_files, summarize, terms
+
+
+FILES = [
+    {"path": "index.html", "content": "<h1>Welcome</h1> <a href='games/snake/'>Play</a>"},
+    {"path": "games/snake/index.html", "content": "<canvas id='snake'></canvas> <p>Use arrow keys to move</p>"},
+    {"path": "games/snake/snakeGame.js", "content": "function moveSnake(dir) { speed += 1 }\n" * 20},
+    {"path": "games/chess/board.js", "content": "const board = []; // chess pieces and moves\n" * 20},
+    {"path": "docs/licenses.txt", "content": "MIT License " * 2000},
+]
+
+
+def test_terms_split_code_identifiers():
+    assert terms("moveSnake(snake_speed) in the Game") == ["move", "snake", "snake", "speed", "game"]
+
+
+def test_bm25_prefers_matching_documents():
+    scores = BM25([Counter(terms(f["content"])) for f in FILES]).scores(terms("chess pieces"))
+    assert max(range(len(FILES)), key=scores.__getitem__) == 3
+
+
+def test_select_files_ranks_by_feedback_and_respects_budget():
+    selection = select_files(FILES, "The snake moves too fast, slow down the speed", budget_tokens=400)
+    paths = [f["path"] for f in selection.files]
+    assert paths[0] == "games/snake/snakeGame.js"
+    assert "docs/licenses.txt" not in paths and "games/chess/board.js" not in paths
+    stats = selection.stats
+    assert stats["tokens"] <= 400 and stats["selected"] == len(paths) and stats["candidates"] == len(FILES)
+    assert stats["bytes_saved"] >= len(FILES[4]["content"])
+    assert summarize(stats).startswith(f"Context: {len(paths)} of 5 file(s)")
+
+
+def test_select_files_skips_files_that_do_not_fit():
+    # The big license file matches but does not fit; smaller matches still do.
+    selection = select_files(FILES, "license snake", budget_tokens=300)
+    assert [f["path"] for f in selection.files][:1] != ["docs/licenses.txt"]
+    assert any("snake" in f["path"] for f in selection.files)
+
+
+def test_select_files_without_matches_falls_back_to_path_order():
+    selection = select_files(FILES, "", budget_tokens=100)
+    assert [f["path"] for f in selection.files] == ["games/snake/index.html", "index.html"]
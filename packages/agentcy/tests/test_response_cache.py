@@ -0,0 +1,78 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from examples.response_cache import RevalidatingCache
+
+
+class _Upstream:
+    def __init__(self):
+        self.calls = []
+        self.version = 1
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def fetch(self, etag):
+        self.gate.wait(5)
+        self.calls.append(etag)
+        current = f'"v{self.version}"'
+        if etag == current:
+            return None, current
+        return {"version": self.version}, current
+
+
+def test_fresh_hits_and_misses():
+    up = _Upstream()
+    cache = RevalidatingCache(ttl_s=60)
+    assert cache.get("k", up.fetch) == {"version": 1}
+    assert cache.get("k", up.fetch) == {"version": 1}
+    assert up.calls == [None]
+    stats = cache.stats()
+    assert stats["misses"] == 1 and stats["hits"] == 1
+
+
+def test_stale_while_revalidate_uses_etag():
+    up = _Upstream()
+    cache = RevalidatingCache(ttl_s=0, stale_ttl_s=60)
+    cache.get("k", up.fetch)
+
+    up.gate.clear()  # upstream is slow
+    start = time.monotonic()
+    assert cache.get("k", up.fetch) == {"version": 1}
+    assert time.monotonic() - start < 1  # reader did not wait on the refresh
+    up.gate.set()
+
+    deadline = time.monotonic() + 5
+    while cache.stats()["not_modified"] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert up.calls == [None, '"v1"']
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_lru_eviction():
+    up = _Upstream()
+    cache = RevalidatingCache(ttl_s=60, max_entries=2)
+    for key in ("a", "b", "a", "c"):
+        cache.get(key, up.fetch)
+    assert cache.stats()["evictions"] == 1
+    cache.get("a", up.fetch)  # still cached (recently used)
+    assert len(up.calls) == 3
+
+
+def test_failed_fetches_do_not_leak_key_locks():
+    cache = RevalidatingCache(ttl_s=60)
+
+    def broken(etag):
+        raise OSError("upstream down")
+
+    for i in range(50):
+        try:
+            cache.get(("label", i), broken)
+        except OSError:
+            pass
+    cache.get("ok", lambda etag: ({"v": 1}, None))
+    assert cache._key_locks == {}
+    assert cache.stats()["errors"] == 50
@@ -0,0 +1,119 @@
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from examples.save_coalescer import SaveCoalescer
+
+
+class _Issues:
+    def __init__(self, fail_updates=0):
+        self.created = []
+        self.updates = []
+        self.fail_updates = fail_updates
+        self.updated = threading.Event()
+
+    def create(self, payload):
+        self.created.append(payload)
+        n = len(self.created)
+        return n, f"https://github.com/a/b/issues/{n}"
+
+    def update(self, number, payload):
+        if self.fail_updates:
+            self.fail_updates -= 1
+            raise OSError("boom")
+        self.updates.append((number, payload))
+        self.updated.set()
+
+
+def test_first_save_creates_then_later_saves_merge_into_one_update():
+    issues = _Issues()
+    c = SaveCoalescer(issues.create, issues.update, debounce_s=0.2)
+
+    assert c.submit(("app", "progress", "u1"), {"level": 1}) == (1, "https://github.com/a/b/issues/1")
+    for level in (2, 3, 4):
+        assert c.submit(("app", "progress", "u1"), {"level": level})[0] == 1
+
+    assert issues.updated.wait(2)
+    time.sleep(0.05)
+    assert len(issues.created) == 1
+    assert issues.updates == [(1, {"level": 4})]
+    s = c.stats()
+    assert (s["received"], s["created"], s["updated"], s["merged"], s["pending"]) == (4, 1, 1, 2, 0)
+
+
+def test_keys_are_independent():
+    issues = _Issues()
+    c = SaveCoalescer(issues.create, issues.update, debounce_s=60)
+    assert c.submit(("app", "progress", "u1"), {})[0] == 1
+    assert c.submit(("app", "progress", "u2"), {})[0] == 2
+    assert c.submit(("app", "settings", "u1"), {})[0] == 3
+
+
+def test_flush_all_writes_pending_immediately():
+    issues = _Issues()
+    c = SaveCoalescer(issues.create, issues.update, debounce_s=60)
+    c.submit("k", {"v": 1})
+    c.submit("k", {"v": 2})
+    assert c.stats()["pending"] == 1
+    c.flush_all()
+    assert issues.updates == [(1, {"v": 2})]
+    assert c.stats()["pending"] == 0
+
+
+def test_failed_updates_are_retried_then_dropped():
+    issues = _Issues(fail_updates=5)
+    c = SaveCoalescer(issues.create, issues.update, debounce_s=60, max_failures=2)
+    c.submit("k", {"v": 1})
+    c.submit("k", {"v": 2})
+    c.flush_all()  # failure 1, re-queued
+    assert c.stats()["pending"] == 1
+    c.flush_all()  # failure 2, given up
+    s = c.stats()
+    assert (s["failed"], s["dropped"], s["pending"]) == (2, 1, 0)
+    assert issues.updates == []
+
+
+def test_failed_create_does_not_leak_and_can_be_retried():
+    issues = _Issues()
+    attempts = []
+
+    def create(payload):
+        attempts.append(payload)
+        if len(attempts) == 1:
+            raise OSError("boom")
+        return issues.create(payload)
+
+    c = SaveCoalescer(create, issues.update, debounce_s=60)
+    try:
+        c.submit("k", {"v": 1})
+    except OSError:
+        pass
+    assert c._creating == {}
+    assert c.submit("k", {"v": 2})[0] == 1
+
+
+def test_saves_do_not_wait_on_an_in_flight_update():
+    release = threading.Event()
+    started = threading.Event()
+    issues = _Issues()
+
+    def slow_update(number, payload):
+        started.set()
+        release.wait(5)
+        issues.update(number, payload)
+
+    c = SaveCoalescer(issues.create, slow_update, debounce_s=0)
+    c.submit("k", {"v": 1})
+    c.submit("k", {"v": 2})
+    assert started.wait(2)
+    t0 = time.monotonic()
+    c.submit("k", {"v": 3})
+    assert time.monotonic() - t0 < 1
+    release.set()
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline and len(issues.updates) < 2:
+        time.sleep(0.01)
+    assert issues.updates == [(1, {"v": 2}), (1, {"v": 3})]